@@ -0,0 +1,26 @@
+"""Add map tile status to stored files
+
+Revision ID: 2f6b8e13d7c4
+Revises: 9d41c7a2e8b5
+Create Date: 2026-10-19 17:03:51.442907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f6b8e13d7c4'
+down_revision = '9d41c7a2e8b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('stored_files', sa.Column('tile_status', sa.String(), nullable=True))
+    op.add_column('stored_files', sa.Column('tile_levels', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('stored_files', 'tile_levels')
+    op.drop_column('stored_files', 'tile_status')
@@ -0,0 +1,124 @@
+"""Add character spell and feature index tables
+
+Revision ID: 3c9d0e7b41f2
+Revises: a5ea35039033
+Create Date: 2026-10-19 11:40:02.518733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9d0e7b41f2'
+down_revision = 'a5ea35039033'
+branch_labels = None
+depends_on = None
+
+
+# Index rows as app.services.character_index built them at this revision,
+# frozen here so later changes to the app do not change the migration
+def name_key(name):
+    return " ".join(name.lower().split())
+
+
+def spell_rows(character_id, spells):
+    rows = []
+    for group, entries in (spells or {}).items():
+        group_level = 0 if group == "cantrips" else int(group) if str(group).isdigit() else None
+        for entry in entries or []:
+            if isinstance(entry, str):
+                entry = {"name": entry}
+            if not isinstance(entry, dict) or not entry.get("name"):
+                continue
+            level = entry.get("level")
+            rows.append({
+                "character_id": character_id,
+                "name": entry["name"],
+                "name_key": name_key(entry["name"]),
+                "level": level if isinstance(level, int) else group_level,
+                "school": entry.get("school") or None,
+                "prepared": bool(entry.get("prepared", False)),
+            })
+    return rows
+
+
+def feature_rows(character_id, features):
+    rows = []
+    for entry in features or []:
+        if isinstance(entry, str):
+            entry = {"name": entry}
+        if not isinstance(entry, dict) or not entry.get("name"):
+            continue
+        source = entry.get("source")
+        rows.append({
+            "character_id": character_id,
+            "name": entry["name"],
+            "name_key": name_key(entry["name"]),
+            "source": str(source) if source not in (None, "") else None,
+        })
+    return rows
+
+
+def upgrade() -> None:
+    spells = op.create_table(
+        'character_spells',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('character_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('name_key', sa.String(), nullable=False),
+        sa.Column('level', sa.Integer(), nullable=True),
+        sa.Column('school', sa.String(), nullable=True),
+        sa.Column('prepared', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['character_id'], ['characters.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_character_spells_id', 'character_spells', ['id'])
+    op.create_index('ix_character_spells_character_id', 'character_spells', ['character_id'])
+    op.create_index('ix_character_spells_name_key', 'character_spells', ['name_key', 'character_id'])
+
+    features = op.create_table(
+        'character_features',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('character_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('name_key', sa.String(), nullable=False),
+        sa.Column('source', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['character_id'], ['characters.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_character_features_id', 'character_features', ['id'])
+    op.create_index('ix_character_features_character_id', 'character_features', ['character_id'])
+    op.create_index('ix_character_features_name_key', 'character_features', ['name_key', 'character_id'])
+
+    # Backfill from the existing JSON columns
+    characters = sa.table(
+        'characters',
+        sa.column('id', sa.Integer),
+        sa.column('spells', sa.JSON),
+        sa.column('features', sa.JSON),
+    )
+    connection = op.get_bind()
+    result = connection.execute(
+        sa.select(characters.c.id, characters.c.spells, characters.c.features).execution_options(yield_per=500)
+    )
+    for batch in result.partitions():
+        spell_batch, feature_batch = [], []
+        for character_id, character_spells, character_features in batch:
+            spell_batch.extend(spell_rows(character_id, character_spells))
+            feature_batch.extend(feature_rows(character_id, character_features))
+        if spell_batch:
+            op.bulk_insert(spells, spell_batch)
+        if feature_batch:
+            op.bulk_insert(features, feature_batch)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_character_features_name_key', table_name='character_features')
+    op.drop_index('ix_character_features_character_id', table_name='character_features')
+    op.drop_index('ix_character_features_id', table_name='character_features')
+    op.drop_table('character_features')
+    op.drop_index('ix_character_spells_name_key', table_name='character_spells')
+    op.drop_index('ix_character_spells_character_id', table_name='character_spells')
+    op.drop_index('ix_character_spells_id', table_name='character_spells')
+    op.drop_table('character_spells')
@@ -0,0 +1,43 @@
+"""Add revisions
+
+Revision ID: 5b8e1c4d7f20
+Revises: 7d3f2b8e6a91
+Create Date: 2026-10-19 23:18:42.930175
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e1c4d7f20'
+down_revision = '7d3f2b8e6a91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'revisions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=32), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('patch', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_revisions_id'), 'revisions', ['id'], unique=False)
+    op.create_index(op.f('ix_revisions_campaign_id'), 'revisions', ['campaign_id'], unique=False)
+    op.create_index('ix_revisions_entity_version', 'revisions', ['entity_type', 'entity_id', 'version'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_revisions_entity_version', table_name='revisions')
+    op.drop_index(op.f('ix_revisions_campaign_id'), table_name='revisions')
+    op.drop_index(op.f('ix_revisions_id'), table_name='revisions')
+    op.drop_table('revisions')
@@ -0,0 +1,82 @@
+"""Add numeric map positions to places
+
+Revision ID: 5e8a0c27b9d3
+Revises: 2f6b8e13d7c4
+Create Date: 2026-10-19 18:20:14.907316
+
+"""
+import json
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a0c27b9d3'
+down_revision = '2f6b8e13d7c4'
+branch_labels = None
+depends_on = None
+
+
+# app.services.place_map.parse_coordinates as it was at this revision, frozen
+# here so later changes to the app do not change the migration
+def parse_coordinates(value):
+    if not value:
+        return None
+    try:
+        data = json.loads(value)
+    except ValueError:
+        data = value.split(",")
+    if isinstance(data, dict):
+        lower = {str(key).lower(): v for key, v in data.items()}
+        x = lower.get("x", lower.get("lng", lower.get("lon")))
+        y = lower.get("y", lower.get("lat"))
+    elif isinstance(data, list) and len(data) == 2:
+        x, y = data
+    else:
+        return None
+    try:
+        x, y = float(x), float(y)
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(x) and math.isfinite(y)):
+        return None
+    return x, y
+
+
+def upgrade() -> None:
+    op.add_column('places', sa.Column('map_x', sa.Float(), nullable=True))
+    op.add_column('places', sa.Column('map_y', sa.Float(), nullable=True))
+
+    # Parse the positions out of the existing map_coordinates
+    places = sa.table(
+        'places', sa.column('id', sa.Integer), sa.column('map_coordinates', sa.String),
+        sa.column('map_x', sa.Float), sa.column('map_y', sa.Float)
+    )
+    connection = op.get_bind()
+    result = connection.execute(
+        sa.select(places.c.id, places.c.map_coordinates)
+        .where(places.c.map_coordinates.isnot(None))
+        .execution_options(yield_per=500)
+    )
+    updates = []
+    for place_id, coordinates in result:
+        position = parse_coordinates(coordinates)
+        if position:
+            updates.append({'place_id': place_id, 'x': position[0], 'y': position[1]})
+    if updates:
+        connection.execute(
+            places.update()
+            .where(places.c.id == sa.bindparam('place_id'))
+            .values(map_x=sa.bindparam('x'), map_y=sa.bindparam('y')),
+            updates
+        )
+
+    op.create_index('ix_places_map_position', 'places', ['campaign_id', 'parent_place_id', 'map_x', 'map_y'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_places_map_position', table_name='places')
+    op.drop_column('places', 'map_y')
+    op.drop_column('places', 'map_x')
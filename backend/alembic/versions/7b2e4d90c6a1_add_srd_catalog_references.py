@@ -0,0 +1,28 @@
+"""Add SRD catalog references to items and character spells
+
+Revision ID: 7b2e4d90c6a1
+Revises: 3c9d0e7b41f2
+Create Date: 2026-10-19 14:05:47.211390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e4d90c6a1'
+down_revision = '3c9d0e7b41f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('items', sa.Column('srd_id', sa.String(), nullable=True))
+    op.create_index('ix_items_srd_id', 'items', ['srd_id'])
+    op.add_column('character_spells', sa.Column('srd_id', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('character_spells', 'srd_id')
+    op.drop_index('ix_items_srd_id', table_name='items')
+    op.drop_column('items', 'srd_id')
@@ -0,0 +1,28 @@
+"""Add row versions
+
+Revision ID: 7d3f2b8e6a91
+Revises: 1a9c5e0f7b42
+Create Date: 2026-10-19 22:41:09.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3f2b8e6a91'
+down_revision = '1a9c5e0f7b42'
+branch_labels = None
+depends_on = None
+
+TABLES = ('campaigns', 'characters', 'places', 'items', 'quests', 'sessions', 'notes', 'encounters', 'routes')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'version')
@@ -0,0 +1,90 @@
+"""Soft delete campaigns and cascade deletes in the database
+
+Revision ID: 9c2a6e3f1d84
+Revises: 5b8e1c4d7f20
+Create Date: 2026-10-19 23:52:16.204418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2a6e3f1d84'
+down_revision = '5b8e1c4d7f20'
+branch_labels = None
+depends_on = None
+
+# (table, column, referenced table, ON DELETE)
+FOREIGN_KEYS = [
+    ('campaign_members', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('characters', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('places', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('items', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('quests', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('sessions', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('notes', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('encounters', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('routes', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('revisions', 'campaign_id', 'campaigns', 'CASCADE'),
+    ('places', 'parent_place_id', 'places', 'SET NULL'),
+    ('routes', 'from_place_id', 'places', 'CASCADE'),
+    ('routes', 'to_place_id', 'places', 'CASCADE'),
+    ('character_items', 'character_id', 'characters', 'CASCADE'),
+    ('character_items', 'item_id', 'items', 'CASCADE'),
+    ('character_spells', 'character_id', 'characters', 'CASCADE'),
+    ('character_features', 'character_id', 'characters', 'CASCADE'),
+    ('combatants', 'encounter_id', 'encounters', 'CASCADE'),
+    ('combatants', 'character_id', 'characters', 'CASCADE'),
+]
+
+# Foreign keys without an index, which cascading deletes would scan for
+INDEXES = [
+    ('campaign_members', 'campaign_id'),
+    ('characters', 'campaign_id'),
+    ('items', 'campaign_id'),
+    ('quests', 'campaign_id'),
+    ('sessions', 'campaign_id'),
+    ('notes', 'campaign_id'),
+    ('places', 'parent_place_id'),
+    ('routes', 'from_place_id'),
+    ('routes', 'to_place_id'),
+    ('character_items', 'character_id'),
+    ('character_items', 'item_id'),
+    ('combatants', 'character_id'),
+]
+
+
+# PostgreSQL's default constraint names. SQLite's are unnamed; batch mode
+# names them with this convention when it copies the table.
+NAMING_CONVENTION = {'fk': '%(table_name)s_%(column_0_name)s_fkey'}
+
+
+def _recreate_foreign_keys(with_ondelete: bool) -> None:
+    tables = {}
+    for table, column, referenced, ondelete in FOREIGN_KEYS:
+        tables.setdefault(table, []).append((column, referenced, ondelete))
+    for table, foreign_keys in tables.items():
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for column, referenced, ondelete in foreign_keys:
+                name = f'{table}_{column}_fkey'
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(
+                    name, referenced, [column], ['id'], ondelete=ondelete if with_ondelete else None
+                )
+
+
+def upgrade() -> None:
+    op.add_column('campaigns', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_campaigns_deleted_at'), 'campaigns', ['deleted_at'], unique=False)
+    for table, column in INDEXES:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+    _recreate_foreign_keys(with_ondelete=True)
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys(with_ondelete=False)
+    for table, column in INDEXES:
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
+    op.drop_index(op.f('ix_campaigns_deleted_at'), table_name='campaigns')
+    op.drop_column('campaigns', 'deleted_at')
@@ -0,0 +1,41 @@
+"""Add stored files for uploads
+
+Revision ID: 9d41c7a2e8b5
+Revises: 7b2e4d90c6a1
+Create Date: 2026-10-19 16:12:30.804215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d41c7a2e8b5'
+down_revision = '7b2e4d90c6a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stored_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('original_name', sa.String(), nullable=True),
+        sa.Column('uploaded_by_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['uploaded_by_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stored_files_id', 'stored_files', ['id'])
+    op.create_index('ix_stored_files_sha256', 'stored_files', ['sha256'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stored_files_sha256', table_name='stored_files')
+    op.drop_index('ix_stored_files_id', table_name='stored_files')
+    op.drop_table('stored_files')
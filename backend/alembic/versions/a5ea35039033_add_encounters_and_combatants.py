@@ -0,0 +1,64 @@
+"""Add encounters and combatants
+
+Revision ID: a5ea35039033
+Revises: fc338c801332
+Create Date: 2026-10-19 10:12:31.204118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5ea35039033'
+down_revision = 'fc338c801332'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'encounters',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('round', sa.Integer(), nullable=False),
+        sa.Column('turn_index', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_encounters_id', 'encounters', ['id'])
+    op.create_index('ix_encounters_campaign_id', 'encounters', ['campaign_id'])
+
+    op.create_table(
+        'combatants',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('encounter_id', sa.Integer(), nullable=False),
+        sa.Column('character_id', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('initiative', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('armor_class', sa.Integer(), nullable=True),
+        sa.Column('hit_points_current', sa.Integer(), nullable=True),
+        sa.Column('hit_points_max', sa.Integer(), nullable=True),
+        sa.Column('conditions', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['encounter_id'], ['encounters.id']),
+        sa.ForeignKeyConstraint(['character_id'], ['characters.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_combatants_id', 'combatants', ['id'])
+    op.create_index('ix_combatants_encounter_position', 'combatants', ['encounter_id', 'position'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_combatants_encounter_position', table_name='combatants')
+    op.drop_index('ix_combatants_id', table_name='combatants')
+    op.drop_table('combatants')
+    op.drop_index('ix_encounters_campaign_id', table_name='encounters')
+    op.drop_index('ix_encounters_id', table_name='encounters')
+    op.drop_table('encounters')
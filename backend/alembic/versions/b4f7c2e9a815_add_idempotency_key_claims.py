@@ -0,0 +1,24 @@
+"""Add idempotency key claims
+
+Revision ID: b4f7c2e9a815
+Revises: d5a3f8b2c6e1
+Create Date: 2026-10-20 09:12:37.418205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4f7c2e9a815'
+down_revision = 'd5a3f8b2c6e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('idempotency_keys', sa.Column('claim', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('idempotency_keys', 'claim')
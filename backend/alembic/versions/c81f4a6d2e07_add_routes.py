@@ -0,0 +1,54 @@
+"""Add routes between places
+
+Revision ID: c81f4a6d2e07
+Revises: 5e8a0c27b9d3
+Create Date: 2026-10-19 19:02:44.160538
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81f4a6d2e07'
+down_revision = '5e8a0c27b9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'routes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('from_place_id', sa.Integer(), nullable=False),
+        sa.Column('to_place_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('distance', sa.Float(), nullable=False),
+        sa.Column('terrain', sa.Enum(
+            'ROAD', 'PLAINS', 'FOREST', 'HILLS', 'MOUNTAINS', 'SWAMP', 'DESERT', 'ARCTIC', 'WATER', 'UNDERDARK',
+            name='terrain'
+        ), nullable=False),
+        sa.Column('travel_mode', sa.Enum(
+            'FOOT', 'MOUNTED', 'WAGON', 'BOAT', 'SHIP', 'FLYING', name='travelmode'
+        ), nullable=False),
+        sa.Column('travel_hours', sa.Float(), nullable=True),
+        sa.Column('bidirectional', sa.Boolean(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id']),
+        sa.ForeignKeyConstraint(['from_place_id'], ['places.id']),
+        sa.ForeignKeyConstraint(['to_place_id'], ['places.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_routes_id', 'routes', ['id'])
+    op.create_index('ix_routes_campaign_id', 'routes', ['campaign_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_routes_campaign_id', table_name='routes')
+    op.drop_index('ix_routes_id', table_name='routes')
+    op.drop_table('routes')
+    sa.Enum(name='travelmode').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='terrain').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,332 @@
+"""Replace inlined SRD spell text on characters with catalog references
+
+Revision ID: d5a3f8b2c6e1
+Revises: 9c2a6e3f1d84
+Create Date: 2026-10-20 00:41:09.532871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a3f8b2c6e1'
+down_revision = '9c2a6e3f1d84'
+branch_labels = None
+depends_on = None
+
+
+# The spells of app/data/srd.json and the spell fields the catalog provides,
+# frozen here so later changes to the catalog do not change the migration.
+# Spells that are not in this list are left as they are.
+TEXT_FIELDS = ('school', 'casting_time', 'castingTime', 'range', 'duration', 'components', 'description')
+CATALOG_FIELDS = ('school', 'casting_time', 'range', 'duration', 'components', 'description')
+
+SRD_SPELLS = [
+    {
+        'id': 'acid-splash', 'name': 'Acid Splash', 'level': 0,
+        'school': 'Conjuration', 'casting_time': '1 action', 'range': '60 feet',
+        'duration': 'Instantaneous', 'components': 'V, S',
+        'description': (
+            'Hurl a bubble of acid at one creature or two adjacent creatures. Each target must succeed '
+            'on a Dexterity saving throw or take 1d6 acid damage. Damage increases at 5th, 11th and '
+            '17th level.'
+        ),
+    },
+    {
+        'id': 'fire-bolt', 'name': 'Fire Bolt', 'level': 0,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': '120 feet',
+        'duration': 'Instantaneous', 'components': 'V, S',
+        'description': (
+            'Make a ranged spell attack; on a hit the target takes 1d10 fire damage. Flammable objects '
+            'hit ignite if not worn or carried. Damage increases at 5th, 11th and 17th level.'
+        ),
+    },
+    {
+        'id': 'light', 'name': 'Light', 'level': 0,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': 'Touch',
+        'duration': '1 hour', 'components': 'V, M',
+        'description': (
+            'An object you touch sheds bright light in a 20-foot radius and dim light for a further 20 '
+            'feet.'
+        ),
+    },
+    {
+        'id': 'mage-hand', 'name': 'Mage Hand', 'level': 0,
+        'school': 'Conjuration', 'casting_time': '1 action', 'range': '30 feet',
+        'duration': '1 minute', 'components': 'V, S',
+        'description': (
+            'A spectral hand appears that can manipulate objects, open containers or carry up to 10 '
+            'pounds.'
+        ),
+    },
+    {
+        'id': 'sacred-flame', 'name': 'Sacred Flame', 'level': 0,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': '60 feet',
+        'duration': 'Instantaneous', 'components': 'V, S',
+        'description': (
+            'Radiance descends on a creature you can see. It must succeed on a Dexterity saving throw '
+            'or take 1d8 radiant damage, gaining no benefit from cover.'
+        ),
+    },
+    {
+        'id': 'guidance', 'name': 'Guidance', 'level': 0,
+        'school': 'Divination', 'casting_time': '1 action', 'range': 'Touch',
+        'duration': 'Concentration, up to 1 minute', 'components': 'V, S',
+        'description': 'A willing creature can add 1d4 to one ability check of its choice before the spell ends.',
+    },
+    {
+        'id': 'bless', 'name': 'Bless', 'level': 1,
+        'school': 'Enchantment', 'casting_time': '1 action', 'range': '30 feet',
+        'duration': 'Concentration, up to 1 minute', 'components': 'V, S, M',
+        'description': 'Up to three creatures add 1d4 to attack rolls and saving throws while the spell lasts.',
+    },
+    {
+        'id': 'cure-wounds', 'name': 'Cure Wounds', 'level': 1,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': 'Touch',
+        'duration': 'Instantaneous', 'components': 'V, S',
+        'description': (
+            'A creature you touch regains 1d8 + your spellcasting modifier hit points. +1d8 per slot '
+            'level above 1st.'
+        ),
+    },
+    {
+        'id': 'healing-word', 'name': 'Healing Word', 'level': 1,
+        'school': 'Evocation', 'casting_time': '1 bonus action', 'range': '60 feet',
+        'duration': 'Instantaneous', 'components': 'V',
+        'description': (
+            'A creature you can see regains 1d4 + your spellcasting modifier hit points. +1d4 per slot '
+            'level above 1st.'
+        ),
+    },
+    {
+        'id': 'magic-missile', 'name': 'Magic Missile', 'level': 1,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': '120 feet',
+        'duration': 'Instantaneous', 'components': 'V, S',
+        'description': (
+            'Three darts of force each deal 1d4 + 1 force damage and hit automatically. One more dart '
+            'per slot level above 1st.'
+        ),
+    },
+    {
+        'id': 'shield', 'name': 'Shield', 'level': 1,
+        'school': 'Abjuration', 'casting_time': '1 reaction', 'range': 'Self',
+        'duration': '1 round', 'components': 'V, S',
+        'description': (
+            '+5 bonus to AC until the start of your next turn, including against the triggering attack,'
+            ' and no damage from magic missile.'
+        ),
+    },
+    {
+        'id': 'sleep', 'name': 'Sleep', 'level': 1,
+        'school': 'Enchantment', 'casting_time': '1 action', 'range': '90 feet',
+        'duration': '1 minute', 'components': 'V, S, M',
+        'description': (
+            'Roll 5d8; creatures within 20 feet of a point fall unconscious in order of lowest current '
+            'hit points until the total is spent. +2d8 per slot level above 1st.'
+        ),
+    },
+    {
+        'id': 'thunderwave', 'name': 'Thunderwave', 'level': 1,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': 'Self (15-foot cube)',
+        'duration': 'Instantaneous', 'components': 'V, S',
+        'description': (
+            'Each creature in the cube makes a Constitution saving throw, taking 2d8 thunder damage and'
+            ' being pushed 10 feet on a failure, or half damage on a success.'
+        ),
+    },
+    {
+        'id': 'hold-person', 'name': 'Hold Person', 'level': 2,
+        'school': 'Enchantment', 'casting_time': '1 action', 'range': '60 feet',
+        'duration': 'Concentration, up to 1 minute', 'components': 'V, S, M',
+        'description': (
+            'A humanoid must succeed on a Wisdom saving throw or be paralyzed. It repeats the save at '
+            'the end of each of its turns.'
+        ),
+    },
+    {
+        'id': 'misty-step', 'name': 'Misty Step', 'level': 2,
+        'school': 'Conjuration', 'casting_time': '1 bonus action', 'range': 'Self',
+        'duration': 'Instantaneous', 'components': 'V',
+        'description': 'Teleport up to 30 feet to an unoccupied space you can see.',
+    },
+    {
+        'id': 'scorching-ray', 'name': 'Scorching Ray', 'level': 2,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': '120 feet',
+        'duration': 'Instantaneous', 'components': 'V, S',
+        'description': (
+            'Create three rays of fire; each is a ranged spell attack dealing 2d6 fire damage. One more'
+            ' ray per slot level above 2nd.'
+        ),
+    },
+    {
+        'id': 'spiritual-weapon', 'name': 'Spiritual Weapon', 'level': 2,
+        'school': 'Evocation', 'casting_time': '1 bonus action', 'range': '60 feet',
+        'duration': '1 minute', 'components': 'V, S',
+        'description': (
+            'A floating spectral weapon makes melee spell attacks for 1d8 + your spellcasting modifier '
+            'force damage; move and repeat the attack as a bonus action.'
+        ),
+    },
+    {
+        'id': 'counterspell', 'name': 'Counterspell', 'level': 3,
+        'school': 'Abjuration', 'casting_time': '1 reaction', 'range': '60 feet',
+        'duration': 'Instantaneous', 'components': 'S',
+        'description': (
+            'Interrupt a creature casting a spell. A spell of 3rd level or lower fails; higher levels '
+            'require an ability check.'
+        ),
+    },
+    {
+        'id': 'fireball', 'name': 'Fireball', 'level': 3,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': '150 feet',
+        'duration': 'Instantaneous', 'components': 'V, S, M',
+        'description': (
+            'A bright streak blossoms into a 20-foot-radius explosion. Each creature makes a Dexterity '
+            'saving throw, taking 8d6 fire damage on a failure or half on a success. +1d6 per slot '
+            'level above 3rd.'
+        ),
+    },
+    {
+        'id': 'lightning-bolt', 'name': 'Lightning Bolt', 'level': 3,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': 'Self (100-foot line)',
+        'duration': 'Instantaneous', 'components': 'V, S, M',
+        'description': (
+            'Each creature in a 100-foot line makes a Dexterity saving throw, taking 8d6 lightning '
+            'damage on a failure or half on a success.'
+        ),
+    },
+    {
+        'id': 'revivify', 'name': 'Revivify', 'level': 3,
+        'school': 'Necromancy', 'casting_time': '1 action', 'range': 'Touch',
+        'duration': 'Instantaneous', 'components': 'V, S, M',
+        'description': (
+            'A creature that died within the last minute returns to life with 1 hit point. Consumes '
+            'diamonds worth 300 gp.'
+        ),
+    },
+    {
+        'id': 'spirit-guardians', 'name': 'Spirit Guardians', 'level': 3,
+        'school': 'Conjuration', 'casting_time': '1 action', 'range': 'Self (15-foot radius)',
+        'duration': 'Concentration, up to 10 minutes', 'components': 'V, S, M',
+        'description': (
+            'Spirits protect you. Enemies entering or starting their turn in the area make a Wisdom '
+            'saving throw, taking 3d8 radiant or necrotic damage on a failure or half on a success; the'
+            ' area is difficult terrain for them.'
+        ),
+    },
+    {
+        'id': 'banishment', 'name': 'Banishment', 'level': 4,
+        'school': 'Abjuration', 'casting_time': '1 action', 'range': '60 feet',
+        'duration': 'Concentration, up to 1 minute', 'components': 'V, S, M',
+        'description': (
+            'A creature must succeed on a Charisma saving throw or be sent to a harmless demiplane, or '
+            'to its home plane if it is native elsewhere.'
+        ),
+    },
+    {
+        'id': 'polymorph', 'name': 'Polymorph', 'level': 4,
+        'school': 'Transmutation', 'casting_time': '1 action', 'range': '60 feet',
+        'duration': 'Concentration, up to 1 hour', 'components': 'V, S, M',
+        'description': (
+            "Transform a creature into a beast whose challenge rating is no higher than the target's "
+            'level or CR. An unwilling target resists with a Wisdom saving throw.'
+        ),
+    },
+    {
+        'id': 'cone-of-cold', 'name': 'Cone of Cold', 'level': 5,
+        'school': 'Evocation', 'casting_time': '1 action', 'range': 'Self (60-foot cone)',
+        'duration': 'Instantaneous', 'components': 'V, S, M',
+        'description': (
+            'Each creature in the cone makes a Constitution saving throw, taking 8d8 cold damage on a '
+            'failure or half on a success.'
+        ),
+    },
+    {
+        'id': 'raise-dead', 'name': 'Raise Dead', 'level': 5,
+        'school': 'Necromancy', 'casting_time': '1 hour', 'range': 'Touch',
+        'duration': 'Instantaneous', 'components': 'V, S, M',
+        'description': (
+            'Return a creature dead no longer than 10 days to life with 1 hit point. Consumes a diamond'
+            ' worth 500 gp.'
+        ),
+    },
+]
+
+SPELLS_BY_ID = {spell['id']: spell for spell in SRD_SPELLS}
+
+
+def name_key(name):
+    return ' '.join(name.lower().split())
+
+
+SPELLS_BY_NAME = {name_key(spell['name']): spell for spell in SRD_SPELLS}
+
+characters = sa.table('characters', sa.column('id', sa.Integer), sa.column('spells', sa.JSON))
+character_spells = sa.table(
+    'character_spells', sa.column('name_key', sa.String), sa.column('srd_id', sa.String)
+)
+
+
+def spell_reference(entry):
+    """An SRD spell entry without the catalog's text, with its srd_id; other fields are kept."""
+    spell = None
+    if isinstance(entry, str):
+        spell = SPELLS_BY_NAME.get(name_key(entry))
+        fields = {'name': entry}
+    elif isinstance(entry, dict) and entry.get('name'):
+        spell = SPELLS_BY_ID.get(entry['srd_id']) if entry.get('srd_id') else SPELLS_BY_NAME.get(name_key(entry['name']))
+        fields = entry
+    if spell is None:
+        return entry
+    reference = {'srd_id': spell['id']}
+    reference.update({k: v for k, v in fields.items() if k not in TEXT_FIELDS})
+    reference.setdefault('level', spell['level'])
+    return reference
+
+
+def inlined_spell(entry):
+    """A referenced SRD spell entry with the catalog's text put back."""
+    spell = SPELLS_BY_ID.get(entry.get('srd_id')) if isinstance(entry, dict) else None
+    if spell is None:
+        return entry
+    return {**{k: spell[k] for k in CATALOG_FIELDS}, **entry}
+
+
+def rewrite_spells(rewrite):
+    connection = op.get_bind()
+    result = connection.execute(
+        sa.select(characters.c.id, characters.c.spells)
+        .where(characters.c.spells.isnot(None))
+        .execution_options(yield_per=500)
+    )
+    for batch in result.partitions():
+        updates = []
+        for character_id, spells in batch:
+            rewritten = {
+                group: [rewrite(entry) for entry in entries] if isinstance(entries, list) else entries
+                for group, entries in spells.items()
+            } if isinstance(spells, dict) else spells
+            if rewritten != spells:
+                updates.append({'character_id': character_id, 'new_spells': rewritten})
+        if updates:
+            connection.execute(
+                characters.update()
+                .where(characters.c.id == sa.bindparam('character_id'))
+                .values(spells=sa.bindparam('new_spells')),
+                updates
+            )
+
+
+def upgrade() -> None:
+    rewrite_spells(spell_reference)
+    op.get_bind().execute(
+        character_spells.update()
+        .where(character_spells.c.name_key == sa.bindparam('key'), character_spells.c.srd_id.is_(None))
+        .values(srd_id=sa.bindparam('spell_id')),
+        [{'key': key, 'spell_id': spell['id']} for key, spell in SPELLS_BY_NAME.items()]
+    )
+
+
+def downgrade() -> None:
+    rewrite_spells(inlined_spell)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import auth, users, campaigns, characters, places, items, quests, sessions, notes, dndbeyond
+from .endpoints import auth, users, campaigns, characters, places, items, quests, sessions, notes, dndbeyond, encounters, dice, srd, inventory, files, routes, jobs, revisions
 
 api_router = APIRouter()
 
@@ -7,9 +7,17 @@ api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(campaigns.router, prefix="/campaigns", tags=["campaigns"])
 api_router.include_router(characters.router, prefix="/characters", tags=["characters"])
+api_router.include_router(inventory.router, prefix="/characters", tags=["inventory"])
 api_router.include_router(places.router, prefix="/places", tags=["places"])
+api_router.include_router(routes.router, prefix="/routes", tags=["routes"])
 api_router.include_router(items.router, prefix="/items", tags=["items"])
 api_router.include_router(quests.router, prefix="/quests", tags=["quests"])
 api_router.include_router(sessions.router, prefix="/sessions", tags=["sessions"])
 api_router.include_router(notes.router, prefix="/notes", tags=["notes"])
 api_router.include_router(dndbeyond.router, prefix="/dndbeyond", tags=["dndbeyond"])
+api_router.include_router(encounters.router, prefix="/encounters", tags=["encounters"])
+api_router.include_router(dice.router, prefix="/dice", tags=["dice"])
+api_router.include_router(srd.router, prefix="/srd", tags=["srd"])
+api_router.include_router(files.router, prefix="/files", tags=["files"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(revisions.router, prefix="/revisions", tags=["revisions"])
@@ -0,0 +1,162 @@
+"""
+Shared implementation of the bulk create/update/delete endpoints.
+
+Each request is authorized once per campaign and written in a single
+transaction with one statement per table. Problems with individual rows are
+collected and reported together in FastAPI's validation error format, with
+the row index in "loc", and nothing is written.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, delete, insert, select, update, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import ONETOMANY
+
+from ..core.database import Versioned
+from ..models import User, CampaignRole
+from ..services import revisions
+from .endpoints.campaigns import check_campaign_access
+
+
+def row_error(field: str, index: int, msg: str, *loc) -> Dict[str, Any]:
+    return {"loc": ["body", field, index, *loc], "msg": msg, "type": "value_error"}
+
+
+def raise_row_errors(errors: List[Dict[str, Any]], status_code: int = 422):
+    if errors:
+        raise HTTPException(status_code=status_code, detail=errors)
+
+
+def insert_rows(db: Session, model, rows: List[Dict[str, Any]]) -> List[Any]:
+    """
+    INSERT all rows in one statement and return the new objects in input order.
+
+    sort_by_parameter_order would make SQLAlchemy fall back to one INSERT per
+    row on SQLite; ids from a single multi-row INSERT are ascending in row
+    order, so sorting on them gives the same result.
+    """
+    return sorted(db.scalars(insert(model).returning(model), rows), key=lambda obj: obj.id)
+
+
+def load_rows(db: Session, model, ids: List[int], field: str, *loc) -> Dict[int, Any]:
+    """Load rows by id in one query; ids that do not exist are row errors."""
+    found = {obj.id: obj for obj in db.query(model).filter(model.id.in_(ids))}
+    raise_row_errors([
+        row_error(field, i, f"{model.__name__} {row_id} not found", *loc)
+        for i, row_id in enumerate(ids) if row_id not in found
+    ], status_code=404)
+    return found
+
+
+def reload_rows(db: Session, model, ids: List[int]) -> List[Any]:
+    """Fetch rows by id in one query, in the order of ids, overwriting loaded state."""
+    rows = {obj.id: obj for obj in db.query(model).populate_existing().filter(model.id.in_(ids))}
+    return [rows[row_id] for row_id in ids if row_id in rows]
+
+
+def authorize_campaigns(
+    db: Session, campaign_ids: Iterable[int], user: User, required_role: Optional[CampaignRole] = None
+):
+    """Check campaign access once for every distinct campaign."""
+    for campaign_id in set(campaign_ids):
+        check_campaign_access(campaign_id, user, db, required_role)
+
+
+def duplicate_id_errors(ids: List[int], field: str, *loc) -> List[Dict[str, Any]]:
+    seen = set()
+    errors = []
+    for i, row_id in enumerate(ids):
+        if row_id in seen:
+            errors.append(row_error(field, i, f"Duplicate id {row_id}", *loc))
+        seen.add(row_id)
+    return errors
+
+
+def version_errors(rows: List[Dict[str, Any]], loaded: Dict[int, Any], field: str) -> List[Dict[str, Any]]:
+    """Row errors for rows whose "version" is not the current version of the loaded row."""
+    return [
+        row_error(field, i, f"Row has changed (now version {loaded[row['id']].version})", "version")
+        for i, row in enumerate(rows)
+        if row.get("version") is not None and row["version"] != loaded[row["id"]].version
+    ]
+
+
+def update_rows(db: Session, model, rows: List[Dict[str, Any]], loaded: Optional[Dict[int, Any]] = None):
+    """
+    UPDATE rows by primary key as one executemany; each row holds its id and changed fields.
+
+    Versioned models need the loaded rows: every row is updated only if it
+    still has the loaded version, which is incremented, with one executemany
+    per set of changed fields. If another writer got to any row first the
+    request fails with 412; otherwise the changes are recorded as revisions.
+    """
+    if not issubclass(model, Versioned):
+        db.execute(update(model), rows)
+        return
+
+    table = model.__table__
+    columns = inspect(model).columns
+    groups: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        groups[tuple(sorted(key for key in row if key not in ("id", "version")))].append(row)
+
+    matched = 0
+    for fields, group in groups.items():
+        stmt = update(table).where(
+            table.c.id == bindparam("row_id"), table.c.version == bindparam("row_version")
+        ).values(
+            {**{columns[key]: bindparam(f"new_{key}") for key in fields}, table.c.version: table.c.version + 1}
+        )
+        matched += db.execute(stmt, [
+            {"row_id": row["id"], "row_version": loaded[row["id"]].version,
+             **{f"new_{key}": row[key] for key in fields}}
+            for row in group
+        ]).rowcount
+    if matched != len(rows):
+        raise HTTPException(status_code=412, detail="Some rows were changed by someone else; reload them and try again")
+    revisions.record(db, [
+        revisions.revision_of(loaded[row["id"]], {
+            key: (getattr(loaded[row["id"]], key), value) for key, value in row.items() if key not in ("id", "version")
+        })
+        for row in rows
+    ])
+
+
+def delete_where(db: Session, model, condition):
+    """
+    DELETE the rows matching condition, following the model's one-to-many
+    relationships the way the ORM would: delete-cascaded children are
+    removed first, other children have their foreign key set to NULL.
+    Revisions of deleted rows are deleted with them.
+    """
+    ids = select(model.id).where(condition)
+    for relationship in inspect(model).relationships:
+        if relationship.direction is not ONETOMANY:
+            continue
+        child = relationship.mapper.class_
+        for _, remote in relationship.local_remote_pairs:
+            if relationship.cascade.delete:
+                delete_where(db, child, remote.in_(ids))
+            else:
+                values = {remote.name: None}
+                if issubclass(child, Versioned):
+                    values["version"] = child.version + 1
+                    orphans = db.execute(
+                        select(child.id, child.campaign_id, child.version, remote.label("ref")).where(remote.in_(ids))
+                    )
+                    revisions.record(db, [
+                        revisions.revision(
+                            child, row.id, row.campaign_id, row.version + 1, {remote.name: (row.ref, None)}
+                        )
+                        for row in orphans
+                    ])
+                db.execute(
+                    update(child).where(remote.in_(ids)).values(values)
+                    .execution_options(synchronize_session=False)
+                )
+    if issubclass(model, Versioned):
+        revisions.forget(db, model, ids)
+    db.execute(delete(model).where(condition).execution_options(synchronize_session=False))
@@ -0,0 +1,40 @@
+"""
+Optimistic concurrency for campaign entities (models with core.database.Versioned).
+
+An entity's version is sent as the ETag of its GET and PUT responses and
+in the body. To make sure an edit does not overwrite someone else's, send
+it back in an If-Match header on PUT/PATCH (or as "version" in bulk update
+rows): if the row has changed since, the request fails with 412
+Precondition Failed and nothing is written. The UPDATE itself only
+matches the version that was read, so a writer committing between the
+check and the UPDATE is caught too, without locking the row.
+"""
+
+from typing import Optional
+
+from fastapi import HTTPException, Response
+
+from ..core.compression import strong_etag_matches
+
+
+def etag(obj) -> str:
+    return f'"{obj.version}"'
+
+
+def set_etag(response: Response, obj):
+    response.headers["ETag"] = etag(obj)
+
+
+def check_if_match(obj, if_match: Optional[str]):
+    """
+    Raise 412 unless the If-Match header (if any) names the object's current
+    version. Tags of compressed responses ("3-gzip") name it too; weak tags
+    (W/"3") never do.
+    """
+    if if_match is None:
+        return
+    if not strong_etag_matches(if_match, str(obj.version)):
+        raise HTTPException(
+            status_code=412,
+            detail=f"{type(obj).__name__} {obj.id} has changed (now version {obj.version}); reload it and try again"
+        )
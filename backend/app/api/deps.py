@@ -31,6 +31,8 @@ def get_current_user(
     if user is None:
         raise credentials_exception
 
+    # Revisions written in this session are attributed to the user
+    db.info["user_id"] = user.id
     return user
 
 
@@ -3,7 +3,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
-from ...core import get_db, verify_password, get_password_hash, create_access_token, settings
+from ...core import get_db, save, verify_password, get_password_hash, create_access_token, settings
 from ...models import User
 from ...schemas import UserCreate, User as UserSchema, Token
 
@@ -31,10 +31,7 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
         username=user_in.username,
         hashed_password=get_password_hash(user_in.password)
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    return save(db, user)
 
 
 @router.post("/login", response_model=Token)
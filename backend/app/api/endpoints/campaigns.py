@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-
-from ...core import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
+
+from ...core import get_db, save, settings
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
 from ...models import Campaign as CampaignModel, User, CampaignMember, CampaignRole
 from ...schemas import Campaign, CampaignCreate, CampaignUpdate, CampaignDetail, CampaignMemberCreate
 from ...api.deps import get_current_active_user
+from ...api.concurrency import check_if_match, set_etag
+from ...services import jobs
+from ...services.campaign_archive import export_campaign, import_campaign, ArchiveError
+from ...services.campaign_purge import PURGE_JOB, purge_cutoff
 
 router = APIRouter()
 
@@ -35,6 +45,40 @@ def check_campaign_access(campaign_id: int, user: User, db: Session, required_ro
     return campaign
 
 
+def load_campaign_detail(db: Session, campaign_id: int):
+    """
+    Load a campaign with its owner and members (with their users) for
+    CampaignDetail in two queries: campaign joined with owner, then members
+    joined with users.
+    """
+    return db.query(CampaignModel).options(
+        joinedload(CampaignModel.owner),
+        selectinload(CampaignModel.members).joinedload(CampaignMember.user)
+    ).filter(CampaignModel.id == campaign_id).first()
+
+
+def live_campaign_ids():
+    """Select the ids of campaigns that are not deleted."""
+    return select(CampaignModel.id).where(CampaignModel.deleted_at.is_(None))
+
+
+def managed_campaign_ids(user: User):
+    """
+    Select the ids of campaigns the user owns or is a DM of, leaving out
+    deleted ones (this is a Core SELECT, so the soft-delete criteria of ORM
+    queries do not apply).
+    """
+    owned = live_campaign_ids().where(CampaignModel.owner_id == user.id)
+    dm_of = select(CampaignMember.campaign_id).join(
+        CampaignModel, CampaignModel.id == CampaignMember.campaign_id
+    ).where(
+        CampaignMember.user_id == user.id,
+        CampaignMember.role == CampaignRole.DM,
+        CampaignModel.deleted_at.is_(None)
+    )
+    return owned.union(dm_of)
+
+
 @router.post("", response_model=Campaign, status_code=status.HTTP_201_CREATED)
 def create_campaign(
     campaign_in: CampaignCreate,
@@ -43,13 +87,36 @@ def create_campaign(
 ):
     """Create a new campaign."""
     campaign = CampaignModel(**campaign_in.dict(), owner_id=current_user.id)
-    db.add(campaign)
-    db.commit()
-    db.refresh(campaign)
-    return campaign
+    return save(db, campaign)
+
+
+@router.post("/import", response_model=Campaign, status_code=status.HTTP_201_CREATED)
+def import_campaign_archive(
+    archive: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import a campaign archive produced by GET /campaigns/{id}/export.
+
+    Creates a new campaign owned by the current user. The import runs in a
+    single transaction: nothing is stored if any record is invalid.
+    """
+    try:
+        campaign_id = import_campaign(db, archive.file, current_user.id)
+        db.commit()
+    except ArchiveError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Archive contains incomplete records")
+
+    return db.get(CampaignModel, campaign_id)
 
 
 @router.get("", response_model=List[Campaign])
+@query_budget(4)
 def list_campaigns(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -67,39 +134,86 @@ def list_campaigns(
 
     # Combine and return
     all_campaigns = list(set(owned + member_campaigns))
-    return all_campaigns[skip:skip + limit]
+    return json_list(Campaign, all_campaigns[skip:skip + limit])
+
+
+@router.get("/deleted", response_model=List[Campaign])
+@query_budget(2)
+def list_deleted_campaigns(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """List the user's deleted campaigns that can still be restored."""
+    return json_list(Campaign, db.query(CampaignModel).filter(
+        CampaignModel.owner_id == current_user.id,
+        CampaignModel.deleted_at > purge_cutoff()
+    ).execution_options(include_deleted=True).order_by(CampaignModel.deleted_at.desc()).all())
 
 
 @router.get("/{campaign_id}", response_model=CampaignDetail)
+@query_budget(3)
 def get_campaign(
     campaign_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific campaign with details."""
-    campaign = check_campaign_access(campaign_id, current_user, db)
+    campaign = load_campaign_detail(db, campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    # Same rule as check_campaign_access, using the members already loaded
+    if campaign.owner_id != current_user.id and not any(
+        member.user_id == current_user.id for member in campaign.members
+    ):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    set_etag(response, campaign)
     return campaign
 
 
+@router.get("/{campaign_id}/export")
+def export_campaign_archive(
+    campaign_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Stream a campaign and all its content as NDJSON (owner or DM only)."""
+    check_campaign_access(campaign_id, current_user, db, CampaignRole.DM)
+    return StreamingResponse(
+        export_campaign(campaign_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="campaign-{campaign_id}.ndjson"'}
+    )
+
+
 @router.put("/{campaign_id}", response_model=Campaign)
 def update_campaign(
     campaign_id: int,
     campaign_update: CampaignUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Update a campaign (owner or DM only)."""
+    """
+    Update a campaign (owner or DM only).
+
+    Send its ETag as If-Match to fail with 412 if it has changed since.
+    """
     campaign = check_campaign_access(campaign_id, current_user, db, CampaignRole.DM)
 
     # Only owner can update
     if campaign.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only campaign owner can update")
+    check_if_match(campaign, if_match)
 
     for field, value in campaign_update.dict(exclude_unset=True).items():
         setattr(campaign, field, value)
 
-    db.commit()
-    db.refresh(campaign)
+    save(db, campaign)
+    set_etag(response, campaign)
     return campaign
 
 
@@ -109,17 +223,58 @@ def delete_campaign(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Delete a campaign (owner only)."""
+    """
+    Delete a campaign (owner only).
+
+    The campaign disappears at once but is only marked deleted: it can be
+    restored for CAMPAIGN_PURGE_DELAY_HOURS, after which a background job
+    purges it and all its content.
+    """
     campaign = check_campaign_access(campaign_id, current_user, db)
 
     if campaign.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only campaign owner can delete")
 
-    db.delete(campaign)
-    db.commit()
+    campaign.deleted_at = datetime.now(timezone.utc)
+    # Commits the deletion and the job together
+    jobs.enqueue(
+        db, PURGE_JOB, {"campaign_id": campaign_id}, current_user.id,
+        run_at=campaign.deleted_at + timedelta(hours=settings.CAMPAIGN_PURGE_DELAY_HOURS)
+    )
     return None
 
 
+@router.post("/{campaign_id}/restore", response_model=Campaign)
+def restore_campaign(
+    campaign_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Restore a deleted campaign before it is purged (owner only)."""
+    # Only while the purge is not due, so a purge that has started is never undone halfway
+    restored = db.execute(
+        update(CampaignModel)
+        .where(
+            CampaignModel.id == campaign_id,
+            CampaignModel.owner_id == current_user.id,
+            CampaignModel.deleted_at > purge_cutoff()
+        )
+        .values(deleted_at=None, version=CampaignModel.version + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not restored:
+        deleted = db.query(CampaignModel.id).filter(
+            CampaignModel.id == campaign_id,
+            CampaignModel.owner_id == current_user.id,
+            CampaignModel.deleted_at.isnot(None)
+        ).execution_options(include_deleted=True).first()
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Deleted campaign not found")
+        raise HTTPException(status_code=410, detail="The campaign is being purged and can no longer be restored")
+    db.commit()
+    return db.get(CampaignModel, campaign_id)
+
+
 @router.post("/{campaign_id}/members", status_code=status.HTTP_201_CREATED)
 def add_campaign_member(
     campaign_id: int,
@@ -144,10 +299,7 @@ def add_campaign_member(
         raise HTTPException(status_code=400, detail="User is already a member")
 
     member = CampaignMember(campaign_id=campaign_id, **member_in.dict())
-    db.add(member)
-    db.commit()
-    db.refresh(member)
-    return member
+    return save(db, member)
 
 
 @router.delete("/{campaign_id}/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,15 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy import select, update, case, func, and_, or_, cast, literal, Text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.types import JSON
+from typing import List, Optional
 
-from ...core import get_db
-from ...models import Character as CharacterModel, User
-from ...schemas import Character, CharacterCreate, CharacterUpdate
+from ...core import get_db, save
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
+from ...models import Character as CharacterModel, CharacterSpell, CharacterFeature, User
+from ...schemas import (
+    Character, CharacterCreate, CharacterUpdate, CharacterBulkCreate, CharacterBulkUpdate, BulkDelete,
+    HitPointOperation, HitPointChange, HitPointBatchChange, HitPointState,
+    SpellSlotChange, SpellSlotState, DerivedStats,
+)
 from ...api.deps import get_current_active_user
-from .campaigns import check_campaign_access
+from ...api.concurrency import check_if_match, set_etag
+from ...api.bulk import (
+    row_error, raise_row_errors, insert_rows, load_rows, reload_rows,
+    authorize_campaigns, duplicate_id_errors, update_rows, version_errors, delete_where,
+)
+from ...services.derived_stats import derived_stats_cache
+from ...services.character_index import index_character, index_characters, name_key
+from ...services.srd import get_catalog
+from .campaigns import check_campaign_access, live_campaign_ids, managed_campaign_ids
 
 router = APIRouter()
 
+# Columns needed to compute derived stats; the rest of the sheet is not loaded
+DERIVED_STAT_COLUMNS = (
+    CharacterModel.name,
+    CharacterModel.campaign_id,
+    CharacterModel.level,
+    CharacterModel.stats,
+    CharacterModel.skills,
+    CharacterModel.saving_throws,
+    CharacterModel.spellcasting_ability,
+    CharacterModel.version,
+)
+
+
+def derived_stats_response(character: CharacterModel) -> dict:
+    return {"character_id": character.id, "name": character.name, **derived_stats_cache.get(character)}
+
 
 @router.post("", response_model=Character, status_code=status.HTTP_201_CREATED)
 def create_character(
@@ -22,13 +55,100 @@ def create_character(
     check_campaign_access(character_in.campaign_id, current_user, db)
 
     character = CharacterModel(**character_in.dict(), creator_id=current_user.id)
+    character.spells = get_catalog().compact_spells(character.spells)
     db.add(character)
+    db.flush()
+    index_character(db, character)
+    return save(db, character)
+
+
+@router.post("/bulk", response_model=List[Character], status_code=status.HTTP_201_CREATED)
+def bulk_create_characters(
+    bulk_in: CharacterBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create many characters (e.g. a batch of NPCs) in one campaign in a single transaction."""
+    check_campaign_access(bulk_in.campaign_id, current_user, db)
+
+    catalog = get_catalog()
+    rows = [
+        {
+            **character_in.dict(),
+            "spells": catalog.compact_spells(character_in.spells),
+            "campaign_id": bulk_in.campaign_id,
+            "creator_id": current_user.id,
+        }
+        for character_in in bulk_in.characters
+    ]
+    characters = insert_rows(db, CharacterModel, rows)
+    index_characters(db, characters)
     db.commit()
-    db.refresh(character)
-    return character
+    return characters
+
+
+@router.patch("/bulk", response_model=List[Character])
+def bulk_update_characters(
+    bulk_in: CharacterBulkUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Update many characters in a single transaction. Only the creator may update a character."""
+    rows = [row.dict(exclude_unset=True) for row in bulk_in.characters]
+    ids = [row["id"] for row in rows]
+    raise_row_errors(duplicate_id_errors(ids, "characters", "id"))
+
+    characters = load_rows(db, CharacterModel, ids, "characters", "id")
+    authorize_campaigns(db, (character.campaign_id for character in characters.values()), current_user)
+    raise_row_errors([
+        row_error("characters", i, "Not authorized to update this character", "id")
+        for i, character_id in enumerate(ids) if characters[character_id].creator_id != current_user.id
+    ], status_code=403)
+
+    catalog = get_catalog()
+    for row in rows:
+        if row.get("spells"):
+            row["spells"] = catalog.compact_spells(row["spells"])
+    raise_row_errors(version_errors(rows, characters, "characters"), status_code=412)
+    update_rows(db, CharacterModel, rows, characters)
+    updated = reload_rows(db, CharacterModel, ids)
+
+    spells = [character for character, row in zip(updated, rows) if "spells" in row]
+    features = [character for character, row in zip(updated, rows) if "features" in row]
+    if spells:
+        index_characters(db, spells, features=False)
+    if features:
+        index_characters(db, features, spells=False)
+
+    db.commit()
+    for character_id in ids:
+        derived_stats_cache.invalidate(character_id)
+    return updated
+
+
+@router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
+def bulk_delete_characters(
+    bulk_in: BulkDelete,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete many characters in a single transaction. Only the creator may delete a character."""
+    characters = load_rows(db, CharacterModel, bulk_in.ids, "ids")
+    authorize_campaigns(db, (character.campaign_id for character in characters.values()), current_user)
+    raise_row_errors([
+        row_error("ids", i, "Not authorized to delete this character")
+        for i, character_id in enumerate(bulk_in.ids) if characters[character_id].creator_id != current_user.id
+    ], status_code=403)
+
+    delete_where(db, CharacterModel, CharacterModel.id.in_(list(characters)))
+    db.commit()
+    for character_id in characters:
+        derived_stats_cache.invalidate(character_id)
+    return None
 
 
 @router.get("/campaign/{campaign_id}", response_model=List[Character])
+@query_budget(4)
 def list_campaign_characters(
     campaign_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -43,12 +163,82 @@ def list_campaign_characters(
     if not include_npcs:
         query = query.filter(CharacterModel.is_npc == False)
 
-    return query.all()
+    return json_list(Character, query.all())
+
+
+@router.get("/campaign/{campaign_id}/search", response_model=List[Character])
+@query_budget(4)
+def search_campaign_characters(
+    campaign_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+    spell: Optional[str] = None,
+    feature: Optional[str] = None
+):
+    """
+    Find characters that know a spell and/or have a feature, by exact name
+    (case-insensitive), e.g. ?spell=Revivify or ?feature=Lucky.
+    """
+    if not spell and not feature:
+        raise HTTPException(status_code=400, detail="Provide a spell or feature to search for")
+
+    check_campaign_access(campaign_id, current_user, db)
+
+    query = db.query(CharacterModel).filter(CharacterModel.campaign_id == campaign_id)
+    if spell:
+        query = query.filter(CharacterModel.id.in_(
+            select(CharacterSpell.character_id).where(CharacterSpell.name_key == name_key(spell))
+        ))
+    if feature:
+        query = query.filter(CharacterModel.id.in_(
+            select(CharacterFeature.character_id).where(CharacterFeature.name_key == name_key(feature))
+        ))
+    return json_list(Character, query.all())
+
+
+@router.get("/campaign/{campaign_id}/derived-stats", response_model=List[DerivedStats])
+@query_budget(4)
+def list_campaign_derived_stats(
+    campaign_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+    include_npcs: bool = False
+):
+    """Compute derived stats for every character in a campaign in one pass."""
+    check_campaign_access(campaign_id, current_user, db)
+
+    query = db.query(CharacterModel).options(load_only(*DERIVED_STAT_COLUMNS)).filter(
+        CharacterModel.campaign_id == campaign_id
+    )
+    if not include_npcs:
+        query = query.filter(CharacterModel.is_npc == False)
+
+    return [derived_stats_response(c) for c in query]
+
+
+@router.get("/{character_id}/derived-stats", response_model=DerivedStats)
+@query_budget(4)
+def get_character_derived_stats(
+    character_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get ability modifiers, skill totals, passive perception and spellcasting numbers."""
+    character = db.query(CharacterModel).options(load_only(*DERIVED_STAT_COLUMNS)).filter(
+        CharacterModel.id == character_id
+    ).first()
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
+
+    check_campaign_access(character.campaign_id, current_user, db)
+    return derived_stats_response(character)
 
 
 @router.get("/{character_id}", response_model=Character)
+@query_budget(4)
 def get_character(
     character_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -59,6 +249,7 @@ def get_character(
 
     # Check campaign access
     check_campaign_access(character.campaign_id, current_user, db)
+    set_etag(response, character)
     return character
 
 
@@ -66,10 +257,12 @@ def get_character(
 def update_character(
     character_id: int,
     character_update: CharacterUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Update a character."""
+    """Update a character. Send its ETag as If-Match to fail with 412 if it has changed since."""
     character = db.query(CharacterModel).filter(CharacterModel.id == character_id).first()
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
@@ -81,12 +274,20 @@ def update_character(
     # TODO: Add DM check
     if character.creator_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this character")
+    check_if_match(character, if_match)
 
-    for field, value in character_update.dict(exclude_unset=True).items():
+    update_data = character_update.dict(exclude_unset=True)
+    if update_data.get("spells"):
+        update_data["spells"] = get_catalog().compact_spells(update_data["spells"])
+    for field, value in update_data.items():
         setattr(character, field, value)
 
-    db.commit()
-    db.refresh(character)
+    if "spells" in update_data or "features" in update_data:
+        index_character(db, character, spells="spells" in update_data, features="features" in update_data)
+
+    save(db, character)
+    derived_stats_cache.invalidate(character.id)
+    set_etag(response, character)
     return character
 
 
@@ -110,4 +311,181 @@ def delete_character(
 
     db.delete(character)
     db.commit()
+    derived_stats_cache.invalidate(character_id)
     return None
+
+
+def editable_characters(user: User):
+    """
+    Filter for characters the user may change: their own or any in a campaign
+    they run. Characters of deleted campaigns are left out.
+    """
+    return or_(
+        and_(CharacterModel.creator_id == user.id, CharacterModel.campaign_id.in_(live_campaign_ids())),
+        CharacterModel.campaign_id.in_(managed_campaign_ids(user))
+    )
+
+
+def raise_not_editable(character_id: int, user: User, db: Session):
+    """Explain why a guarded UPDATE matched no row for a single character."""
+    character = db.query(CharacterModel).options(
+        load_only(CharacterModel.campaign_id, CharacterModel.creator_id)
+    ).filter(CharacterModel.id == character_id).first()
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
+
+    check_campaign_access(character.campaign_id, user, db)
+    raise HTTPException(status_code=403, detail="Not authorized to update this character")
+
+
+def hit_point_values(change: HitPointChange) -> dict:
+    """
+    Build SET expressions for a hit point change.
+
+    Every expression reads the pre-update column values, so the whole change
+    is applied by the database in a single UPDATE. Damage is absorbed by
+    temporary hit points first, healing is capped at maximum hit points.
+    Unset current hit points count as maximum; if both are unset, current
+    hit points stay unset.
+    """
+    amount = change.amount
+    current = func.coalesce(CharacterModel.hit_points_current, CharacterModel.hit_points_max)
+    temp = func.coalesce(CharacterModel.hit_points_temp, 0)
+
+    if change.operation == HitPointOperation.DAMAGE:
+        overflow = amount - temp
+        return {
+            "hit_points_temp": case((temp > amount, temp - amount), else_=0),
+            "hit_points_current": case(
+                (current.is_(None), None),
+                (overflow <= 0, current),
+                (current > overflow, current - overflow),
+                else_=0
+            ),
+        }
+
+    if change.operation == HitPointOperation.HEAL:
+        healed = current + amount
+        return {
+            "hit_points_current": case(
+                (and_(CharacterModel.hit_points_max.isnot(None), healed > CharacterModel.hit_points_max),
+                 CharacterModel.hit_points_max),
+                else_=healed
+            ),
+        }
+
+    return {"hit_points_temp": amount}
+
+
+def apply_hit_point_change(db: Session, user: User, character_ids: List[int], change: HitPointChange):
+    """Apply a hit point change to characters with one UPDATE ... RETURNING."""
+    stmt = (
+        update(CharacterModel)
+        .where(CharacterModel.id.in_(character_ids), editable_characters(user))
+        .values(**hit_point_values(change), version=CharacterModel.version + 1)
+        .returning(
+            CharacterModel.id,
+            CharacterModel.hit_points_current,
+            CharacterModel.hit_points_max,
+            CharacterModel.hit_points_temp,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    rows = db.execute(stmt).all()
+    db.commit()
+    return rows
+
+
+def spell_slot_used_value(db: Session, level: str, used):
+    """Build a JSON expression that sets spell_slots[level].used in place."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(
+            func.jsonb_set(
+                cast(CharacterModel.spell_slots, JSONB),
+                literal([level, "used"], ARRAY(Text)),
+                func.to_jsonb(used)
+            ),
+            JSON
+        )
+    return func.json_set(CharacterModel.spell_slots, f'$."{level}".used', used)
+
+
+def spell_slot_conflict(spell_slots, level: str, used: int) -> str:
+    """Explain why a spell slot change matched no row for an editable character."""
+    slot = (spell_slots or {}).get(level)
+    if not isinstance(slot, dict) or not isinstance(slot.get("max"), int):
+        return f"The character has no level {level} spell slots"
+    expended = slot.get("used") or 0
+    if used > 0:
+        return f"Only {max(slot['max'] - expended, 0)} level {level} spell slots left"
+    return f"Only {expended} level {level} spell slots are expended"
+
+
+@router.patch("/hit-points", response_model=List[HitPointState])
+def change_party_hit_points(
+    change: HitPointBatchChange,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Apply damage, healing or temporary hit points to many characters at once.
+
+    Intended for area-of-effect damage. Characters the user cannot edit are
+    skipped and left out of the response.
+    """
+    return apply_hit_point_change(db, current_user, change.character_ids, change)
+
+
+@router.patch("/{character_id}/hit-points", response_model=HitPointState)
+def change_hit_points(
+    character_id: int,
+    change: HitPointChange,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Apply damage, healing or temporary hit points to a character."""
+    rows = apply_hit_point_change(db, current_user, [character_id], change)
+    if not rows:
+        raise_not_editable(character_id, current_user, db)
+    return rows[0]
+
+
+@router.patch("/{character_id}/spell-slots", response_model=SpellSlotState)
+def change_spell_slots(
+    character_id: int,
+    change: SpellSlotChange,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Expend (positive `used`) or restore (negative `used`) spell slots of one level."""
+    level = str(change.level)
+    slot = CharacterModel.spell_slots[level]
+    new_used = func.coalesce(slot["used"].as_integer(), 0) + change.used
+
+    stmt = (
+        update(CharacterModel)
+        .where(
+            CharacterModel.id == character_id,
+            editable_characters(current_user),
+            new_used >= 0,
+            new_used <= slot["max"].as_integer()
+        )
+        .values(spell_slots=spell_slot_used_value(db, level, new_used), version=CharacterModel.version + 1)
+        .returning(CharacterModel.id, CharacterModel.spell_slots)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(stmt).first()
+    db.commit()
+
+    if row is None:
+        character = db.query(CharacterModel.spell_slots).filter(
+            CharacterModel.id == character_id,
+            editable_characters(current_user)
+        ).first()
+        if not character:
+            raise_not_editable(character_id, current_user, db)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=spell_slot_conflict(character.spell_slots, level, change.used)
+        )
+    return row
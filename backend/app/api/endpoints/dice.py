@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException
+
+from ...models import User
+from ...schemas import DiceRollRequest, DiceRollResult
+from ...api.deps import get_current_active_user
+from ...services.dice import compile_dice, summarize, DiceError
+
+router = APIRouter()
+
+# Individual roll logs are only returned for small batches
+MAX_LOGGED_ROLLS = 1000
+MAX_LOGGED_DICE = 100_000
+MAX_DICE_PER_REQUEST = 10_000_000
+
+
+@router.post("/roll", response_model=DiceRollResult)
+def roll_dice(
+    roll_in: DiceRollRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Roll a dice expression, e.g. "1d20+5", "4d6kh3", "1d20adv" or "1d8 slashing".
+
+    - mode "log": every die of every roll (up to 1000 rolls and 100,000 dice)
+    - mode "summary": mean, spread, percentiles and a histogram of the totals
+    """
+    try:
+        expression = compile_dice(roll_in.expression)
+    except DiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    dice_count = roll_in.count * sum(term.count for term in expression.terms)
+    if roll_in.mode == "log":
+        if roll_in.count > MAX_LOGGED_ROLLS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Roll logs are limited to {MAX_LOGGED_ROLLS} rolls; use summary mode"
+            )
+        if dice_count > MAX_LOGGED_DICE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Roll logs are limited to {MAX_LOGGED_DICE} dice; use summary mode"
+            )
+        rng = random.Random(roll_in.seed)
+        rolls = [expression.roll(rng) for _ in range(roll_in.count)]
+        return DiceRollResult(expression=expression.text, rolls=rolls)
+
+    if dice_count > MAX_DICE_PER_REQUEST:
+        raise HTTPException(status_code=400, detail="Too many dice in one request")
+
+    totals = expression.roll_many(roll_in.count, np.random.default_rng(roll_in.seed))
+    return DiceRollResult(expression=expression.text, summary=summarize(totals))
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from ...core import get_db
-from ...models import Character as CharacterModel, User
-from ...schemas import Character
+from ...core import get_db, settings
+from ...models import User
+from ...schemas import Job
 from ...api.deps import get_current_active_user
-from ...services import import_character_from_dndbeyond
+from ...services import jobs
+from ...services.dndbeyond import IMPORT_JOB
 from .campaigns import check_campaign_access
 
 router = APIRouter()
@@ -18,9 +19,10 @@ class DNDBeyondImport(BaseModel):
     cobalt_token: str = None
 
 
-@router.post("/import", response_model=Character, status_code=status.HTTP_201_CREATED)
-async def import_character(
+@router.post("/import", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def import_character(
     import_data: DNDBeyondImport,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -32,6 +34,10 @@ async def import_character(
     - character_url: Full D&D Beyond character URL
     - cobalt_token: (Optional) Your D&D Beyond Cobalt session token for private sheets
 
+    The import runs in the background. The response is the queued job; poll
+    GET /jobs/{id} (also in the Location header) until its status is
+    "succeeded", when its result holds the new character_id, or "failed".
+
     To get your Cobalt token:
     1. Log in to D&D Beyond
     2. Open browser DevTools (F12)
@@ -41,32 +47,6 @@ async def import_character(
     # Check campaign access
     check_campaign_access(import_data.campaign_id, current_user, db)
 
-    # Import character data
-    character_data = await import_character_from_dndbeyond(
-        import_data.character_url,
-        import_data.cobalt_token
-    )
-
-    if not character_data:
-        raise HTTPException(
-            status_code=400,
-            detail="Failed to import character from D&D Beyond. "
-                   "D&D Beyond character sheets require JavaScript to load data, which prevents web scraping. "
-                   "Please provide your Cobalt session token to access the character via D&D Beyond's API. "
-                   "To get your token: Log in to D&D Beyond → Open DevTools (F12) → Application → Cookies → "
-                   "Copy the 'CobaltSession' value."
-        )
-
-    # Create character in database
-    character = CharacterModel(
-        **character_data,
-        campaign_id=import_data.campaign_id,
-        creator_id=current_user.id,
-        dndbeyond_url=import_data.character_url
-    )
-
-    db.add(character)
-    db.commit()
-    db.refresh(character)
-
-    return character
+    job = jobs.enqueue(db, IMPORT_JOB, {**import_data.dict(), "user_id": current_user.id}, user_id=current_user.id)
+    response.headers["Location"] = f"{settings.API_V1_PREFIX}/jobs/{job.id}"
+    return job
@@ -0,0 +1,384 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy import select, update, case, func, or_
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from ...core import get_db, save, settings
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
+from ...models import (
+    Encounter as EncounterModel, Combatant as CombatantModel, Character as CharacterModel,
+    CharacterItem, Item, User, CampaignRole,
+)
+from ...schemas import (
+    Encounter, EncounterCreate, EncounterUpdate, EncounterDetail, EncounterTurn,
+    Combatant, CombatantCreate, CombatantUpdate,
+    EncounterSimulationRequest, EncounterSimulationResult,
+)
+from ...api.deps import get_current_active_user
+from ...api.concurrency import check_if_match, set_etag
+from ...services import encounter_turns
+from ...services.dice import compile_dice, DiceError
+from ...services.simulator import (
+    CombatProfile, MAX_SIMULATION_WORK, character_profile, run_simulation, simulation_work
+)
+from .campaigns import check_campaign_access, managed_campaign_ids
+
+router = APIRouter()
+
+
+def get_encounter(encounter_id: int, db: Session) -> EncounterModel:
+    """Fetch an encounter or raise 404."""
+    encounter = db.query(EncounterModel).filter(EncounterModel.id == encounter_id).first()
+    if not encounter:
+        raise HTTPException(status_code=404, detail="Encounter not found")
+    return encounter
+
+
+def get_managed_encounter(encounter_id: int, user: User, db: Session) -> EncounterModel:
+    """Fetch an encounter the user may run, with any cached turn state written back first."""
+    encounter_turns.evict(encounter_id, db)
+    encounter = get_encounter(encounter_id, db)
+    check_campaign_access(encounter.campaign_id, user, db, CampaignRole.DM)
+    return encounter
+
+
+def build_combatant(combatant_in: CombatantCreate, campaign_id: int, db: Session) -> CombatantModel:
+    """Create a combatant, taking its name from the linked character if not given."""
+    data = combatant_in.dict()
+    if combatant_in.character_id is not None:
+        character = db.query(CharacterModel).filter(
+            CharacterModel.id == combatant_in.character_id,
+            CharacterModel.campaign_id == campaign_id
+        ).first()
+        if not character:
+            raise HTTPException(status_code=400, detail="Character is not part of this campaign")
+        data["name"] = data["name"] or character.name
+    if not data["name"]:
+        raise HTTPException(status_code=400, detail="Combatant name is required")
+    return CombatantModel(**data)
+
+
+def active_combatant(encounter: EncounterModel):
+    """Return the combatant whose turn it is, if combat has started."""
+    if encounter.round == 0:
+        return None
+    return next((c for c in encounter.combatants if c.position == encounter.turn_index), None)
+
+
+def reorder_combatants(encounter: EncounterModel, db: Session, active: CombatantModel = None):
+    """Sort combatants by initiative and keep the active combatant's turn."""
+    db.flush()
+    combatants = list(encounter.combatants)
+    if active is None:
+        active = active_combatant(encounter)
+
+    combatants.sort(key=lambda c: (-c.initiative, c.id))
+    for position, combatant in enumerate(combatants):
+        combatant.position = position
+    # Keep the loaded collection in turn order, as it is returned without a reload
+    encounter.combatants.sort(key=lambda c: c.position)
+
+    if active in combatants:
+        encounter.turn_index = active.position
+    elif encounter.turn_index >= len(combatants):
+        encounter.turn_index = 0
+
+
+@router.post("", response_model=EncounterDetail, status_code=status.HTTP_201_CREATED)
+def create_encounter(
+    encounter_in: EncounterCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create an encounter, optionally with its combatants."""
+    check_campaign_access(encounter_in.campaign_id, current_user, db, CampaignRole.DM)
+
+    encounter = EncounterModel(**encounter_in.dict(exclude={"combatants"}))
+    encounter.combatants = [
+        build_combatant(c, encounter_in.campaign_id, db) for c in encounter_in.combatants
+    ]
+    db.add(encounter)
+    reorder_combatants(encounter, db)
+    return save(db, encounter)
+
+
+@router.post("/simulate", response_model=EncounterSimulationResult)
+def simulate_encounter(
+    simulation_in: EncounterSimulationRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Estimate how a fight between the party and a group of monsters will go.
+
+    Runs a Monte-Carlo simulation over the characters' armor class, hit points,
+    attack bonus and equipped weapon damage, and returns the party's win
+    probability, the expected number of rounds and per-character survival rates.
+    Simulations x rounds x attacks x combatants is capped per request.
+    """
+    check_campaign_access(simulation_in.campaign_id, current_user, db)
+
+    query = db.query(CharacterModel).filter(CharacterModel.campaign_id == simulation_in.campaign_id)
+    if simulation_in.character_ids:
+        query = query.filter(CharacterModel.id.in_(simulation_in.character_ids))
+    else:
+        query = query.filter(CharacterModel.is_npc == False, CharacterModel.is_active == True)
+    characters = query.all()
+    if not characters:
+        raise HTTPException(status_code=400, detail="No characters to simulate")
+
+    weapons = {}
+    equipped = db.query(CharacterItem.character_id, Item.damage).join(Item).filter(
+        CharacterItem.character_id.in_([c.id for c in characters]),
+        CharacterItem.is_equipped == True,
+        Item.damage.isnot(None)
+    ).order_by(CharacterItem.id)
+    for character_id, damage in equipped:
+        weapons.setdefault(character_id, damage)
+
+    enemies = []
+    for monster in simulation_in.monsters:
+        try:
+            compile_dice(monster.damage)
+        except DiceError as e:
+            raise HTTPException(status_code=400, detail=f"{monster.name}: {e}")
+        for i in range(monster.count):
+            name = monster.name if monster.count == 1 else f"{monster.name} {i + 1}"
+            enemies.append(CombatProfile(
+                name, monster.armor_class, monster.hit_points,
+                monster.attack_bonus, monster.damage, monster.attacks
+            ))
+
+    party = [character_profile(c, weapons.get(c.id)) for c in characters]
+    work = simulation_work(party + enemies, simulation_in.simulations, simulation_in.max_rounds)
+    if work > MAX_SIMULATION_WORK:
+        raise HTTPException(
+            status_code=400,
+            detail="Too large a simulation: lower simulations, max_rounds or the number of combatants"
+        )
+    return run_simulation(
+        party, enemies, simulation_in.simulations, simulation_in.max_rounds, simulation_in.seed
+    )
+
+
+@router.get("/campaign/{campaign_id}", response_model=List[Encounter])
+@query_budget(4)
+def list_campaign_encounters(
+    campaign_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """List all encounters in a campaign."""
+    check_campaign_access(campaign_id, current_user, db)
+    encounters = db.query(EncounterModel).filter(EncounterModel.campaign_id == campaign_id).all()
+
+    for encounter in encounters:
+        state = encounter_turns.get(encounter.id)
+        if state:
+            encounter.round, encounter.turn_index = state.round, state.turn_index
+    return json_list(Encounter, encounters)
+
+
+@router.get("/{encounter_id}", response_model=EncounterDetail)
+@query_budget(5)
+def get_encounter_detail(
+    encounter_id: int,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get an encounter with its combatants in turn order."""
+    encounter = get_encounter(encounter_id, db)
+    check_campaign_access(encounter.campaign_id, current_user, db)
+
+    state = encounter_turns.get(encounter_id)
+    if state:
+        encounter.round, encounter.turn_index = state.round, state.turn_index
+    set_etag(response, encounter)
+    return encounter
+
+
+@router.put("/{encounter_id}", response_model=Encounter)
+def update_encounter(
+    encounter_id: int,
+    encounter_update: EncounterUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Update an encounter. Send its ETag as If-Match to fail with 412 if it has changed since."""
+    encounter = get_managed_encounter(encounter_id, current_user, db)
+    check_if_match(encounter, if_match)
+
+    for field, value in encounter_update.dict(exclude_unset=True).items():
+        setattr(encounter, field, value)
+
+    save(db, encounter)
+    set_etag(response, encounter)
+    return encounter
+
+
+@router.delete("/{encounter_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_encounter(
+    encounter_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete an encounter."""
+    encounter = get_managed_encounter(encounter_id, current_user, db)
+    db.delete(encounter)
+    db.commit()
+    return None
+
+
+@router.post("/{encounter_id}/combatants", response_model=EncounterDetail, status_code=status.HTTP_201_CREATED)
+def add_combatant(
+    encounter_id: int,
+    combatant_in: CombatantCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Add a combatant and re-sort the turn order."""
+    encounter = get_managed_encounter(encounter_id, current_user, db)
+    encounter.combatants.append(build_combatant(combatant_in, encounter.campaign_id, db))
+    reorder_combatants(encounter, db)
+    return save(db, encounter)
+
+
+@router.patch("/{encounter_id}/combatants/{combatant_id}", response_model=EncounterDetail)
+def update_combatant(
+    encounter_id: int,
+    combatant_id: int,
+    combatant_update: CombatantUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Update a combatant's initiative, hit points or conditions."""
+    encounter = get_managed_encounter(encounter_id, current_user, db)
+    combatant = next((c for c in encounter.combatants if c.id == combatant_id), None)
+    if not combatant:
+        raise HTTPException(status_code=404, detail="Combatant not found")
+
+    for field, value in combatant_update.dict(exclude_unset=True).items():
+        setattr(combatant, field, value)
+
+    if combatant_update.initiative is not None:
+        reorder_combatants(encounter, db)
+
+    return save(db, encounter)
+
+
+@router.delete("/{encounter_id}/combatants/{combatant_id}", response_model=EncounterDetail)
+def remove_combatant(
+    encounter_id: int,
+    combatant_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Remove a combatant from the turn order."""
+    encounter = get_managed_encounter(encounter_id, current_user, db)
+    combatant = next((c for c in encounter.combatants if c.id == combatant_id), None)
+    if not combatant:
+        raise HTTPException(status_code=404, detail="Combatant not found")
+
+    # Removing the active combatant passes the turn to whoever acts next
+    active = active_combatant(encounter)
+    if active is combatant:
+        remaining = [c for c in encounter.combatants if c is not combatant]
+        active = next((c for c in remaining if c.position > combatant.position), None)
+        if active is None and remaining:
+            active = remaining[0]
+
+    encounter.combatants.remove(combatant)
+    reorder_combatants(encounter, db, active)
+    return save(db, encounter)
+
+
+@router.post("/{encounter_id}/next-turn", response_model=EncounterTurn)
+def next_turn(
+    encounter_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Advance to the next combatant, starting a new round after the last one.
+
+    The first call on a fresh encounter starts round 1. Runs a constant number
+    of queries regardless of the number of combatants.
+    """
+    if settings.ENCOUNTER_WRITE_BEHIND:
+        return next_turn_cached(encounter_id, current_user, db)
+
+    combatant_count = select(func.count(CombatantModel.id)).where(
+        CombatantModel.encounter_id == EncounterModel.id
+    ).scalar_subquery()
+    next_index = EncounterModel.turn_index + 1
+    new_round = or_(EncounterModel.round == 0, next_index >= combatant_count)
+
+    stmt = (
+        update(EncounterModel)
+        .where(
+            EncounterModel.id == encounter_id,
+            EncounterModel.campaign_id.in_(managed_campaign_ids(current_user)),
+            combatant_count > 0
+        )
+        .values(
+            turn_index=case((new_round, 0), else_=next_index),
+            round=case((new_round, EncounterModel.round + 1), else_=EncounterModel.round)
+        )
+        .returning(EncounterModel.round, EncounterModel.turn_index)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(stmt).first()
+
+    if row is None:
+        db.rollback()
+        encounter = get_encounter(encounter_id, db)
+        check_campaign_access(encounter.campaign_id, current_user, db, CampaignRole.DM)
+        raise HTTPException(status_code=409, detail="Encounter has no combatants")
+
+    combatant = db.query(CombatantModel).filter(
+        CombatantModel.encounter_id == encounter_id,
+        CombatantModel.position == row.turn_index
+    ).first()
+    db.commit()
+
+    return EncounterTurn(
+        encounter_id=encounter_id,
+        round=row.round,
+        turn_index=row.turn_index,
+        combatant=combatant
+    )
+
+
+def next_turn_cached(encounter_id: int, user: User, db: Session) -> EncounterTurn:
+    """Advance the turn in the write-behind cache, loading the encounter on first use."""
+    state = encounter_turns.get(encounter_id)
+    if state is None:
+        encounter = get_encounter(encounter_id, db)
+        check_campaign_access(encounter.campaign_id, user, db, CampaignRole.DM)
+        # A concurrent first call may have cached (and advanced) it already;
+        # put() keeps that state and the advance below applies to it
+        encounter_turns.put(
+            encounter_id,
+            encounter.campaign_id,
+            encounter.round,
+            encounter.turn_index,
+            [Combatant.model_validate(c).model_dump() for c in encounter.combatants]
+        )
+        encounter_turns.start(settings.ENCOUNTER_FLUSH_SECONDS)
+    else:
+        check_campaign_access(state.campaign_id, user, db, CampaignRole.DM)
+
+    state = encounter_turns.advance(encounter_id)
+    if state is None:
+        raise HTTPException(status_code=409, detail="Encounter has no combatants")
+
+    return EncounterTurn(
+        encounter_id=encounter_id,
+        round=state.round,
+        turn_index=state.turn_index,
+        combatant=state.current()
+    )
@@ -0,0 +1,208 @@
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+
+from ...core import get_db, save, settings
+from ...core.queryguard import query_budget
+from ...models import StoredFile as StoredFileModel, User
+from ...schemas import StoredFile, TileSet
+from ...api.deps import get_current_active_user
+from ...services.storage import (
+    IMAGE_FORMATS, THUMBNAIL_TYPE, UploadTooLarge, InvalidImage,
+    receive_upload, create_thumbnail, keep_upload, discard_upload,
+    file_path, thumbnail_path, file_response,
+)
+from ...services.tiles import TILE_TYPE, needs_tiles, schedule_tiling, is_scheduled, tile_path
+
+router = APIRouter()
+
+SHA256 = Path(pattern="^[0-9a-f]{64}$")
+
+
+def file_out(stored: StoredFileModel) -> dict:
+    url = f"{settings.API_V1_PREFIX}/files/{stored.sha256}"
+    columns = {column.key: getattr(stored, column.key) for column in StoredFileModel.__table__.columns}
+    return {**columns, "url": url, "thumbnail_url": f"{url}/thumbnail"}
+
+
+def get_stored_file(db: Session, sha256: str) -> StoredFileModel:
+    stored = db.query(StoredFileModel).filter(StoredFileModel.sha256 == sha256).first()
+    if not stored:
+        raise HTTPException(status_code=404, detail="File not found")
+    return stored
+
+
+def find_stored_file(db: Session, sha256: str) -> Optional[StoredFileModel]:
+    return db.query(StoredFileModel).filter(StoredFileModel.sha256 == sha256).first()
+
+
+def register_stored_file(db: Session, stored: StoredFileModel) -> Tuple[StoredFileModel, bool]:
+    """Insert a new file row; returns the row and whether it was created."""
+    try:
+        save(db, stored)
+    except IntegrityError:
+        # The same file was uploaded concurrently and registered first
+        db.rollback()
+        return get_stored_file(db, stored.sha256), False
+    return stored, True
+
+
+@router.post("", response_model=StoredFile, status_code=status.HTTP_201_CREATED)
+async def upload_file(
+    request: Request,
+    response: Response,
+    filename: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload an image (a map or a portrait) as the raw request body.
+
+    Send the file's own Content-Type (PNG, JPEG, WebP or GIF), not a form.
+    Files are stored once per content: uploading a file that already exists
+    returns it with status 200. Use the returned url in fields such as a
+    place's map_image_url.
+
+    Large images (maps) are also cut into zoomable tiles in the background;
+    see GET /files/{sha256}/tiles.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in IMAGE_FORMATS.values():
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send the image as the request body with Content-Type image/png, image/jpeg, image/webp or image/gif"
+        )
+    declared_size = request.headers.get("content-length")
+    if declared_size and declared_size.isdigit() and int(declared_size) > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Uploads are limited to {settings.MAX_UPLOAD_SIZE} bytes"
+        )
+
+    try:
+        upload = await receive_upload(request.stream(), settings.MAX_UPLOAD_SIZE)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+    # The session is synchronous: keep its round trips off the event loop
+    existing = await anyio.to_thread.run_sync(find_stored_file, db, upload.sha256)
+    if existing:
+        discard_upload(upload)
+        response.status_code = status.HTTP_200_OK
+        return file_out(existing)
+
+    try:
+        detected_type, width, height = await create_thumbnail(upload)
+    except InvalidImage as e:
+        discard_upload(upload)
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    keep_upload(upload)
+    tiled = needs_tiles(width, height)
+    stored = StoredFileModel(
+        sha256=upload.sha256,
+        content_type=detected_type,
+        size=upload.size,
+        width=width,
+        height=height,
+        tile_status="pending" if tiled else None,
+        original_name=filename,
+        uploaded_by_id=current_user.id,
+    )
+    stored, created = await anyio.to_thread.run_sync(register_stored_file, db, stored)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+        return file_out(stored)
+
+    if tiled:
+        schedule_tiling(stored.sha256)
+    return file_out(stored)
+
+
+@router.get("/{sha256}", response_class=Response)
+@query_budget(1)
+def get_file(request: Request, sha256: str = SHA256, db: Session = Depends(get_db)):
+    """
+    Download a file. Supports Range requests; responses are cacheable forever.
+
+    Files are addressed by the SHA-256 of their content, so the URL is only
+    known to those it was shared with and needs no Authorization header
+    (it is used directly in <img> tags).
+    """
+    stored = get_stored_file(db, sha256)
+    path = file_path(sha256)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="File not found")
+    return file_response(request, path, stored.content_type, sha256)
+
+
+@router.get("/{sha256}/thumbnail", response_class=Response)
+@query_budget(1)
+def get_thumbnail(request: Request, sha256: str = SHA256, db: Session = Depends(get_db)):
+    """Download a file's WebP thumbnail."""
+    get_stored_file(db, sha256)
+    path = thumbnail_path(sha256)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    return file_response(request, path, THUMBNAIL_TYPE, f"{sha256}.thumb")
+
+
+def tile_set(stored: StoredFileModel) -> dict:
+    return {
+        "sha256": stored.sha256,
+        "status": stored.tile_status,
+        "width": stored.width,
+        "height": stored.height,
+        "tile_size": settings.MAP_TILE_SIZE,
+        "levels": stored.tile_levels,
+        "url_template": f"{settings.API_V1_PREFIX}/files/{stored.sha256}/tiles/{{z}}/{{x}}/{{y}}.webp",
+    }
+
+
+@router.get("/{sha256}/tiles", response_model=TileSet)
+@query_budget(1)
+def get_tile_set(sha256: str = SHA256, db: Session = Depends(get_db)):
+    """
+    Describe an image's tile pyramid.
+
+    Level 0 fits the whole image in one tile and the last level (levels - 1)
+    is full resolution. Tiles are fetched from url_template once status is
+    "ready".
+    """
+    return tile_set(get_stored_file(db, sha256))
+
+
+@router.post("/{sha256}/tiles", response_model=TileSet, status_code=status.HTTP_202_ACCEPTED)
+def request_tiles(
+    response: Response,
+    sha256: str = SHA256,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Cut an image into tiles, e.g. a map too small to be tiled on upload or
+    one whose tiling failed. Only the user who uploaded the file may ask.
+    """
+    stored = get_stored_file(db, sha256)
+    if stored.uploaded_by_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only the user who uploaded this file can have it tiled")
+    if stored.tile_status == "ready":
+        response.status_code = status.HTTP_200_OK
+        return tile_set(stored)
+    if not is_scheduled(sha256):
+        stored.tile_status = "pending"
+        db.commit()
+        schedule_tiling(sha256)
+    return tile_set(stored)
+
+
+@router.get("/{sha256}/tiles/{level}/{x}/{y}.webp", response_class=Response)
+@query_budget(0)
+def get_tile(request: Request, level: int, x: int, y: int, sha256: str = SHA256):
+    """Download one map tile."""
+    path = tile_path(sha256, level, x, y)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Tile not found")
+    return file_response(request, path, TILE_TYPE, f"{sha256}.{level}.{x}.{y}")
@@ -0,0 +1,255 @@
+"""
+Character inventories.
+
+An inventory is the character's CharacterItem rows joined to their Item. It
+is read in one query, with the totals (carried weight, attuned items,
+equipped AC bonus) computed by window aggregates in the same SELECT. Add,
+remove and transfer take many items at once and run in a single
+transaction; quantities of the same item stack on one row.
+"""
+
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, delete, case, func, and_
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+
+from ...core import get_db
+from ...core.queryguard import query_budget
+from ...models import Character as CharacterModel, CharacterItem, Item, User
+from ...schemas import (
+    InventoryAdd, InventoryRemove, InventoryTransfer, InventoryEntryUpdate,
+    Inventory, InventoryTransferResult,
+)
+from ...api.deps import get_current_active_user
+from ...api.bulk import row_error, raise_row_errors, insert_rows, duplicate_id_errors
+from .campaigns import check_campaign_access
+from .characters import editable_characters, raise_not_editable
+
+router = APIRouter()
+
+ENTRY_COLUMNS = (
+    CharacterItem.id,
+    CharacterItem.item_id,
+    CharacterItem.quantity,
+    func.coalesce(CharacterItem.is_equipped, False).label("is_equipped"),
+    CharacterItem.notes,
+    CharacterItem.added_at,
+    Item.name,
+    Item.item_type,
+    Item.rarity,
+    Item.weight,
+    Item.ac_bonus,
+    func.coalesce(Item.requires_attunement, False).label("requires_attunement"),
+    func.coalesce(Item.is_magical, False).label("is_magical"),
+    Item.srd_id,
+)
+
+# Aggregated over the whole result, so every row carries the inventory totals
+_equipped = CharacterItem.is_equipped.is_(True)
+TOTAL_COLUMNS = (
+    func.sum(CharacterItem.quantity).over().label("item_count"),
+    func.sum(func.coalesce(Item.weight, 0) * CharacterItem.quantity).over().label("carried_weight"),
+    func.sum(case((and_(_equipped, Item.requires_attunement.is_(True)), 1), else_=0)).over().label("attuned_items"),
+    func.sum(case((_equipped, func.coalesce(Item.ac_bonus, 0)), else_=0)).over().label("equipped_ac_bonus"),
+)
+TOTAL_FIELDS = ("item_count", "carried_weight", "attuned_items", "equipped_ac_bonus")
+
+
+def load_inventory(db: Session, character_id: int) -> dict:
+    """A character's items and totals in one query."""
+    rows = db.execute(
+        select(*ENTRY_COLUMNS, *TOTAL_COLUMNS)
+        .join(Item, Item.id == CharacterItem.item_id)
+        .where(CharacterItem.character_id == character_id)
+        .order_by(Item.name, CharacterItem.id)
+    ).mappings().all()
+    items = [{key: row[key] for key in row.keys() if key not in TOTAL_FIELDS} for row in rows]
+    totals = {key: rows[0][key] for key in TOTAL_FIELDS} if rows else {}
+    return {"character_id": character_id, "items": items, "totals": totals}
+
+
+def get_editable_character(db: Session, character_id: int, user: User) -> CharacterModel:
+    """Load a character the user may change (their own, or any in a campaign they run)."""
+    character = db.query(CharacterModel).filter(
+        CharacterModel.id == character_id, editable_characters(user)
+    ).first()
+    if not character:
+        raise_not_editable(character_id, user, db)
+    return character
+
+
+Stacks = Dict[int, List[CharacterItem]]
+
+
+def stacks_by_item(db: Session, character_ids: List[int], item_ids) -> Dict[int, Stacks]:
+    """
+    The characters' inventory rows for item_ids by character and item, locked
+    for the transaction.
+
+    Rows are locked in one statement in character order, so two transfers
+    between the same characters in opposite directions cannot deadlock.
+    """
+    stacks = defaultdict(lambda: defaultdict(list))
+    rows = db.query(CharacterItem).filter(
+        CharacterItem.character_id.in_(character_ids), CharacterItem.item_id.in_(item_ids)
+    ).order_by(CharacterItem.character_id, CharacterItem.id).with_for_update()
+    for row in rows:
+        stacks[row.character_id][row.item_id].append(row)
+    return stacks
+
+
+def add_items(db: Session, character: CharacterModel, rows: List[dict], stacks: Optional[Stacks] = None):
+    """
+    Add rows ({item_id, quantity, ...}) to an inventory, stacking onto existing
+    entries. stacks are the character's rows if already locked.
+    """
+    item_ids = [row["item_id"] for row in rows]
+    found = set(db.scalars(select(Item.id).where(
+        Item.id.in_(item_ids), Item.campaign_id == character.campaign_id
+    )))
+    raise_row_errors([
+        row_error("items", i, f"Item {item_id} not found in this campaign", "item_id")
+        for i, item_id in enumerate(item_ids) if item_id not in found
+    ], status_code=404)
+
+    if stacks is None:
+        stacks = stacks_by_item(db, [character.id], item_ids)[character.id]
+    new_rows = []
+    for row in rows:
+        if stacks[row["item_id"]]:
+            stack = stacks[row["item_id"]][0]
+            stack.quantity = (stack.quantity or 0) + row["quantity"]
+            if row.get("is_equipped"):
+                stack.is_equipped = True
+        else:
+            new_rows.append({**row, "character_id": character.id})
+    db.flush()
+    if new_rows:
+        insert_rows(db, CharacterItem, new_rows)
+
+
+def take_items(db: Session, character_id: int, rows: List[dict], stacks: Optional[Stacks] = None):
+    """Remove quantities of items from an inventory; all or nothing. stacks as for add_items()."""
+    if stacks is None:
+        stacks = stacks_by_item(db, [character_id], [row["item_id"] for row in rows])[character_id]
+    errors = []
+    for i, row in enumerate(rows):
+        held = sum(stack.quantity or 0 for stack in stacks[row["item_id"]])
+        if not held:
+            errors.append(row_error("items", i, f"Item {row['item_id']} is not in the inventory", "item_id"))
+        elif held < row["quantity"]:
+            errors.append(row_error("items", i, f"Only {held} in the inventory", "quantity"))
+    raise_row_errors(errors)
+
+    emptied = []
+    for row in rows:
+        remaining = row["quantity"]
+        for stack in stacks[row["item_id"]]:
+            taken = min(stack.quantity or 0, remaining)
+            stack.quantity -= taken
+            remaining -= taken
+            if stack.quantity == 0:
+                emptied.append(stack.id)
+            if not remaining:
+                break
+    db.flush()
+    if emptied:
+        db.execute(
+            delete(CharacterItem).where(CharacterItem.id.in_(emptied))
+            .execution_options(synchronize_session=False)
+        )
+
+
+@router.get("/{character_id}/inventory", response_model=Inventory)
+@query_budget(5)
+def get_inventory(
+    character_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """List a character's items with carried weight, attuned items and equipped AC bonus."""
+    campaign_id = db.scalar(select(CharacterModel.campaign_id).where(CharacterModel.id == character_id))
+    if campaign_id is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+    check_campaign_access(campaign_id, current_user, db)
+    return load_inventory(db, character_id)
+
+
+@router.post("/{character_id}/inventory", response_model=Inventory)
+def add_to_inventory(
+    character_id: int,
+    inventory_in: InventoryAdd,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Add items from the campaign to a character's inventory."""
+    rows = [row.dict() for row in inventory_in.items]
+    raise_row_errors(duplicate_id_errors([row["item_id"] for row in rows], "items", "item_id"))
+    character = get_editable_character(db, character_id, current_user)
+    add_items(db, character, rows)
+    db.commit()
+    return load_inventory(db, character_id)
+
+
+@router.post("/{character_id}/inventory/remove", response_model=Inventory)
+def remove_from_inventory(
+    character_id: int,
+    inventory_in: InventoryRemove,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Remove quantities of items from a character's inventory."""
+    rows = [row.dict() for row in inventory_in.items]
+    raise_row_errors(duplicate_id_errors([row["item_id"] for row in rows], "items", "item_id"))
+    get_editable_character(db, character_id, current_user)
+    take_items(db, character_id, rows)
+    db.commit()
+    return load_inventory(db, character_id)
+
+
+@router.post("/{character_id}/inventory/transfer", response_model=InventoryTransferResult)
+def transfer_inventory(
+    character_id: int,
+    transfer_in: InventoryTransfer,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Give items to another character in the same campaign."""
+    if transfer_in.to_character_id == character_id:
+        raise HTTPException(status_code=400, detail="Cannot transfer items to the same character")
+    rows = [row.dict() for row in transfer_in.items]
+    raise_row_errors(duplicate_id_errors([row["item_id"] for row in rows], "items", "item_id"))
+
+    source = get_editable_character(db, character_id, current_user)
+    destination = db.get(CharacterModel, transfer_in.to_character_id)
+    if not destination or destination.campaign_id != source.campaign_id:
+        raise HTTPException(status_code=404, detail="Destination character not found in this campaign")
+
+    stacks = stacks_by_item(db, [source.id, destination.id], [row["item_id"] for row in rows])
+    take_items(db, source.id, rows, stacks[source.id])
+    add_items(db, destination, rows, stacks[destination.id])
+    db.commit()
+    return {"source": load_inventory(db, source.id), "destination": load_inventory(db, destination.id)}
+
+
+@router.patch("/{character_id}/inventory/{entry_id}", response_model=Inventory)
+def update_inventory_entry(
+    character_id: int,
+    entry_id: int,
+    entry_update: InventoryEntryUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Equip or unequip an inventory entry, or change its quantity or notes."""
+    get_editable_character(db, character_id, current_user)
+    entry = db.query(CharacterItem).filter(
+        CharacterItem.id == entry_id, CharacterItem.character_id == character_id
+    ).first()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Inventory entry not found")
+
+    for field, value in entry_update.dict(exclude_unset=True).items():
+        setattr(entry, field, value)
+    db.commit()
+    return load_inventory(db, character_id)
@@ -1,15 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from ...core import get_db
+from ...core import get_db, save
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
 from ...models import Item as ItemModel, User
-from ...schemas import Item, ItemCreate, ItemUpdate
+from ...schemas import Item, ItemCreate, ItemUpdate, ItemBulkCreate, ItemBulkUpdate, BulkDelete
 from ...api.deps import get_current_active_user
+from ...api.concurrency import check_if_match, set_etag
+from ...api.bulk import (
+    row_error, raise_row_errors, insert_rows, load_rows, reload_rows,
+    authorize_campaigns, duplicate_id_errors, update_rows, version_errors, delete_where,
+)
+from ...services.srd import get_catalog
 from .campaigns import check_campaign_access
 
 router = APIRouter()
 
+# Item fields that are filled from the SRD catalog when not given explicitly
+SRD_ITEM_FIELDS = ("item_type", "rarity", "weight", "value", "damage", "ac_bonus",
+                   "requires_attunement", "is_magical")
+
+
+def srd_item_defaults(srd_id: str) -> dict:
+    """Mechanical fields of an SRD catalog item; ValueError for unknown ids."""
+    entry = get_catalog().items.get(srd_id)
+    if not entry:
+        raise ValueError(f"Unknown SRD item: {srd_id}")
+    return {field: entry[field] for field in SRD_ITEM_FIELDS if field in entry}
+
+
+def item_values(item_in) -> dict:
+    """Column values for a new item, with stats filled in from the SRD catalog."""
+    item_data = item_in.dict()
+    if item_in.srd_id:
+        # Catalog items keep only the reference; explicit values override the catalog
+        explicit = item_in.dict(exclude_unset=True)
+        for field, value in srd_item_defaults(item_in.srd_id).items():
+            if field not in explicit:
+                item_data[field] = value
+    return item_data
+
 
 @router.post("", response_model=Item, status_code=status.HTTP_201_CREATED)
 def create_item(
@@ -20,14 +52,79 @@ def create_item(
     """Create a new item."""
     check_campaign_access(item_in.campaign_id, current_user, db)
 
-    item = ItemModel(**item_in.dict())
-    db.add(item)
+    try:
+        item = ItemModel(**item_values(item_in))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return save(db, item)
+
+
+@router.post("/bulk", response_model=List[Item], status_code=status.HTTP_201_CREATED)
+def bulk_create_items(
+    bulk_in: ItemBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create many items in one campaign in a single transaction."""
+    check_campaign_access(bulk_in.campaign_id, current_user, db)
+
+    rows, errors = [], []
+    for i, item_in in enumerate(bulk_in.items):
+        try:
+            rows.append({**item_values(item_in), "campaign_id": bulk_in.campaign_id})
+        except ValueError as e:
+            errors.append(row_error("items", i, str(e), "srd_id"))
+    raise_row_errors(errors)
+
+    items = insert_rows(db, ItemModel, rows)
     db.commit()
-    db.refresh(item)
-    return item
+    return items
+
+
+@router.patch("/bulk", response_model=List[Item])
+def bulk_update_items(
+    bulk_in: ItemBulkUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Update many items in a single transaction."""
+    rows = [row.dict(exclude_unset=True) for row in bulk_in.items]
+    ids = [row["id"] for row in rows]
+    errors = duplicate_id_errors(ids, "items", "id")
+    for i, row in enumerate(rows):
+        if row.get("srd_id"):
+            try:
+                srd_item_defaults(row["srd_id"])
+            except ValueError as e:
+                errors.append(row_error("items", i, str(e), "srd_id"))
+    raise_row_errors(errors)
+
+    items = load_rows(db, ItemModel, ids, "items", "id")
+    authorize_campaigns(db, (item.campaign_id for item in items.values()), current_user)
+    raise_row_errors(version_errors(rows, items, "items"), status_code=412)
+    update_rows(db, ItemModel, rows, items)
+    updated = reload_rows(db, ItemModel, ids)
+    db.commit()
+    return updated
+
+
+@router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
+def bulk_delete_items(
+    bulk_in: BulkDelete,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete many items, and their inventory entries, in a single transaction."""
+    items = load_rows(db, ItemModel, bulk_in.ids, "ids")
+    authorize_campaigns(db, (item.campaign_id for item in items.values()), current_user)
+    delete_where(db, ItemModel, ItemModel.id.in_(list(items)))
+    db.commit()
+    return None
 
 
 @router.get("/campaign/{campaign_id}", response_model=List[Item])
+@query_budget(4)
 def list_campaign_items(
     campaign_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -35,12 +132,14 @@ def list_campaign_items(
 ):
     """List all items in a campaign."""
     check_campaign_access(campaign_id, current_user, db)
-    return db.query(ItemModel).filter(ItemModel.campaign_id == campaign_id).all()
+    return json_list(Item, db.query(ItemModel).filter(ItemModel.campaign_id == campaign_id).all())
 
 
 @router.get("/{item_id}", response_model=Item)
+@query_budget(4)
 def get_item(
     item_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -50,6 +149,7 @@ def get_item(
         raise HTTPException(status_code=404, detail="Item not found")
 
     check_campaign_access(item.campaign_id, current_user, db)
+    set_etag(response, item)
     return item
 
 
@@ -57,21 +157,31 @@ def get_item(
 def update_item(
     item_id: int,
     item_update: ItemUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Update an item."""
+    """Update an item. Send its ETag as If-Match to fail with 412 if it has changed since."""
     item = db.query(ItemModel).filter(ItemModel.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
     check_campaign_access(item.campaign_id, current_user, db)
+    check_if_match(item, if_match)
+
+    update_data = item_update.dict(exclude_unset=True)
+    if update_data.get("srd_id"):
+        try:
+            srd_item_defaults(update_data["srd_id"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    for field, value in item_update.dict(exclude_unset=True).items():
+    for field, value in update_data.items():
         setattr(item, field, value)
 
-    db.commit()
-    db.refresh(item)
+    save(db, item)
+    set_etag(response, item)
     return item
 
 
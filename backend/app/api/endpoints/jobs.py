@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from ...core import get_db
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
+from ...models import Job as JobModel, JobStatus, User
+from ...schemas import Job
+from ...api.deps import get_current_active_user
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[Job])
+@query_budget(2)
+def list_jobs(
+    status: Optional[JobStatus] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """List the current user's background jobs, newest first."""
+    query = db.query(JobModel).filter(JobModel.created_by_id == current_user.id)
+    if status is not None:
+        query = query.filter(JobModel.status == status)
+    return json_list(Job, query.order_by(JobModel.id.desc()).limit(limit).all())
+
+
+@router.get("/{job_id}", response_model=Job)
+@query_budget(2)
+def get_job(
+    job_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the status of a background job, and its result once it has succeeded."""
+    job = db.query(JobModel).filter(JobModel.id == job_id, JobModel.created_by_id == current_user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from ...core import get_db
+from ...core import get_db, save
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
 from ...models import Note as NoteModel, User
-from ...schemas import Note, NoteCreate, NoteUpdate
+from ...schemas import Note, NoteCreate, NoteUpdate, NoteBulkCreate, NoteBulkUpdate, BulkDelete
 from ...api.deps import get_current_active_user
+from ...api.concurrency import check_if_match, set_etag
+from ...api.bulk import (
+    raise_row_errors, insert_rows, load_rows, reload_rows,
+    authorize_campaigns, duplicate_id_errors, update_rows, version_errors, delete_where,
+)
 from .campaigns import check_campaign_access
 
 router = APIRouter()
@@ -20,13 +27,60 @@ def create_note(
     """Create a new note."""
     check_campaign_access(note_in.campaign_id, current_user, db)
     note = NoteModel(**note_in.dict())
-    db.add(note)
+    return save(db, note)
+
+
+@router.post("/bulk", response_model=List[Note], status_code=status.HTTP_201_CREATED)
+def bulk_create_notes(
+    bulk_in: NoteBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create many notes in one campaign in a single transaction."""
+    check_campaign_access(bulk_in.campaign_id, current_user, db)
+
+    rows = [{**note_in.dict(), "campaign_id": bulk_in.campaign_id} for note_in in bulk_in.notes]
+    notes = insert_rows(db, NoteModel, rows)
     db.commit()
-    db.refresh(note)
-    return note
+    return notes
+
+
+@router.patch("/bulk", response_model=List[Note])
+def bulk_update_notes(
+    bulk_in: NoteBulkUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Update many notes in a single transaction."""
+    rows = [row.dict(exclude_unset=True) for row in bulk_in.notes]
+    ids = [row["id"] for row in rows]
+    raise_row_errors(duplicate_id_errors(ids, "notes", "id"))
+
+    notes = load_rows(db, NoteModel, ids, "notes", "id")
+    authorize_campaigns(db, (note.campaign_id for note in notes.values()), current_user)
+    raise_row_errors(version_errors(rows, notes, "notes"), status_code=412)
+    update_rows(db, NoteModel, rows, notes)
+    updated = reload_rows(db, NoteModel, ids)
+    db.commit()
+    return updated
+
+
+@router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
+def bulk_delete_notes(
+    bulk_in: BulkDelete,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete many notes in a single transaction."""
+    notes = load_rows(db, NoteModel, bulk_in.ids, "ids")
+    authorize_campaigns(db, (note.campaign_id for note in notes.values()), current_user)
+    delete_where(db, NoteModel, NoteModel.id.in_(list(notes)))
+    db.commit()
+    return None
 
 
 @router.get("/campaign/{campaign_id}", response_model=List[Note])
+@query_budget(4)
 def list_campaign_notes(
     campaign_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -35,12 +89,14 @@ def list_campaign_notes(
     """List all notes in a campaign."""
     check_campaign_access(campaign_id, current_user, db)
     # TODO: Filter DM-only notes based on user role
-    return db.query(NoteModel).filter(NoteModel.campaign_id == campaign_id).all()
+    return json_list(Note, db.query(NoteModel).filter(NoteModel.campaign_id == campaign_id).all())
 
 
 @router.get("/{note_id}", response_model=Note)
+@query_budget(4)
 def get_note(
     note_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -49,6 +105,7 @@ def get_note(
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     check_campaign_access(note.campaign_id, current_user, db)
+    set_etag(response, note)
     return note
 
 
@@ -56,20 +113,23 @@ def get_note(
 def update_note(
     note_id: int,
     note_update: NoteUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Update a note."""
+    """Update a note. Send its ETag as If-Match to fail with 412 if it has changed since."""
     note = db.query(NoteModel).filter(NoteModel.id == note_id).first()
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     check_campaign_access(note.campaign_id, current_user, db)
+    check_if_match(note, if_match)
 
     for field, value in note_update.dict(exclude_unset=True).items():
         setattr(note, field, value)
 
-    db.commit()
-    db.refresh(note)
+    save(db, note)
+    set_etag(response, note)
     return note
 
 
@@ -1,16 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
-from ...core import get_db
-from ...models import Place as PlaceModel, User
-from ...schemas import Place, PlaceCreate, PlaceUpdate
+from ...core import get_db, save
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
+from ...models import Place as PlaceModel, PlaceType, User
+from ...schemas import Place, PlaceCreate, PlaceUpdate, PlaceBulkCreate, PlaceBulkUpdate, NearbyPlace, BulkDelete
 from ...api.deps import get_current_active_user
+from ...api.concurrency import check_if_match, set_etag
+from ...api.bulk import (
+    row_error, raise_row_errors, insert_rows, load_rows, reload_rows,
+    authorize_campaigns, duplicate_id_errors, update_rows, version_errors, delete_where,
+)
+from ...services import place_map
 from .campaigns import check_campaign_access
 
 router = APIRouter()
 
 
+def parent_place_errors(db: Session, parents: List[Tuple[int, int, int]]) -> List[dict]:
+    """
+    Row errors for parents that are not places of the same campaign.
+    parents holds (row index, parent_place_id, campaign_id) tuples.
+    """
+    parent_ids = {parent_id for _, parent_id, _ in parents}
+    if not parent_ids:
+        return []
+    campaigns = dict(
+        db.query(PlaceModel.id, PlaceModel.campaign_id).filter(PlaceModel.id.in_(parent_ids)).all()
+    )
+    return [
+        row_error("places", i, f"Place {parent_id} not found in this campaign", "parent_place_id")
+        for i, parent_id, campaign_id in parents if campaigns.get(parent_id) != campaign_id
+    ]
+
+
 @router.post("", response_model=Place, status_code=status.HTTP_201_CREATED)
 def create_place(
     place_in: PlaceCreate,
@@ -20,14 +45,76 @@ def create_place(
     """Create a new place."""
     check_campaign_access(place_in.campaign_id, current_user, db)
 
-    place = PlaceModel(**place_in.dict())
-    db.add(place)
+    place = PlaceModel(**place_map.with_map_position(place_in.dict()))
+    return save(db, place)
+
+
+@router.post("/bulk", response_model=List[Place], status_code=status.HTTP_201_CREATED)
+def bulk_create_places(
+    bulk_in: PlaceBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create many places in one campaign in a single transaction."""
+    check_campaign_access(bulk_in.campaign_id, current_user, db)
+
+    raise_row_errors(parent_place_errors(db, [
+        (i, place_in.parent_place_id, bulk_in.campaign_id) for i, place_in in enumerate(bulk_in.places)
+        if place_in.parent_place_id is not None
+    ]))
+
+    rows = [
+        place_map.with_map_position({**place_in.dict(), "campaign_id": bulk_in.campaign_id})
+        for place_in in bulk_in.places
+    ]
+    places = insert_rows(db, PlaceModel, rows)
     db.commit()
-    db.refresh(place)
-    return place
+    return places
+
+
+@router.patch("/bulk", response_model=List[Place])
+def bulk_update_places(
+    bulk_in: PlaceBulkUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Update many places in a single transaction."""
+    rows = [place_map.with_map_position(row.dict(exclude_unset=True)) for row in bulk_in.places]
+    ids = [row["id"] for row in rows]
+    raise_row_errors(duplicate_id_errors(ids, "places", "id"))
+
+    places = load_rows(db, PlaceModel, ids, "places", "id")
+    authorize_campaigns(db, (place.campaign_id for place in places.values()), current_user)
+    raise_row_errors(parent_place_errors(db, [
+        (i, row["parent_place_id"], places[row["id"]].campaign_id) for i, row in enumerate(rows)
+        if row.get("parent_place_id") is not None
+    ]) + [
+        row_error("places", i, "A place cannot be its own parent", "parent_place_id")
+        for i, row in enumerate(rows) if row.get("parent_place_id") == row["id"]
+    ])
+    raise_row_errors(version_errors(rows, places, "places"), status_code=412)
+    update_rows(db, PlaceModel, rows, places)
+    updated = reload_rows(db, PlaceModel, ids)
+    db.commit()
+    return updated
+
+
+@router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
+def bulk_delete_places(
+    bulk_in: BulkDelete,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete many places in a single transaction."""
+    places = load_rows(db, PlaceModel, bulk_in.ids, "ids")
+    authorize_campaigns(db, (place.campaign_id for place in places.values()), current_user)
+    delete_where(db, PlaceModel, PlaceModel.id.in_(list(places)))
+    db.commit()
+    return None
 
 
 @router.get("/campaign/{campaign_id}", response_model=List[Place])
+@query_budget(4)
 def list_campaign_places(
     campaign_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -35,12 +122,80 @@ def list_campaign_places(
 ):
     """List all places in a campaign."""
     check_campaign_access(campaign_id, current_user, db)
-    return db.query(PlaceModel).filter(PlaceModel.campaign_id == campaign_id).all()
+    return json_list(Place, db.query(PlaceModel).filter(PlaceModel.campaign_id == campaign_id).all())
+
+
+@router.get("/campaign/{campaign_id}/within", response_model=List[Place])
+@query_budget(4)
+def list_places_within(
+    campaign_id: int,
+    min_x: float,
+    min_y: float,
+    max_x: float,
+    max_y: float,
+    parent_place_id: Optional[int] = None,
+    place_type: Optional[PlaceType] = None,
+    limit: int = Query(1000, ge=1, le=5000),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    List the places on a map inside a bounding box, e.g. the visible viewport.
+
+    Positions are on the map of parent_place_id; leave it out for the
+    top-level (world) map.
+    """
+    check_campaign_access(campaign_id, current_user, db)
+    places = place_map.within(db, campaign_id, parent_place_id, min_x, min_y, max_x, max_y, place_type, limit)
+    return json_list(Place, places)
+
+
+@router.get("/campaign/{campaign_id}/nearest", response_model=List[NearbyPlace])
+@query_budget(8)
+def list_nearest_places(
+    campaign_id: int,
+    x: float,
+    y: float,
+    k: int = Query(5, ge=1, le=100),
+    parent_place_id: Optional[int] = None,
+    place_type: Optional[PlaceType] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """List the k places nearest to a point on a map, nearest first."""
+    check_campaign_access(campaign_id, current_user, db)
+    found = place_map.nearest(db, campaign_id, parent_place_id, x, y, k, place_type)
+    return json_list(NearbyPlace, [{"place": place, "distance": distance} for place, distance in found])
+
+
+@router.get("/{place_id}/nearest", response_model=List[NearbyPlace])
+@query_budget(8)
+def list_places_near_place(
+    place_id: int,
+    k: int = Query(5, ge=1, le=100),
+    place_type: Optional[PlaceType] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """List the k places nearest to a place on the same map, e.g. the closest town."""
+    place = db.query(PlaceModel).filter(PlaceModel.id == place_id).first()
+    if not place:
+        raise HTTPException(status_code=404, detail="Place not found")
+    check_campaign_access(place.campaign_id, current_user, db)
+    if place.map_x is None:
+        raise HTTPException(status_code=400, detail="Place has no map coordinates")
+
+    found = place_map.nearest(
+        db, place.campaign_id, place.parent_place_id, place.map_x, place.map_y, k, place_type, exclude_id=place.id
+    )
+    return json_list(NearbyPlace, [{"place": nearby, "distance": distance} for nearby, distance in found])
 
 
 @router.get("/{place_id}", response_model=Place)
+@query_budget(4)
 def get_place(
     place_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -50,6 +205,7 @@ def get_place(
         raise HTTPException(status_code=404, detail="Place not found")
 
     check_campaign_access(place.campaign_id, current_user, db)
+    set_etag(response, place)
     return place
 
 
@@ -57,21 +213,24 @@ def get_place(
 def update_place(
     place_id: int,
     place_update: PlaceUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Update a place."""
+    """Update a place. Send its ETag as If-Match to fail with 412 if it has changed since."""
     place = db.query(PlaceModel).filter(PlaceModel.id == place_id).first()
     if not place:
         raise HTTPException(status_code=404, detail="Place not found")
 
     check_campaign_access(place.campaign_id, current_user, db)
+    check_if_match(place, if_match)
 
-    for field, value in place_update.dict(exclude_unset=True).items():
+    for field, value in place_map.with_map_position(place_update.dict(exclude_unset=True)).items():
         setattr(place, field, value)
 
-    db.commit()
-    db.refresh(place)
+    save(db, place)
+    set_etag(response, place)
     return place
 
 
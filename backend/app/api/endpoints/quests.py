@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from ...core import get_db
+from ...core import get_db, save
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
 from ...models import Quest as QuestModel, User
-from ...schemas import Quest, QuestCreate, QuestUpdate
+from ...schemas import Quest, QuestCreate, QuestUpdate, QuestBulkCreate, QuestBulkUpdate, BulkDelete
 from ...api.deps import get_current_active_user
+from ...api.concurrency import check_if_match, set_etag
+from ...api.bulk import (
+    raise_row_errors, insert_rows, load_rows, reload_rows,
+    authorize_campaigns, duplicate_id_errors, update_rows, version_errors, delete_where,
+)
 from .campaigns import check_campaign_access
 
 router = APIRouter()
@@ -20,13 +27,60 @@ def create_quest(
     """Create a new quest."""
     check_campaign_access(quest_in.campaign_id, current_user, db)
     quest = QuestModel(**quest_in.dict())
-    db.add(quest)
+    return save(db, quest)
+
+
+@router.post("/bulk", response_model=List[Quest], status_code=status.HTTP_201_CREATED)
+def bulk_create_quests(
+    bulk_in: QuestBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create many quests in one campaign in a single transaction."""
+    check_campaign_access(bulk_in.campaign_id, current_user, db)
+
+    rows = [{**quest_in.dict(), "campaign_id": bulk_in.campaign_id} for quest_in in bulk_in.quests]
+    quests = insert_rows(db, QuestModel, rows)
     db.commit()
-    db.refresh(quest)
-    return quest
+    return quests
+
+
+@router.patch("/bulk", response_model=List[Quest])
+def bulk_update_quests(
+    bulk_in: QuestBulkUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Update many quests in a single transaction."""
+    rows = [row.dict(exclude_unset=True) for row in bulk_in.quests]
+    ids = [row["id"] for row in rows]
+    raise_row_errors(duplicate_id_errors(ids, "quests", "id"))
+
+    quests = load_rows(db, QuestModel, ids, "quests", "id")
+    authorize_campaigns(db, (quest.campaign_id for quest in quests.values()), current_user)
+    raise_row_errors(version_errors(rows, quests, "quests"), status_code=412)
+    update_rows(db, QuestModel, rows, quests)
+    updated = reload_rows(db, QuestModel, ids)
+    db.commit()
+    return updated
+
+
+@router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
+def bulk_delete_quests(
+    bulk_in: BulkDelete,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete many quests in a single transaction."""
+    quests = load_rows(db, QuestModel, bulk_in.ids, "ids")
+    authorize_campaigns(db, (quest.campaign_id for quest in quests.values()), current_user)
+    delete_where(db, QuestModel, QuestModel.id.in_(list(quests)))
+    db.commit()
+    return None
 
 
 @router.get("/campaign/{campaign_id}", response_model=List[Quest])
+@query_budget(4)
 def list_campaign_quests(
     campaign_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -34,12 +88,14 @@ def list_campaign_quests(
 ):
     """List all quests in a campaign."""
     check_campaign_access(campaign_id, current_user, db)
-    return db.query(QuestModel).filter(QuestModel.campaign_id == campaign_id).all()
+    return json_list(Quest, db.query(QuestModel).filter(QuestModel.campaign_id == campaign_id).all())
 
 
 @router.get("/{quest_id}", response_model=Quest)
+@query_budget(4)
 def get_quest(
     quest_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -48,6 +104,7 @@ def get_quest(
     if not quest:
         raise HTTPException(status_code=404, detail="Quest not found")
     check_campaign_access(quest.campaign_id, current_user, db)
+    set_etag(response, quest)
     return quest
 
 
@@ -55,20 +112,23 @@ def get_quest(
 def update_quest(
     quest_id: int,
     quest_update: QuestUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Update a quest."""
+    """Update a quest. Send its ETag as If-Match to fail with 412 if it has changed since."""
     quest = db.query(QuestModel).filter(QuestModel.id == quest_id).first()
     if not quest:
         raise HTTPException(status_code=404, detail="Quest not found")
     check_campaign_access(quest.campaign_id, current_user, db)
+    check_if_match(quest, if_match)
 
     for field, value in quest_update.dict(exclude_unset=True).items():
         setattr(quest, field, value)
 
-    db.commit()
-    db.refresh(quest)
+    save(db, quest)
+    set_etag(response, quest)
     return quest
 
 
@@ -0,0 +1,73 @@
+import json
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+
+from ...core import get_db
+from ...core.queryguard import query_budget
+from ...models import User
+from ...schemas import Revision, EntityVersion
+from ...api.deps import get_current_active_user
+from ...services import revisions
+from .campaigns import check_campaign_access
+
+router = APIRouter()
+
+
+def get_entity(entity_type: str, entity_id: int, user: User, db: Session):
+    """Fetch a versioned campaign entity the user can see, or raise 404."""
+    model = revisions.MODELS.get(entity_type)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"No revisions are kept for {entity_type}")
+    entity = db.get(model, entity_id)
+    if entity is None:
+        raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+    check_campaign_access(revisions.entity_campaign_id(entity), user, db)
+    return entity
+
+
+@router.get("/{entity_type}/{entity_id}", response_model=List[Revision])
+@query_budget(5)
+def list_entity_revisions(
+    entity_type: str,
+    entity_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    List the revisions of a campaign entity, newest first.
+
+    entity_type is campaigns, characters, places, items, quests, sessions,
+    notes, encounters or routes.
+    """
+    entity = get_entity(entity_type, entity_id, current_user, db)
+    return [
+        {
+            "version": revision.version,
+            "user_id": revision.user_id,
+            "created_at": revision.created_at,
+            "fields": sorted(field for part in json.loads(revision.patch).values() for field in part),
+        }
+        for revision in revisions.list_revisions(db, entity)
+    ]
+
+
+@router.get("/{entity_type}/{entity_id}/{version}", response_model=EntityVersion)
+@query_budget(5)
+def get_entity_version(
+    entity_type: str,
+    entity_id: int,
+    version: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get a campaign entity as it was at a version, rebuilt from its revisions."""
+    entity = get_entity(entity_type, entity_id, current_user, db)
+    if not 1 <= version <= entity.version:
+        raise HTTPException(status_code=404, detail=f"Version {version} not found")
+    return {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "version": version,
+        "data": revisions.rebuild(db, entity, version),
+    }
@@ -0,0 +1,165 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from ...core import get_db, save
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
+from ...models import Route as RouteModel, Place as PlaceModel, TravelMode, User
+from ...schemas import Route, RouteCreate, RouteUpdate, RouteBulkCreate, Journey
+from ...api.deps import get_current_active_user
+from ...api.concurrency import check_if_match, set_etag
+from ...api.bulk import row_error, raise_row_errors, insert_rows
+from ...services import travel
+from .campaigns import check_campaign_access
+
+router = APIRouter()
+
+
+def route_place_errors(db: Session, campaign_id: int, rows: List[dict]) -> List[dict]:
+    """Row errors for routes whose places are missing from the campaign or the same place."""
+    place_ids = {row[field] for row in rows for field in ("from_place_id", "to_place_id")}
+    found = {
+        place_id for (place_id,) in db.query(PlaceModel.id).filter(
+            PlaceModel.id.in_(place_ids), PlaceModel.campaign_id == campaign_id
+        )
+    }
+    errors = []
+    for i, row in enumerate(rows):
+        for field in ("from_place_id", "to_place_id"):
+            if row[field] not in found:
+                errors.append(row_error("routes", i, f"Place {row[field]} not found in this campaign", field))
+        if row["from_place_id"] == row["to_place_id"]:
+            errors.append(row_error("routes", i, "A route must connect two different places", "to_place_id"))
+    return errors
+
+
+@router.post("", response_model=Route, status_code=status.HTTP_201_CREATED)
+def create_route(
+    route_in: RouteCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create a route between two places of a campaign."""
+    check_campaign_access(route_in.campaign_id, current_user, db)
+    errors = route_place_errors(db, route_in.campaign_id, [route_in.dict()])
+    if errors:
+        raise HTTPException(status_code=400, detail=errors[0]["msg"])
+
+    route = save(db, RouteModel(**route_in.dict()))
+    travel.invalidate(route.campaign_id)
+    return route
+
+
+@router.post("/bulk", response_model=List[Route], status_code=status.HTTP_201_CREATED)
+def bulk_create_routes(
+    bulk_in: RouteBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create many routes in one campaign in a single transaction, e.g. a hex-crawl map."""
+    check_campaign_access(bulk_in.campaign_id, current_user, db)
+    rows = [{**route_in.dict(), "campaign_id": bulk_in.campaign_id} for route_in in bulk_in.routes]
+    raise_row_errors(route_place_errors(db, bulk_in.campaign_id, rows))
+
+    routes = insert_rows(db, RouteModel, rows)
+    db.commit()
+    travel.invalidate(bulk_in.campaign_id)
+    return routes
+
+
+@router.get("/campaign/{campaign_id}", response_model=List[Route])
+@query_budget(4)
+def list_campaign_routes(
+    campaign_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """List all routes in a campaign."""
+    check_campaign_access(campaign_id, current_user, db)
+    return json_list(Route, db.query(RouteModel).filter(RouteModel.campaign_id == campaign_id).all())
+
+
+@router.get("/campaign/{campaign_id}/fastest", response_model=Journey)
+@query_budget(5)
+def find_fastest_route(
+    campaign_id: int,
+    from_place_id: int,
+    to_place_id: int,
+    modes: Optional[List[TravelMode]] = Query(None, description="Only use routes with these travel modes"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Find the fastest way from one place to another over the campaign's routes.
+
+    Travel time is each route's travel_hours, or its distance at the travel
+    mode's normal pace (halved overland in difficult terrain).
+    """
+    check_campaign_access(campaign_id, current_user, db)
+    graph = travel.campaign_graph(db, campaign_id)
+    journey = graph.fastest(from_place_id, to_place_id, set(modes) if modes else None)
+    if journey is None:
+        raise HTTPException(status_code=404, detail="No route between these places")
+
+    return {
+        "from_place_id": from_place_id,
+        "to_place_id": to_place_id,
+        "hours": journey.hours,
+        "distance": journey.distance,
+        "place_ids": journey.place_ids or [from_place_id],
+        "legs": journey.legs,
+        "explored": journey.explored,
+    }
+
+
+@router.put("/{route_id}", response_model=Route)
+def update_route(
+    route_id: int,
+    route_update: RouteUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Update a route. Send its ETag as If-Match to fail with 412 if it has changed since."""
+    route = db.query(RouteModel).filter(RouteModel.id == route_id).first()
+    if not route:
+        raise HTTPException(status_code=404, detail="Route not found")
+
+    check_campaign_access(route.campaign_id, current_user, db)
+    check_if_match(route, if_match)
+
+    changes = route_update.dict(exclude_unset=True)
+    ends = {"from_place_id": route.from_place_id, "to_place_id": route.to_place_id}
+    ends.update({field: changes[field] for field in ends if changes.get(field) is not None})
+    errors = route_place_errors(db, route.campaign_id, [ends])
+    if errors:
+        raise HTTPException(status_code=400, detail=errors[0]["msg"])
+
+    for field, value in changes.items():
+        setattr(route, field, value)
+
+    save(db, route)
+    set_etag(response, route)
+    travel.invalidate(route.campaign_id)
+    return route
+
+
+@router.delete("/{route_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_route(
+    route_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a route."""
+    route = db.query(RouteModel).filter(RouteModel.id == route_id).first()
+    if not route:
+        raise HTTPException(status_code=404, detail="Route not found")
+
+    check_campaign_access(route.campaign_id, current_user, db)
+
+    db.delete(route)
+    db.commit()
+    travel.invalidate(route.campaign_id)
+    return None
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from ...core import get_db
+from ...core import get_db, save
+from ...core.queryguard import query_budget
+from ...core.responses import json_list
 from ...models import Session as SessionModel, User
 from ...schemas import Session as SessionSchema, SessionCreate, SessionUpdate
 from ...api.deps import get_current_active_user
+from ...api.concurrency import check_if_match, set_etag
 from .campaigns import check_campaign_access
 
 router = APIRouter()
@@ -20,13 +23,11 @@ def create_session(
     """Create a new session."""
     check_campaign_access(session_in.campaign_id, current_user, db)
     session = SessionModel(**session_in.dict())
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    return session
+    return save(db, session)
 
 
 @router.get("/campaign/{campaign_id}", response_model=List[SessionSchema])
+@query_budget(4)
 def list_campaign_sessions(
     campaign_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -34,14 +35,16 @@ def list_campaign_sessions(
 ):
     """List all sessions in a campaign."""
     check_campaign_access(campaign_id, current_user, db)
-    return db.query(SessionModel).filter(
+    return json_list(SessionSchema, db.query(SessionModel).filter(
         SessionModel.campaign_id == campaign_id
-    ).order_by(SessionModel.session_number.desc()).all()
+    ).order_by(SessionModel.session_number.desc()).all())
 
 
 @router.get("/{session_id}", response_model=SessionSchema)
+@query_budget(4)
 def get_session(
     session_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -50,6 +53,7 @@ def get_session(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     check_campaign_access(session.campaign_id, current_user, db)
+    set_etag(response, session)
     return session
 
 
@@ -57,20 +61,23 @@ def get_session(
 def update_session(
     session_id: int,
     session_update: SessionUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Update a session."""
+    """Update a session. Send its ETag as If-Match to fail with 412 if it has changed since."""
     session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     check_campaign_access(session.campaign_id, current_user, db)
+    check_if_match(session, if_match)
 
     for field, value in session_update.dict(exclude_unset=True).items():
         setattr(session, field, value)
 
-    db.commit()
-    db.refresh(session)
+    save(db, session)
+    set_etag(response, session)
     return session
 
 
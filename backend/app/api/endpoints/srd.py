@@ -0,0 +1,83 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Optional
+
+from ...schemas import SRDSpell, SRDItem, SRDMonster, SRDCatalog
+from ...services.srd import get_catalog, catalog_snapshot
+
+router = APIRouter()
+
+
+def search_catalog(kind: str, q: str, ids: Optional[str], limit: int) -> List[dict]:
+    index = get_catalog()[kind]
+    if ids:
+        # Resolve many references at once, e.g. every srd_id on a character sheet
+        return [entry for entry in (index.get(i.strip()) for i in ids.split(",")) if entry]
+    return index.search(q, limit)
+
+
+def get_catalog_entry(kind: str, entry_id: str) -> dict:
+    entry = get_catalog()[kind].get(entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="SRD entry not found")
+    return entry
+
+
+@router.get("", response_model=SRDCatalog)
+def get_full_catalog(request: Request):
+    """
+    The whole catalog in one document, for clients that cache it offline.
+    Served precompressed with an ETag; revalidate with If-None-Match.
+    """
+    return catalog_snapshot().response(request)
+
+
+@router.get("/spells", response_model=List[SRDSpell])
+def list_spells(
+    q: str = Query("", description="Name prefix; matches the start of any word"),
+    level: Optional[int] = Query(None, ge=0, le=9),
+    ids: Optional[str] = Query(None, description="Comma-separated catalog ids"),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """Search SRD spells by name prefix, or fetch several by id."""
+    if level is None:
+        return search_catalog("spells", q, ids, limit)
+    spells = search_catalog("spells", q, ids, 500)
+    return [spell for spell in spells if spell["level"] == level][:limit]
+
+
+@router.get("/spells/{spell_id}", response_model=SRDSpell)
+def get_spell(spell_id: str):
+    """Get an SRD spell by catalog id."""
+    return get_catalog_entry("spells", spell_id)
+
+
+@router.get("/items", response_model=List[SRDItem])
+def list_items(
+    q: str = Query("", description="Name prefix; matches the start of any word"),
+    ids: Optional[str] = Query(None, description="Comma-separated catalog ids"),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """Search SRD items by name prefix, or fetch several by id."""
+    return search_catalog("items", q, ids, limit)
+
+
+@router.get("/items/{item_id}", response_model=SRDItem)
+def get_item(item_id: str):
+    """Get an SRD item by catalog id."""
+    return get_catalog_entry("items", item_id)
+
+
+@router.get("/monsters", response_model=List[SRDMonster])
+def list_monsters(
+    q: str = Query("", description="Name prefix; matches the start of any word"),
+    ids: Optional[str] = Query(None, description="Comma-separated catalog ids"),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """Search SRD monsters by name prefix, or fetch several by id."""
+    return search_catalog("monsters", q, ids, limit)
+
+
+@router.get("/monsters/{monster_id}", response_model=SRDMonster)
+def get_monster(monster_id: str):
+    """Get an SRD monster by catalog id."""
+    return get_catalog_entry("monsters", monster_id)
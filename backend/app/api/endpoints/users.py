@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from ...core import get_db
+from ...core import get_db, save
 from ...models import User as UserModel
 from ...schemas import User, UserUpdate
 from ...api.deps import get_current_active_user
@@ -53,9 +53,7 @@ def update_current_user(
         from ...core import get_password_hash
         current_user.hashed_password = get_password_hash(user_update.password)
 
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    return save(db, current_user)
 
 
 @router.get("/search", response_model=List[User])
@@ -1,5 +1,5 @@
 from .config import settings
-from .database import Base, get_db, engine
+from .database import Base, get_db, engine, save
 from .security import (
     verify_password,
     get_password_hash,
@@ -12,6 +12,7 @@ __all__ = [
     "Base",
     "get_db",
     "engine",
+    "save",
     "verify_password",
     "get_password_hash",
     "create_access_token",
@@ -0,0 +1,236 @@
+"""
+Response compression.
+
+CompressionMiddleware compresses responses of compressible content types
+that are at least COMPRESSION_MIN_SIZE bytes, with Brotli when the client
+accepts it and the optional brotli package is installed, otherwise gzip.
+Streamed responses (e.g. campaign exports) are compressed chunk by chunk
+and flushed as they go. Responses that already carry a Content-Encoding
+are passed through untouched.
+
+PrecompressedPayload is for bodies that rarely change (the SRD catalog):
+they are compressed once at the highest level, kept in memory, and served
+with an ETag so clients can revalidate with If-None-Match.
+"""
+
+import gzip
+import hashlib
+import threading
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional dependency: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml",
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None for identity."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        accepted[name.strip()] = quality
+
+    def allowed(encoding: str) -> bool:
+        return accepted.get(encoding, accepted.get("*", 0)) > 0
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return None
+
+
+def _add_vary(headers: MutableHeaders):
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+def _encoded_etag(etag: str, encoding: str) -> str:
+    # A compressed body is a different representation, so it needs its own tag
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+class _Compressor:
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=level)
+        else:
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.BROTLI_QUALITY if level is None else level)
+    return gzip.compress(body, compresslevel=settings.GZIP_LEVEL if level is None else level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(scope=start_message)
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or (not more_body and not body)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                _add_vary(headers)
+                if encoding is None or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                level = settings.BROTLI_QUALITY if encoding == "br" else settings.GZIP_LEVEL
+                compressor = _Compressor(encoding, level)
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = _encoded_etag(headers["etag"], encoding)
+                body = compressor.compress(body, final=not more_body)
+                if more_body:
+                    del headers["content-length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_compressed)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if If-None-Match names any encoding of the representation tagged etag."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        tag = tag.removeprefix("W/").strip('"')
+        if tag == etag or tag.rsplit("-", 1)[0] == etag:
+            return True
+    return False
+
+
+def strong_etag_matches(if_match: Optional[str], etag: str) -> bool:
+    """
+    True if If-Match names the representation tagged etag, in any encoding.
+
+    If-Match uses the strong comparison (RFC 9110, 13.1.1), so weak (W/)
+    tags never match; only the suffix this middleware adds is ignored.
+    """
+    if not if_match:
+        return False
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            continue
+        tag = tag.strip('"')
+        if tag == etag or tag in (f"{etag}-gzip", f"{etag}-br"):
+            return True
+    return False
+
+
+class PrecompressedPayload:
+    """A response body compressed once per encoding, served with an ETag."""
+
+    def __init__(self, body: bytes, media_type: str = "application/json", max_age: int = 3600):
+        self.body = body
+        self.media_type = media_type
+        self.max_age = max_age
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str) -> bytes:
+        with self._lock:
+            if encoding not in self._encoded:
+                # Compressed once, so use the best ratio rather than the fastest level
+                self._encoded[encoding] = compress(self.body, encoding, 11 if encoding == "br" else 9)
+            return self._encoded[encoding]
+
+    def response(self, request: Request) -> Response:
+        encoding = None
+        if len(self.body) >= settings.COMPRESSION_MIN_SIZE:
+            encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"',
+            "Vary": "Accept-Encoding",
+            "Cache-Control": f"public, max-age={self.max_age}",
+        }
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return Response(self.body, media_type=self.media_type, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(self.encoded(encoding), media_type=self.media_type, headers=headers)
@@ -19,12 +19,75 @@ class Settings(BaseSettings):
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
 
     # File Upload
-    MAX_UPLOAD_SIZE: int = 10485760  # 10MB
+    MAX_UPLOAD_SIZE: int = 104857600  # 100MB
     UPLOAD_DIR: str = "./uploads"
+    # Longest side of generated thumbnails, in pixels
+    THUMBNAIL_SIZE: int = 320
+    # Larger images are refused as possible decompression bombs
+    MAX_IMAGE_PIXELS: int = 268435456  # 16384 x 16384
+
+    # Images with a side of at least MAP_TILE_MIN_SIZE pixels are cut into
+    # a zoomable pyramid of MAP_TILE_SIZE tiles
+    MAP_TILE_SIZE: int = 256
+    MAP_TILE_MIN_SIZE: int = 4096
 
     # D&D Beyond (optional)
     DNDBEYOND_COBALT_TOKEN: str = ""
 
+    # Encounters: keep turn state in memory and write it back periodically.
+    # Only safe when the API runs as a single worker process.
+    ENCOUNTER_WRITE_BEHIND: bool = False
+    ENCOUNTER_FLUSH_SECONDS: float = 2.0
+
+    # Worker processes for CPU-bound work (0 = one per CPU)
+    PROCESS_POOL_WORKERS: int = 0
+
+    # Background jobs, run by `python -m app.worker`
+    JOB_POLL_SECONDS: float = 1.0  # idle workers check for new jobs this often
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_SECONDS: float = 30  # delay before the first retry, doubled for each later one
+    JOB_TIMEOUT_SECONDS: float = 900  # running jobs locked longer than this are taken over
+    # Also run a worker thread in the API process (local development and
+    # single-service deploys, see render.yaml and railway.json)
+    JOB_WORKER_IN_API: bool = False
+
+    # Deleted campaigns can be restored for this long, then a job purges them
+    CAMPAIGN_PURGE_DELAY_HOURS: float = 72
+    CAMPAIGN_PURGE_BATCH: int = 1000  # rows deleted per transaction
+
+    # POST requests with an Idempotency-Key header: responses are kept this
+    # long and replayed for repeats. Larger request bodies are not covered.
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_BODY: int = 1048576  # 1MB
+    # How long a repeat waits for the first request to finish before a 409
+    IDEMPOTENCY_WAIT_SECONDS: float = 30
+    # How long a request may run before its key is assumed lost and can be
+    # claimed again; keep it well above the slowest POST
+    IDEMPOTENCY_LEASE_SECONDS: int = 900
+
+    # Maximum number of rows accepted by one bulk create/update/delete request
+    BULK_MAX_ROWS: int = 500
+
+    # Logging: "json" (one object per line) or "text"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+
+    # Request metrics at /metrics and a Server-Timing header on responses
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING: bool = True
+    # Log statements slower than this many milliseconds (0 = off)
+    SLOW_QUERY_MS: float = 0
+
+    # Response compression: gzip, or Brotli when the brotli package is installed
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+    # N+1 guard for development and tests: "off", "warn" (log) or "raise"
+    # (endpoint query budgets are checked by the metrics middleware)
+    QUERY_GUARD: str = "off"
+
     @property
     def cors_origins(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
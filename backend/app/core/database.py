@@ -1,12 +1,80 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Column, DateTime, Integer, create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, declared_attr, sessionmaker, with_loader_criteria
 from .config import settings
 
 engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        # SQLite ignores foreign keys, and so ON DELETE CASCADE, unless asked
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+# Objects stay loaded after commit; together with eager defaults on the models
+# this means a written object can be returned without another SELECT.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+class Versioned:
+    """
+    Mixin for rows edited concurrently (optimistic concurrency control).
+
+    version is the mapper's version_id_col: the ORM writes a changed row
+    with UPDATE ... SET version = version + 1 WHERE id = ? AND version = ?,
+    and raises StaleDataError if another writer changed it first. Writes
+    that bypass the unit of work must increment version themselves.
+
+    Changes are also kept as revisions (services.revisions), except to the
+    columns in __revision_exclude__: ones updated by set-based statements,
+    whose previous values are never loaded.
+    """
+    version = Column(Integer, nullable=False, default=1)
+    __revision_exclude__ = ()
+
+
+class SoftDeleted:
+    """
+    Mixin for rows that are deleted in two steps: deleted_at is set at once,
+    and the row is purged later by a background job. ORM queries leave out
+    deleted rows unless run with execution_options(include_deleted=True).
+    """
+    deleted_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _skip_deleted(state):
+    if state.is_select and not state.is_column_load and not state.is_relationship_load \
+            and not state.execution_options.get("include_deleted", False):
+        state.statement = state.statement.options(
+            with_loader_criteria(SoftDeleted, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        )
+
+
+class ModelBase:
+    @declared_attr
+    def __mapper_args__(cls):
+        # Fetch server-generated values (ids, created_at, updated_at) with
+        # RETURNING during the flush instead of expiring them
+        args = {"eager_defaults": True}
+        if issubclass(cls, Versioned):
+            args["version_id_col"] = cls.version
+        return args
+
+
+Base = declarative_base(cls=ModelBase)
+
+
+@event.listens_for(Base, "before_insert", propagate=True)
+def _load_onupdate_columns(mapper, connection, target):
+    # Columns like updated_at only have an onupdate default, so a new row
+    # stores NULL; record that up front or eager_defaults SELECTs it back.
+    state = target.__dict__
+    for column in mapper.columns:
+        if column.onupdate is not None and column.default is None and column.server_default is None:
+            prop = mapper.get_property_by_column(column)
+            if prop.key not in state:
+                setattr(target, prop.key, None)
 
 
 def get_db():
@@ -16,3 +84,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def save(db: Session, *objects):
+    """
+    Add objects to the session and commit in one flush, returning the first.
+
+    Generated columns are filled from RETURNING and nothing is expired, so the
+    result can be serialized straight away without db.refresh().
+    """
+    db.add_all(objects)
+    db.commit()
+    return objects[0]
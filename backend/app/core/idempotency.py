@@ -0,0 +1,277 @@
+"""
+Idempotency keys for POST requests.
+
+Clients on flaky connections can send an Idempotency-Key header (any
+unique string, e.g. a UUID) with a POST and safely retry it with the same
+key. The first request runs; its response is stored for
+IDEMPOTENCY_TTL_SECONDS and replayed, with an Idempotent-Replayed header,
+for every repeat instead of running the endpoint again.
+
+- Keys are scoped to the user of the bearer token; requests without a
+  valid token are passed through.
+- Reusing a key for a different request (method, path, query or body) is
+  answered with 422.
+- Repeats that arrive while the first request is still running wait for
+  it and get its response. Within a process they wait on an event; across
+  processes they poll the stored row. After IDEMPOTENCY_WAIT_SECONDS they
+  get 409 instead.
+- A running request holds the key for IDEMPOTENCY_LEASE_SECONDS, after
+  which it is assumed lost and a repeat may claim the key again. Each claim
+  has a random token, and a request only stores or releases the row while
+  it still holds its claim.
+- Server errors (5xx) are not stored, so the request can be retried.
+- Request bodies over IDEMPOTENCY_MAX_BODY are not covered.
+
+The store is the idempotency_keys table: one row per key, holding the
+response status, headers and body. Expired rows are deleted as new keys
+come in.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+from .config import settings
+from .database import SessionLocal
+from .responses import JSONResponse
+from .security import decode_access_token
+from ..models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# Not replayed: recomputed, or describe the original request only
+SKIPPED_HEADERS = {"content-length", "server-timing", "date", "set-cookie"}
+POLL_SECONDS = 0.1
+PURGE_SECONDS = 600  # how often expired keys are deleted
+
+# Keys being handled by this process, per event loop
+_inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Event] = {}
+_purged = 0.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _user(authorization: Optional[str]) -> Optional[str]:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_access_token(token)
+    return str(payload["sub"]) if payload and payload.get("sub") is not None else None
+
+
+def _begin(key: str, fingerprint: str) -> Tuple[Optional[str], Optional[IdempotencyKey]]:
+    """Claim the key for this request: (claim token, None) if claimed, else (None, the existing row)."""
+    global _purged
+    now = _now()
+    claim = secrets.token_hex(16)
+    db = SessionLocal()
+    try:
+        if time.monotonic() - _purged >= PURGE_SECONDS:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+            _purged = time.monotonic()
+        else:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at < now))
+        while True:
+            db.add(IdempotencyKey(
+                key=key, fingerprint=fingerprint, claim=claim,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+            ))
+            try:
+                db.commit()
+                return claim, None
+            except IntegrityError:
+                db.rollback()
+            row = db.get(IdempotencyKey, key)
+            if row is not None:
+                return None, row
+            # Released after a server error in the meantime: try again
+    finally:
+        db.close()
+
+
+def _claimed(db, key: str, claim: str):
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key, IdempotencyKey.claim == claim, IdempotencyKey.status_code.is_(None)
+    )
+
+
+def _complete(key: str, claim: str, status_code: int, headers: List[Tuple[str, str]], body: bytes):
+    db = SessionLocal()
+    try:
+        stored = _claimed(db, key, claim).update({
+            "status_code": status_code,
+            "headers": json.dumps(headers),
+            "body": body,
+            "expires_at": _now() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        }, synchronize_session=False)
+        db.commit()
+        if not stored:
+            # The lease ran out and another request claimed the key
+            logger.warning("Idempotency key claim expired before the request finished; response not stored")
+    finally:
+        db.close()
+
+
+def _release(key: str, claim: str):
+    db = SessionLocal()
+    try:
+        _claimed(db, key, claim).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _untracked(func, *args):
+    # Runs in a thread with an empty context, so these statements are not
+    # counted against the endpoint's query budget
+    return await anyio.to_thread.run_sync(contextvars.Context().run, func, *args)
+
+
+async def _read_body(receive, limit: int) -> Tuple[List[dict], bool]:
+    """Receive up to limit bytes of the request body: (messages, whether it was complete)."""
+    messages, size = [], 0
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            return messages, True
+        size += len(message.get("body", b""))
+        if size > limit:
+            return messages, False
+        if not message.get("more_body", False):
+            return messages, True
+
+
+def _replaying(messages: List[dict], receive):
+    pending = list(messages)
+
+    async def replay():
+        if pending:
+            return pending.pop(0)
+        return await receive()
+    return replay
+
+
+def _stored_response(row: IdempotencyKey) -> Response:
+    response = Response(row.body or b"", status_code=row.status_code)
+    for name, value in json.loads(row.headers or "[]"):
+        response.headers.append(name, value)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        client_key = headers.get("idempotency-key")
+        user = _user(headers.get("authorization")) if client_key is not None else None
+        if user is None:
+            await self.app(scope, receive, send)
+            return
+        if not client_key or len(client_key) > 255:
+            response = JSONResponse({"detail": "Idempotency-Key must be 1 to 255 characters"}, status_code=400)
+            await response(scope, receive, send)
+            return
+
+        messages, complete = await _read_body(receive, settings.IDEMPOTENCY_MAX_BODY)
+        receive = _replaying(messages, receive)
+        if not complete:
+            await self.app(scope, receive, send)
+            return
+
+        key = hashlib.sha256(f"{user}\0{client_key}".encode()).hexdigest()
+        request = hashlib.sha256()
+        request.update(f"{scope['method']} {scope['path']}?".encode())
+        request.update(scope.get("query_string", b""))
+        for message in messages:
+            request.update(message.get("body", b""))
+        fingerprint = request.hexdigest()
+
+        inflight_key = (asyncio.get_running_loop(), key)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            running = _inflight.get(inflight_key)
+            if running is not None:
+                # The same key is being handled by this process: wait for it
+                try:
+                    await asyncio.wait_for(running.wait(), max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    break
+                continue
+
+            event = _inflight[inflight_key] = asyncio.Event()
+            try:
+                claim, row = await _untracked(_begin, key, fingerprint)
+                if claim is not None:
+                    await self._run_and_store(key, claim, scope, receive, send)
+                    return
+            finally:
+                del _inflight[inflight_key]
+                event.set()
+
+            if row.fingerprint != fingerprint:
+                response = JSONResponse(
+                    {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+                )
+                await response(scope, receive, send)
+                return
+            if row.status_code is not None:
+                await _stored_response(row)(scope, receive, send)
+                return
+            # Still running in another process
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(POLL_SECONDS)
+
+        response = JSONResponse(
+            {"detail": "A request with this Idempotency-Key is still being processed"}, status_code=409
+        )
+        await response(scope, receive, send)
+
+    async def _run_and_store(self, key: str, claim: str, scope, receive, send):
+        status_code = 500
+        response_headers: List[Tuple[str, str]] = []
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers.extend(
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                    if name.decode("latin-1").lower() not in SKIPPED_HEADERS
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            await _untracked(_release, key, claim)
+            raise
+        if status_code >= 500:
+            await _untracked(_release, key, claim)
+        else:
+            await _untracked(_complete, key, claim, status_code, response_headers, b"".join(chunks))
@@ -0,0 +1,269 @@
+"""
+Per-request instrumentation.
+
+MetricsMiddleware times every HTTP request and, through SQLAlchemy cursor
+events, counts the statements it runs and the time spent in the database.
+Serialization time is measured from the moment the endpoint function
+returns to the moment the response starts (response model validation plus
+rendering). Per route template, the results are:
+
+- aggregated in an in-process registry rendered in the Prometheus text
+  format at GET /metrics (one registry per worker process), and
+- reported to the client in a Server-Timing header.
+
+With SLOW_QUERY_MS set, statements slower than that are logged together
+with the shape of their parameters (types and row count, never values).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from .config import settings
+from .database import engine
+from .queryguard import check_query_budget
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestStats:
+    scope: dict
+    statements: int = 0
+    db_seconds: float = 0.0
+    endpoint_returned: Optional[float] = None
+    serialize_seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the shared ASGI scope
+        route = self.scope.get("route")
+        return route.path if route is not None else "unmatched"
+
+    def server_timing(self, app_seconds: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} queries", '
+            f"serialize;dur={self.serialize_seconds * 1000:.1f}, "
+            f"app;dur={app_seconds * 1000:.1f}"
+        )
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside a request."""
+    return _request_stats.get()
+
+
+# Database events
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning("Slow query", extra={
+            "duration_ms": round(elapsed * 1000, 1),
+            "route": stats.route if stats else None,
+            "statement": statement,
+            "parameters": parameter_shape(parameters, executemany),
+        })
+
+
+@event.listens_for(engine, "handle_error")
+def _failed_statement(context):
+    # after_cursor_execute is skipped when a statement fails
+    starts = context.connection.info.get("statement_start") if context.connection else None
+    if starts:
+        starts.pop()
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Describe statement parameters by type, e.g. {"rows": 50, "row": ["int", "str"]}."""
+    if executemany:
+        return {"rows": len(parameters), "row": parameter_shape(parameters[0]) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+# Metric registry
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.series: Dict[Tuple[Tuple[str, str], ...], list] = {}
+
+    def observe(self, labels: Tuple[Tuple[str, str], ...], value: float):
+        # One count per bucket plus +Inf, then the sum
+        series = self.series.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}"
+            yield f"{self.name}_sum{_labels(labels)} {series[-1]}"
+            yield f"{self.name}_count{_labels(labels)} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.series: Dict[Tuple[Tuple[str, str], ...], int] = {}
+
+    def inc(self, labels: Tuple[Tuple[str, str], ...]):
+        self.series[labels] = self.series.get(labels, 0) + 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self.series.items():
+            yield f"{self.name}{_labels(labels)} {value}"
+
+
+def _labels(labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter("http_requests_total", "HTTP requests by route and status.")
+        self.duration = Histogram(
+            "http_request_duration_seconds", "Time to handle a request.", DURATION_BUCKETS)
+        self.db_statements = Histogram(
+            "http_request_db_statements", "SQL statements executed per request.", STATEMENT_BUCKETS)
+        self.db_duration = Histogram(
+            "http_request_db_duration_seconds", "Time spent executing SQL per request.", DURATION_BUCKETS)
+        self.serialize_duration = Histogram(
+            "http_request_serialization_seconds", "Time spent serializing the response.", DURATION_BUCKETS)
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size.", SIZE_BUCKETS)
+
+    def observe(self, method: str, status: int, stats: RequestStats, seconds: float, size: int):
+        labels = (("method", method), ("route", stats.route))
+        with self._lock:
+            self.requests.inc(labels + (("status", str(status)),))
+            self.duration.observe(labels, seconds)
+            self.db_statements.observe(labels, stats.statements)
+            self.db_duration.observe(labels, stats.db_seconds)
+            self.serialize_duration.observe(labels, stats.serialize_seconds)
+            self.response_size.observe(labels, size)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = (self.requests, self.duration, self.db_statements, self.db_duration,
+                       self.serialize_duration, self.response_size)
+            return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# ASGI middleware
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_timing(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                now = time.perf_counter()
+                if stats.endpoint_returned is not None:
+                    stats.serialize_seconds = now - stats.endpoint_returned
+                route = scope.get("route")
+                if route is not None:
+                    check_query_budget(route.endpoint, route.path, stats.statements)
+                if settings.SERVER_TIMING:
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing(now - start))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            registry.observe(scope["method"], status, stats, time.perf_counter() - start, size)
+
+
+def _endpoint_returned():
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.endpoint_returned = time.perf_counter()
+
+
+def _timed_endpoint(call):
+    if asyncio.iscoroutinefunction(call):
+        async def endpoint(**kwargs):
+            try:
+                return await call(**kwargs)
+            finally:
+                _endpoint_returned()
+    else:
+        def endpoint(**kwargs):
+            try:
+                return call(**kwargs)
+            finally:
+                _endpoint_returned()
+    return endpoint
+
+
+def instrument_routes(routes):
+    """
+    Record when each endpoint function returns, so the rest of the request
+    can be attributed to serialization. Call once, after all routers are
+    included.
+    """
+    for route in routes:
+        if isinstance(route, APIRoute):
+            route.dependant.call = _timed_endpoint(route.dependant.call)
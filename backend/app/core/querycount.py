@@ -0,0 +1,68 @@
+"""
+SQL statement counting for tests and benchmarks.
+
+    with count_queries() as counter:
+        client.post("/api/v1/items", ...)
+    assert counter.count == 3, counter.statements
+
+Counting is process-wide: every statement sent through the engine while a
+counter is active is recorded, so only use it with one request in flight.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+
+from .database import engine
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+_active: List[QueryCounter] = []
+_lock = threading.Lock()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    if _active:
+        with _lock:
+            for counter in _active:
+                counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Record the statements executed inside the block."""
+    counter = QueryCounter()
+    with _lock:
+        _active.append(counter)
+    try:
+        yield counter
+    finally:
+        with _lock:
+            _active.remove(counter)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail if the block executes more than limit statements."""
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        raise QueryBudgetExceeded(
+            f"{counter.count} statements executed, expected at most {limit}:\n"
+            + "\n".join(counter.statements)
+        )
@@ -0,0 +1,75 @@
+"""
+N+1 query guard for development and tests.
+
+Enabled with QUERY_GUARD=warn (log) or QUERY_GUARD=raise (fail the request).
+It flags two things:
+
+- Repeated lazy loads: the same relationship lazily loaded for more than one
+  object in a request, e.g. CampaignDetail.members[].user. These are the
+  queries whose number grows with the size of the result. Loading one
+  relationship once is fine; the second lazy load of the same relationship
+  is treated like raiseload.
+- Query budgets: endpoints decorated with @query_budget(n) may run at most n
+  statements per request, including authentication and serialization.
+
+The budget check runs in MetricsMiddleware, which counts the statements.
+"""
+
+import logging
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState
+
+from .config import settings
+from .database import SessionLocal
+from .querycount import QueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class RepeatedLazyLoad(AssertionError):
+    pass
+
+
+def query_budget(limit: int):
+    """Declare the most statements a request to the decorated endpoint may run."""
+    def decorator(endpoint):
+        endpoint.query_budget = limit
+        return endpoint
+    return decorator
+
+
+def _violation(error: AssertionError):
+    if settings.QUERY_GUARD == "raise":
+        raise error
+    logger.warning(str(error))
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _check_lazy_load(orm_execute_state: ORMExecuteState):
+    if (
+        settings.QUERY_GUARD == "off"
+        or not orm_execute_state.is_select
+        or orm_execute_state.lazy_loaded_from is None
+    ):
+        return
+    relationship = orm_execute_state.loader_strategy_path[-1]
+    key = str(relationship)
+    loaded = orm_execute_state.session.info.setdefault("lazy_loads", defaultdict(set))
+    loaded[key].add(orm_execute_state.lazy_loaded_from.identity)
+    if len(loaded[key]) > 1:
+        _violation(RepeatedLazyLoad(
+            f"{key} lazily loaded for {len(loaded[key])} objects in one request; "
+            "load it with selectinload() or joinedload()"
+        ))
+
+
+def check_query_budget(endpoint, route: str, statements: int):
+    """Report a request that ran more statements than its endpoint's budget."""
+    limit = getattr(endpoint, "query_budget", None)
+    if settings.QUERY_GUARD == "off" or limit is None or statements <= limit:
+        return
+    _violation(QueryBudgetExceeded(
+        f"{route} executed {statements} statements, budget is {limit}"
+    ))
@@ -0,0 +1,34 @@
+"""
+JSON responses.
+
+JSONResponse renders with orjson and is the app's default response class.
+For list endpoints returning ORM rows, json_list() validates the rows once
+into the response schema and has pydantic write the JSON directly, skipping
+FastAPI's serialize-to-dict-then-encode pass. Keep the endpoint's
+response_model for the OpenAPI schema.
+"""
+
+from functools import lru_cache
+from typing import Any, List, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse as BaseJSONResponse
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+
+class JSONResponse(BaseJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def json_list(schema, rows: Sequence[Any], status_code: int = 200) -> Response:
+    """Serialize ORM rows as a JSON array of schema."""
+    adapter = _list_adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+    return Response(body, status_code=status_code, media_type="application/json")
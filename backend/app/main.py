@@ -1,7 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm.exc import StaleDataError
 from .core import settings, Base, engine
+from .core.logging import configure_logging
+from .core.responses import JSONResponse
+from .core.compression import CompressionMiddleware
+from .core.idempotency import IdempotencyMiddleware
+from .core.metrics import MetricsMiddleware, instrument_routes, registry
 from .api import api_router
+from .services import encounter_turns, jobs, revisions
+from .services.workers import shutdown_process_pool
+
+configure_logging()
+revisions.register()
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -10,7 +22,8 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=JSONResponse
 )
 
 # Configure CORS
@@ -20,11 +33,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Inside compression, so stored responses can be replayed in any encoding
+app.add_middleware(IdempotencyMiddleware)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Added last so it is outermost: timings cover compression and sizes are on the wire
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
+if settings.METRICS_ENABLED:
+    instrument_routes(app.routes)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Request metrics of this worker process in the Prometheus text format."""
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.exception_handler(StaleDataError)
+def stale_data(request: Request, exc: StaleDataError):
+    # Another request updated or deleted the row after this one read it
+    return JSONResponse(
+        {"detail": "This record was changed by someone else; reload it and try again"}, status_code=412
+    )
+
+
+@app.on_event("startup")
+def startup():
+    if settings.JOB_WORKER_IN_API:
+        jobs.start_worker_thread()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    jobs.stop_worker_thread()
+    # Persist turn state still held by the write-behind cache
+    encounter_turns.stop()
+    shutdown_process_pool()
+
 
 @app.get("/")
 def root():
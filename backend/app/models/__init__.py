@@ -1,11 +1,17 @@
 from .user import User
 from .campaign import Campaign, CampaignMember, CampaignRole
-from .character import Character, CharacterItem
+from .character import Character, CharacterItem, CharacterSpell, CharacterFeature
 from .place import Place, PlaceType
 from .item import Item, ItemType, ItemRarity
 from .quest import Quest, QuestStatus
 from .session import Session
 from .note import Note
+from .encounter import Encounter, Combatant
+from .upload import StoredFile
+from .route import Route, TravelMode, Terrain
+from .job import Job, JobStatus
+from .idempotency import IdempotencyKey
+from .revision import Revision
 
 __all__ = [
     "User",
@@ -14,6 +20,8 @@ __all__ = [
     "CampaignRole",
     "Character",
     "CharacterItem",
+    "CharacterSpell",
+    "CharacterFeature",
     "Place",
     "PlaceType",
     "Item",
@@ -23,4 +31,14 @@ __all__ = [
     "QuestStatus",
     "Session",
     "Note",
+    "Encounter",
+    "Combatant",
+    "StoredFile",
+    "Route",
+    "TravelMode",
+    "Terrain",
+    "Job",
+    "JobStatus",
+    "IdempotencyKey",
+    "Revision",
 ]
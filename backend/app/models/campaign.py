@@ -2,7 +2,7 @@ from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
-from ..core.database import Base
+from ..core.database import Base, SoftDeleted, Versioned
 
 
 class CampaignRole(str, enum.Enum):
@@ -11,8 +11,10 @@ class CampaignRole(str, enum.Enum):
     VIEWER = "viewer"
 
 
-class Campaign(Base):
+class Campaign(SoftDeleted, Versioned, Base):
     __tablename__ = "campaigns"
+    # Set by delete and restore, not an edit
+    __revision_exclude__ = ("deleted_at",)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -32,13 +34,16 @@ class Campaign(Base):
     quests = relationship("Quest", back_populates="campaign", cascade="all, delete-orphan")
     sessions = relationship("Session", back_populates="campaign", cascade="all, delete-orphan")
     notes = relationship("Note", back_populates="campaign", cascade="all, delete-orphan")
+    encounters = relationship("Encounter", back_populates="campaign", cascade="all, delete-orphan")
+    routes = relationship("Route", back_populates="campaign", cascade="all, delete-orphan")
+    revisions = relationship("Revision", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class CampaignMember(Base):
     __tablename__ = "campaign_members"
 
     id = Column(Integer, primary_key=True, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     role = Column(Enum(CampaignRole), default=CampaignRole.PLAYER, nullable=False)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
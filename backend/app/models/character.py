@@ -1,15 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from ..core.database import Base
+from ..core.database import Base, Versioned
 
 
-class Character(Base):
+class Character(Versioned, Base):
     __tablename__ = "characters"
+    # Hit point and spell slot changes are applied in SQL
+    __revision_exclude__ = ("hit_points_current", "hit_points_temp", "spell_slots")
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Basic Info
@@ -72,14 +74,17 @@ class Character(Base):
     campaign = relationship("Campaign", back_populates="characters")
     creator = relationship("User", back_populates="characters")
     inventory = relationship("CharacterItem", back_populates="character", cascade="all, delete-orphan")
+    combatants = relationship("Combatant", back_populates="character", cascade="all, delete-orphan")
+    spell_index = relationship("CharacterSpell", back_populates="character", cascade="all, delete-orphan")
+    feature_index = relationship("CharacterFeature", back_populates="character", cascade="all, delete-orphan")
 
 
 class CharacterItem(Base):
     __tablename__ = "character_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    character_id = Column(Integer, ForeignKey("characters.id"), nullable=False)
-    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    character_id = Column(Integer, ForeignKey("characters.id", ondelete="CASCADE"), nullable=False, index=True)
+    item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False, index=True)
     quantity = Column(Integer, default=1)
     is_equipped = Column(Boolean, default=False)
     notes = Column(Text)
@@ -88,3 +93,42 @@ class CharacterItem(Base):
     # Relationships
     character = relationship("Character", back_populates="inventory")
     item = relationship("Item", back_populates="character_items")
+
+
+class CharacterSpell(Base):
+    """Searchable copy of one entry of Character.spells."""
+    __tablename__ = "character_spells"
+
+    id = Column(Integer, primary_key=True, index=True)
+    character_id = Column(Integer, ForeignKey("characters.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    name_key = Column(String, nullable=False)  # Lowercased name for lookups
+    level = Column(Integer, default=0)
+    school = Column(String)
+    prepared = Column(Boolean, default=False)
+    srd_id = Column(String)  # SRD catalog id, when the spell is in the catalog
+
+    # Relationships
+    character = relationship("Character", back_populates="spell_index")
+
+    __table_args__ = (
+        Index("ix_character_spells_name_key", "name_key", "character_id"),
+    )
+
+
+class CharacterFeature(Base):
+    """Searchable copy of one entry of Character.features."""
+    __tablename__ = "character_features"
+
+    id = Column(Integer, primary_key=True, index=True)
+    character_id = Column(Integer, ForeignKey("characters.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    name_key = Column(String, nullable=False)  # Lowercased name for lookups
+    source = Column(String)
+
+    # Relationships
+    character = relationship("Character", back_populates="feature_index")
+
+    __table_args__ = (
+        Index("ix_character_features_name_key", "name_key", "character_id"),
+    )
@@ -0,0 +1,61 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..core.database import Base, Versioned
+
+
+class Encounter(Versioned, Base):
+    __tablename__ = "encounters"
+    # Written back from the turn cache
+    __revision_exclude__ = ("round", "turn_index")
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
+    description = Column(Text)
+
+    # Turn tracking: round 0 means combat has not started yet
+    round = Column(Integer, default=0, nullable=False)
+    turn_index = Column(Integer, default=0, nullable=False)  # Position of the active combatant
+    is_active = Column(Boolean, default=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    campaign = relationship("Campaign", back_populates="encounters")
+    combatants = relationship(
+        "Combatant",
+        back_populates="encounter",
+        cascade="all, delete-orphan",
+        order_by="Combatant.position"
+    )
+
+
+class Combatant(Base):
+    __tablename__ = "combatants"
+
+    id = Column(Integer, primary_key=True, index=True)
+    encounter_id = Column(Integer, ForeignKey("encounters.id", ondelete="CASCADE"), nullable=False)
+    character_id = Column(Integer, ForeignKey("characters.id", ondelete="CASCADE"), nullable=True, index=True)  # Null for monsters
+
+    name = Column(String, nullable=False)
+    initiative = Column(Integer, default=0, nullable=False)
+    position = Column(Integer, default=0, nullable=False)  # Turn order, 0 acts first
+
+    # Combat stats for combatants without a character sheet
+    armor_class = Column(Integer)
+    hit_points_current = Column(Integer)
+    hit_points_max = Column(Integer)
+
+    conditions = Column(JSON)  # ['prone', 'poisoned']
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    encounter = relationship("Encounter", back_populates="combatants")
+    character = relationship("Character", back_populates="combatants")
+
+    __table_args__ = (
+        Index("ix_combatants_encounter_position", "encounter_id", "position"),
+    )
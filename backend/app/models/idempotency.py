@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, LargeBinary
+from ..core.database import Base
+
+
+class IdempotencyKey(Base):
+    """The stored response to a POST sent with an Idempotency-Key (see core.idempotency)."""
+    __tablename__ = "idempotency_keys"
+
+    # SHA-256 of the user and the client's key, so keys are short and per user
+    key = Column(String(64), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # SHA-256 of the request
+    claim = Column(String(32))  # Random token of the request that runs it
+
+    # None while the first request is still running
+    status_code = Column(Integer)
+    headers = Column(Text)  # JSON [[name, value], ...]
+    body = Column(LargeBinary)
+
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -2,7 +2,7 @@ from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
-from ..core.database import Base
+from ..core.database import Base, Versioned
 
 
 class ItemRarity(str, enum.Enum):
@@ -26,12 +26,12 @@ class ItemType(str, enum.Enum):
     OTHER = "other"
 
 
-class Item(Base):
+class Item(Versioned, Base):
     __tablename__ = "items"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
 
     item_type = Column(Enum(ItemType), default=ItemType.OTHER, nullable=False)
     rarity = Column(Enum(ItemRarity), default=ItemRarity.COMMON, nullable=False)
@@ -52,6 +52,7 @@ class Item(Base):
 
     # External reference
     dndbeyond_url = Column(String)
+    srd_id = Column(String, index=True)  # SRD catalog id; description comes from the catalog
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
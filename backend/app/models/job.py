@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.sql import func
+import enum
+from ..core.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """A unit of background work, queued by the API and run by a worker (see services.jobs)."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # e.g., "dndbeyond_import"
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    payload = Column(Text)  # JSON arguments for the handler
+    result = Column(Text)  # JSON returned by the handler
+    error = Column(Text)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime(timezone=True), nullable=False)  # not before; pushed back on retry
+
+    # Worker holding the job while it runs
+    locked_by = Column(String)
+    locked_at = Column(DateTime(timezone=True))
+
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Workers look for the oldest due job in a status
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
@@ -1,14 +1,14 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from ..core.database import Base
+from ..core.database import Base, Versioned
 
 
-class Note(Base):
+class Note(Versioned, Base):
     __tablename__ = "notes"
 
     id = Column(Integer, primary_key=True, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
 
     title = Column(String, nullable=False, index=True)
     content = Column(Text)
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
-from ..core.database import Base
+from ..core.database import Base, Versioned
 
 
 class PlaceType(str, enum.Enum):
@@ -17,13 +17,13 @@ class PlaceType(str, enum.Enum):
     OTHER = "other"
 
 
-class Place(Base):
+class Place(Versioned, Base):
     __tablename__ = "places"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
-    parent_place_id = Column(Integer, ForeignKey("places.id"), nullable=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False)
+    parent_place_id = Column(Integer, ForeignKey("places.id", ondelete="SET NULL"), nullable=True, index=True)
 
     place_type = Column(Enum(PlaceType), default=PlaceType.OTHER, nullable=False)
     description = Column(Text)
@@ -39,6 +39,9 @@ class Place(Base):
     # Map data
     map_image_url = Column(String)
     map_coordinates = Column(String)  # JSON string for lat/lng or x/y coordinates
+    # map_coordinates as numbers, kept in sync by the places endpoints
+    map_x = Column(Float)
+    map_y = Column(Float)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -46,3 +49,14 @@ class Place(Base):
     # Relationships
     campaign = relationship("Campaign", back_populates="places")
     parent_place = relationship("Place", remote_side=[id], backref="sub_places")
+    routes_from = relationship(
+        "Route", foreign_keys="Route.from_place_id", back_populates="from_place", cascade="all, delete-orphan"
+    )
+    routes_to = relationship(
+        "Route", foreign_keys="Route.to_place_id", back_populates="to_place", cascade="all, delete-orphan"
+    )
+
+    __table_args__ = (
+        # Position on the parent place's map (see services.place_map)
+        Index("ix_places_map_position", "campaign_id", "parent_place_id", "map_x", "map_y"),
+    )
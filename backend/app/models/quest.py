@@ -2,7 +2,7 @@ from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
-from ..core.database import Base
+from ..core.database import Base, Versioned
 
 
 class QuestStatus(str, enum.Enum):
@@ -13,12 +13,12 @@ class QuestStatus(str, enum.Enum):
     ON_HOLD = "on_hold"
 
 
-class Quest(Base):
+class Quest(Versioned, Base):
     __tablename__ = "quests"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
 
     description = Column(Text)
     objectives = Column(Text)  # List of objectives
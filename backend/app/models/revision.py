@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class Revision(Base):
+    """A change to a versioned campaign entity, as a patch back to the previous version (see services.revisions)."""
+    __tablename__ = "revisions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String(32), nullable=False)  # table name, e.g. "notes"
+    entity_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)  # the version this change created
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    patch = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_revisions_entity_version", "entity_type", "entity_id", "version", unique=True),
+    )
@@ -0,0 +1,54 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean, Float
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+from ..core.database import Base, Versioned
+
+
+class TravelMode(str, enum.Enum):
+    FOOT = "foot"
+    MOUNTED = "mounted"
+    WAGON = "wagon"
+    BOAT = "boat"
+    SHIP = "ship"
+    FLYING = "flying"
+
+
+class Terrain(str, enum.Enum):
+    ROAD = "road"
+    PLAINS = "plains"
+    FOREST = "forest"
+    HILLS = "hills"
+    MOUNTAINS = "mountains"
+    SWAMP = "swamp"
+    DESERT = "desert"
+    ARCTIC = "arctic"
+    WATER = "water"
+    UNDERDARK = "underdark"
+
+
+class Route(Versioned, Base):
+    """A way to travel between two places of a campaign."""
+    __tablename__ = "routes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
+    from_place_id = Column(Integer, ForeignKey("places.id", ondelete="CASCADE"), nullable=False, index=True)
+    to_place_id = Column(Integer, ForeignKey("places.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    name = Column(String)  # e.g., "Triboar Trail"
+    distance = Column(Float, nullable=False)  # miles
+    terrain = Column(Enum(Terrain), default=Terrain.PLAINS, nullable=False)
+    travel_mode = Column(Enum(TravelMode), default=TravelMode.FOOT, nullable=False)
+    # Overrides the travel time worked out from distance, mode and terrain
+    travel_hours = Column(Float)
+    bidirectional = Column(Boolean, default=True, nullable=False)
+    notes = Column(Text)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    campaign = relationship("Campaign", back_populates="routes")
+    from_place = relationship("Place", foreign_keys=[from_place_id], back_populates="routes_from")
+    to_place = relationship("Place", foreign_keys=[to_place_id], back_populates="routes_to")
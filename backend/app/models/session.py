@@ -1,14 +1,14 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Date
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from ..core.database import Base
+from ..core.database import Base, Versioned
 
 
-class Session(Base):
+class Session(Versioned, Base):
     __tablename__ = "sessions"
 
     id = Column(Integer, primary_key=True, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
 
     session_number = Column(Integer, nullable=False)
     title = Column(String)
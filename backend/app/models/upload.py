@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class StoredFile(Base):
+    """An uploaded file, stored once under the SHA-256 of its content."""
+    __tablename__ = "stored_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, unique=True, index=True)
+    content_type = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)  # bytes
+
+    # Image dimensions in pixels
+    width = Column(Integer)
+    height = Column(Integer)
+
+    # Map tile pyramid: None (not tiled), "pending", "ready" or "failed"
+    tile_status = Column(String)
+    tile_levels = Column(Integer)
+
+    original_name = Column(String)
+    uploaded_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
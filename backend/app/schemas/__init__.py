@@ -1,11 +1,31 @@
 from .user import User, UserCreate, UserUpdate, UserInDB, Token, TokenData
 from .campaign import Campaign, CampaignCreate, CampaignUpdate, CampaignDetail, CampaignMember, CampaignMemberCreate
-from .character import Character, CharacterCreate, CharacterUpdate, CharacterItem, CharacterItemCreate
-from .place import Place, PlaceCreate, PlaceUpdate
-from .item import Item, ItemCreate, ItemUpdate
-from .quest import Quest, QuestCreate, QuestUpdate
+from .character import (
+    Character, CharacterCreate, CharacterUpdate, CharacterBulkCreate, CharacterBulkUpdate,
+    CharacterItem, CharacterItemCreate,
+    HitPointOperation, HitPointChange, HitPointBatchChange, HitPointState, SpellSlotChange, SpellSlotState, DerivedStats,
+)
+from .place import Place, PlaceCreate, PlaceUpdate, PlaceBulkCreate, PlaceBulkUpdate, NearbyPlace
+from .item import Item, ItemCreate, ItemUpdate, ItemBulkCreate, ItemBulkUpdate
+from .quest import Quest, QuestCreate, QuestUpdate, QuestBulkCreate, QuestBulkUpdate
 from .session import Session, SessionCreate, SessionUpdate
-from .note import Note, NoteCreate, NoteUpdate
+from .note import Note, NoteCreate, NoteUpdate, NoteBulkCreate, NoteBulkUpdate
+from .encounter import (
+    Encounter, EncounterCreate, EncounterUpdate, EncounterDetail, EncounterTurn,
+    Combatant, CombatantCreate, CombatantUpdate,
+    MonsterProfile, EncounterSimulationRequest, EncounterSimulationResult,
+)
+from .dice import DiceRollRequest, DiceRoll, DiceSummary, DiceRollResult
+from .srd import SRDSpell, SRDItem, SRDMonster, SRDCatalog
+from .inventory import (
+    InventoryAdd, InventoryRemove, InventoryTransfer, InventoryEntryUpdate,
+    InventoryEntry, InventoryTotals, Inventory, InventoryTransferResult,
+)
+from .upload import StoredFile, TileSet
+from .route import Route, RouteCreate, RouteUpdate, RouteBulkCreate, Journey, JourneyLeg
+from .job import Job
+from .revision import Revision, EntityVersion
+from .bulk import BulkDelete
 
 __all__ = [
     "User",
@@ -23,21 +43,78 @@ __all__ = [
     "Character",
     "CharacterCreate",
     "CharacterUpdate",
+    "CharacterBulkCreate",
+    "CharacterBulkUpdate",
     "CharacterItem",
     "CharacterItemCreate",
+    "HitPointOperation",
+    "HitPointChange",
+    "HitPointBatchChange",
+    "HitPointState",
+    "SpellSlotChange",
+    "SpellSlotState",
+    "DerivedStats",
     "Place",
     "PlaceCreate",
     "PlaceUpdate",
+    "PlaceBulkCreate",
+    "PlaceBulkUpdate",
+    "NearbyPlace",
     "Item",
     "ItemCreate",
     "ItemUpdate",
+    "ItemBulkCreate",
+    "ItemBulkUpdate",
     "Quest",
     "QuestCreate",
     "QuestUpdate",
+    "QuestBulkCreate",
+    "QuestBulkUpdate",
     "Session",
     "SessionCreate",
     "SessionUpdate",
     "Note",
     "NoteCreate",
     "NoteUpdate",
+    "NoteBulkCreate",
+    "NoteBulkUpdate",
+    "Encounter",
+    "EncounterCreate",
+    "EncounterUpdate",
+    "EncounterDetail",
+    "EncounterTurn",
+    "Combatant",
+    "CombatantCreate",
+    "CombatantUpdate",
+    "MonsterProfile",
+    "EncounterSimulationRequest",
+    "EncounterSimulationResult",
+    "DiceRollRequest",
+    "DiceRoll",
+    "DiceSummary",
+    "DiceRollResult",
+    "SRDSpell",
+    "SRDItem",
+    "SRDMonster",
+    "SRDCatalog",
+    "InventoryAdd",
+    "InventoryRemove",
+    "InventoryTransfer",
+    "InventoryEntryUpdate",
+    "InventoryEntry",
+    "InventoryTotals",
+    "Inventory",
+    "InventoryTransferResult",
+    "StoredFile",
+    "TileSet",
+    "Route",
+    "RouteCreate",
+    "RouteUpdate",
+    "RouteBulkCreate",
+    "Journey",
+    "JourneyLeg",
+    "Job",
+    "Revision",
+    "EntityVersion",
+    "BulkDelete",
 ]
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import List
+from ..core.config import settings
+
+BULK_MAX_ROWS = settings.BULK_MAX_ROWS
+
+
+class BulkDelete(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=BULK_MAX_ROWS)
@@ -52,9 +52,11 @@ class CampaignMember(CampaignMemberBase):
 
 class Campaign(CampaignBase):
     id: int
+    version: int
     owner_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None  # set while a deleted campaign can be restored
 
     class Config:
         from_attributes = True
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import enum
+from .bulk import BULK_MAX_ROWS
 
 
 class CharacterBase(BaseModel):
@@ -11,6 +13,8 @@ class CharacterBase(BaseModel):
     background: Optional[str] = None
     alignment: Optional[str] = None
     stats: Optional[Dict[str, int]] = None
+    spells: Optional[Dict[str, List[Any]]] = None
+    features: Optional[List[Any]] = None
     backstory: Optional[str] = None
     personality_traits: Optional[str] = None
     ideals: Optional[str] = None
@@ -33,6 +37,8 @@ class CharacterUpdate(BaseModel):
     background: Optional[str] = None
     alignment: Optional[str] = None
     stats: Optional[Dict[str, int]] = None
+    spells: Optional[Dict[str, List[Any]]] = None
+    features: Optional[List[Any]] = None
     backstory: Optional[str] = None
     personality_traits: Optional[str] = None
     ideals: Optional[str] = None
@@ -43,8 +49,23 @@ class CharacterUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
+class CharacterBulkCreate(BaseModel):
+    campaign_id: int
+    characters: List[CharacterBase] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
+class CharacterBulkUpdateRow(CharacterUpdate):
+    id: int
+    version: Optional[int] = None  # expected current version (412 if it has changed)
+
+
+class CharacterBulkUpdate(BaseModel):
+    characters: List[CharacterBulkUpdateRow] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
 class Character(CharacterBase):
     id: int
+    version: int
     campaign_id: int
     creator_id: int
     dndbeyond_url: Optional[str] = None
@@ -75,3 +96,54 @@ class CharacterItem(CharacterItemBase):
 
     class Config:
         from_attributes = True
+
+
+class HitPointOperation(str, enum.Enum):
+    DAMAGE = "damage"
+    HEAL = "heal"
+    SET_TEMP = "set_temp"
+
+
+class HitPointChange(BaseModel):
+    operation: HitPointOperation
+    amount: int = Field(ge=0)
+
+
+class HitPointBatchChange(HitPointChange):
+    character_ids: List[int] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
+class HitPointState(BaseModel):
+    id: int
+    hit_points_current: Optional[int] = None
+    hit_points_max: Optional[int] = None
+    hit_points_temp: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SpellSlotChange(BaseModel):
+    level: int = Field(ge=1, le=9)
+    used: int = 1  # Negative values restore slots
+
+
+class SpellSlotState(BaseModel):
+    id: int
+    spell_slots: Optional[Dict[str, Any]] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DerivedStats(BaseModel):
+    character_id: int
+    name: str
+    ability_modifiers: Dict[str, int]
+    proficiency_bonus: int
+    initiative: int
+    saving_throws: Dict[str, int]
+    skills: Dict[str, int]
+    passive_perception: int
+    spell_save_dc: Optional[int] = None
+    spell_attack_bonus: Optional[int] = None
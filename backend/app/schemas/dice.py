@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Literal
+
+
+class DiceRollRequest(BaseModel):
+    expression: str = Field(max_length=200)
+    count: int = Field(default=1, ge=1, le=100000)
+    mode: Literal["log", "summary"] = "log"
+    seed: Optional[int] = None
+
+
+class DiceTermResult(BaseModel):
+    dice: str
+    rolls: List[int]
+    kept: List[int]
+    subtotal: int
+
+
+class DiceRoll(BaseModel):
+    expression: str
+    total: int
+    terms: List[DiceTermResult]
+    constant: int
+
+
+class DiceSummary(BaseModel):
+    count: int
+    mean: float
+    std: float
+    min: int
+    max: int
+    percentiles: Dict[str, float]
+    histogram: Dict[int, int]
+
+
+class DiceRollResult(BaseModel):
+    expression: str
+    rolls: Optional[List[DiceRoll]] = None
+    summary: Optional[DiceSummary] = None
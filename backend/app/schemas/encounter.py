@@ -0,0 +1,108 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List, Dict
+
+
+class CombatantBase(BaseModel):
+    name: Optional[str] = None
+    character_id: Optional[int] = None
+    initiative: int = 0
+    armor_class: Optional[int] = None
+    hit_points_current: Optional[int] = None
+    hit_points_max: Optional[int] = None
+    conditions: List[str] = []
+
+
+class CombatantCreate(CombatantBase):
+    pass
+
+
+class CombatantUpdate(BaseModel):
+    name: Optional[str] = None
+    initiative: Optional[int] = None
+    armor_class: Optional[int] = None
+    hit_points_current: Optional[int] = None
+    hit_points_max: Optional[int] = None
+    conditions: Optional[List[str]] = None
+
+
+class Combatant(CombatantBase):
+    id: int
+    name: str
+    encounter_id: int
+    position: int
+    conditions: Optional[List[str]] = None
+
+    class Config:
+        from_attributes = True
+
+
+class EncounterBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+    is_active: bool = True
+
+
+class EncounterCreate(EncounterBase):
+    campaign_id: int
+    combatants: List[CombatantCreate] = []
+
+
+class EncounterUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class Encounter(EncounterBase):
+    id: int
+    version: int
+    campaign_id: int
+    round: int
+    turn_index: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class EncounterDetail(Encounter):
+    combatants: List[Combatant] = []
+
+
+class EncounterTurn(BaseModel):
+    encounter_id: int
+    round: int
+    turn_index: int
+    combatant: Optional[Combatant] = None
+
+
+class MonsterProfile(BaseModel):
+    name: str
+    count: int = Field(default=1, ge=1, le=50)
+    armor_class: int
+    hit_points: int = Field(ge=1)
+    attack_bonus: int = 0
+    damage: str
+    attacks: int = Field(default=1, ge=1, le=10)
+
+
+class EncounterSimulationRequest(BaseModel):
+    campaign_id: int
+    character_ids: Optional[List[int]] = None  # Defaults to all active player characters
+    monsters: List[MonsterProfile] = Field(min_length=1, max_length=20)
+    simulations: int = Field(default=10000, ge=1, le=1000000)
+    max_rounds: int = Field(default=20, ge=1, le=100)
+    seed: Optional[int] = None
+
+
+class EncounterSimulationResult(BaseModel):
+    simulations: int
+    win_probability: float
+    loss_probability: float
+    timeout_probability: float
+    expected_rounds: Optional[float] = None
+    expected_party_deaths: float
+    survival: Dict[str, float]
+    simulations_per_second: Optional[float] = None
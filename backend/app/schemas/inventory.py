@@ -0,0 +1,70 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List
+from ..models.item import ItemType, ItemRarity
+from .bulk import BULK_MAX_ROWS
+
+
+class InventoryAddRow(BaseModel):
+    item_id: int
+    quantity: int = Field(1, ge=1)
+    is_equipped: bool = False
+    notes: Optional[str] = None
+
+
+class InventoryAdd(BaseModel):
+    items: List[InventoryAddRow] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
+class InventoryQuantity(BaseModel):
+    item_id: int
+    quantity: int = Field(1, ge=1)
+
+
+class InventoryRemove(BaseModel):
+    items: List[InventoryQuantity] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
+class InventoryTransfer(InventoryRemove):
+    to_character_id: int
+
+
+class InventoryEntryUpdate(BaseModel):
+    quantity: Optional[int] = Field(None, ge=1)
+    is_equipped: Optional[bool] = None
+    notes: Optional[str] = None
+
+
+class InventoryEntry(BaseModel):
+    id: int
+    item_id: int
+    quantity: int
+    is_equipped: bool
+    notes: Optional[str] = None
+    added_at: datetime
+    name: str
+    item_type: ItemType
+    rarity: ItemRarity
+    weight: Optional[float] = None
+    ac_bonus: Optional[int] = None
+    requires_attunement: bool = False
+    is_magical: bool = False
+    srd_id: Optional[str] = None
+
+
+class InventoryTotals(BaseModel):
+    item_count: int = 0
+    carried_weight: float = 0
+    attuned_items: int = 0
+    equipped_ac_bonus: int = 0
+
+
+class Inventory(BaseModel):
+    character_id: int
+    items: List[InventoryEntry]
+    totals: InventoryTotals
+
+
+class InventoryTransferResult(BaseModel):
+    source: Inventory
+    destination: Inventory
@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from ..models.item import ItemType, ItemRarity
+from .bulk import BULK_MAX_ROWS
 
 
 class ItemBase(BaseModel):
@@ -18,6 +19,7 @@ class ItemBase(BaseModel):
     is_magical: bool = False
     is_cursed: bool = False
     dndbeyond_url: Optional[str] = None
+    srd_id: Optional[str] = None
 
 
 class ItemCreate(ItemBase):
@@ -38,10 +40,26 @@ class ItemUpdate(BaseModel):
     is_magical: Optional[bool] = None
     is_cursed: Optional[bool] = None
     dndbeyond_url: Optional[str] = None
+    srd_id: Optional[str] = None
+
+
+class ItemBulkCreate(BaseModel):
+    campaign_id: int
+    items: List[ItemBase] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
+class ItemBulkUpdateRow(ItemUpdate):
+    id: int
+    version: Optional[int] = None  # expected current version (412 if it has changed)
+
+
+class ItemBulkUpdate(BaseModel):
+    items: List[ItemBulkUpdateRow] = Field(min_length=1, max_length=BULK_MAX_ROWS)
 
 
 class Item(ItemBase):
     id: int
+    version: int
     campaign_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from ..models.job import JobStatus
+
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    result: Optional[str] = None  # JSON
+    error: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
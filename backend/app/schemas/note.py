@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
+from .bulk import BULK_MAX_ROWS
 
 
 class NoteBase(BaseModel):
@@ -23,8 +24,23 @@ class NoteUpdate(BaseModel):
     is_dm_only: Optional[bool] = None
 
 
+class NoteBulkCreate(BaseModel):
+    campaign_id: int
+    notes: List[NoteBase] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
+class NoteBulkUpdateRow(NoteUpdate):
+    id: int
+    version: Optional[int] = None  # expected current version (412 if it has changed)
+
+
+class NoteBulkUpdate(BaseModel):
+    notes: List[NoteBulkUpdateRow] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
 class Note(NoteBase):
     id: int
+    version: int
     campaign_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
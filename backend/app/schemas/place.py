@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from ..models.place import PlaceType
+from .bulk import BULK_MAX_ROWS
 
 
 class PlaceBase(BaseModel):
@@ -38,11 +39,34 @@ class PlaceUpdate(BaseModel):
     parent_place_id: Optional[int] = None
 
 
+class PlaceBulkCreate(BaseModel):
+    campaign_id: int
+    places: List[PlaceBase] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
+class PlaceBulkUpdateRow(PlaceUpdate):
+    id: int
+    version: Optional[int] = None  # expected current version (412 if it has changed)
+
+
+class PlaceBulkUpdate(BaseModel):
+    places: List[PlaceBulkUpdateRow] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
 class Place(PlaceBase):
     id: int
+    version: int
     campaign_id: int
+    # map_coordinates as numbers: the position on the parent place's map
+    map_x: Optional[float] = None
+    map_y: Optional[float] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class NearbyPlace(BaseModel):
+    place: Place
+    distance: float
@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from ..models.quest import QuestStatus
+from .bulk import BULK_MAX_ROWS
 
 
 class QuestBase(BaseModel):
@@ -28,8 +29,23 @@ class QuestUpdate(BaseModel):
     status: Optional[QuestStatus] = None
 
 
+class QuestBulkCreate(BaseModel):
+    campaign_id: int
+    quests: List[QuestBase] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
+class QuestBulkUpdateRow(QuestUpdate):
+    id: int
+    version: Optional[int] = None  # expected current version (412 if it has changed)
+
+
+class QuestBulkUpdate(BaseModel):
+    quests: List[QuestBulkUpdateRow] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
 class Quest(QuestBase):
     id: int
+    version: int
     campaign_id: int
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
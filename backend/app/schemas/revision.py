@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class Revision(BaseModel):
+    version: int  # the version this change created
+    user_id: Optional[int] = None
+    created_at: datetime
+    fields: List[str]  # columns it changed
+
+
+class EntityVersion(BaseModel):
+    entity_type: str
+    entity_id: int
+    version: int
+    data: Dict[str, Any]  # the entity's columns at this version
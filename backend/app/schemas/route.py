@@ -0,0 +1,72 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List
+from ..models.route import TravelMode, Terrain
+from .bulk import BULK_MAX_ROWS
+
+
+class RouteBase(BaseModel):
+    from_place_id: int
+    to_place_id: int
+    name: Optional[str] = None
+    distance: float = Field(ge=0)  # miles
+    terrain: Terrain = Terrain.PLAINS
+    travel_mode: TravelMode = TravelMode.FOOT
+    travel_hours: Optional[float] = Field(default=None, ge=0)
+    bidirectional: bool = True
+    notes: Optional[str] = None
+
+
+class RouteCreate(RouteBase):
+    campaign_id: int
+
+
+class RouteUpdate(BaseModel):
+    from_place_id: Optional[int] = None
+    to_place_id: Optional[int] = None
+    name: Optional[str] = None
+    distance: Optional[float] = Field(default=None, ge=0)
+    terrain: Optional[Terrain] = None
+    travel_mode: Optional[TravelMode] = None
+    travel_hours: Optional[float] = Field(default=None, ge=0)
+    bidirectional: Optional[bool] = None
+    notes: Optional[str] = None
+
+
+class RouteBulkCreate(BaseModel):
+    campaign_id: int
+    routes: List[RouteBase] = Field(min_length=1, max_length=BULK_MAX_ROWS)
+
+
+class Route(RouteBase):
+    id: int
+    version: int
+    campaign_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JourneyLeg(BaseModel):
+    route_id: int
+    from_place_id: int
+    to_place_id: int
+    distance: float
+    hours: float
+    travel_mode: TravelMode
+    terrain: Terrain
+
+    class Config:
+        from_attributes = True
+
+
+class Journey(BaseModel):
+    from_place_id: int
+    to_place_id: int
+    hours: float
+    distance: float
+    place_ids: List[int]
+    legs: List[JourneyLeg]
+    explored: int  # places the search settled
@@ -27,6 +27,7 @@ class SessionUpdate(BaseModel):
 
 class Session(SessionBase):
     id: int
+    version: int
     campaign_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -0,0 +1,49 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from ..models.item import ItemType, ItemRarity
+
+
+class SRDSpell(BaseModel):
+    id: str
+    name: str
+    level: int
+    school: str
+    casting_time: str
+    range: str
+    duration: str
+    components: str
+    description: str
+
+
+class SRDItem(BaseModel):
+    id: str
+    name: str
+    item_type: ItemType
+    rarity: ItemRarity
+    description: str
+    weight: Optional[float] = None
+    value: Optional[int] = None
+    damage: Optional[str] = None
+    ac_bonus: Optional[int] = None
+    requires_attunement: bool = False
+    is_magical: bool = False
+
+
+class SRDMonster(BaseModel):
+    id: str
+    name: str
+    size: str
+    type: str
+    challenge_rating: str
+    armor_class: int
+    hit_points: int
+    attack_bonus: int
+    damage: str
+    attacks: int = 1
+    xp: int = 0
+
+
+class SRDCatalog(BaseModel):
+    spells: List[SRDSpell]
+    items: List[SRDItem]
+    monsters: List[SRDMonster]
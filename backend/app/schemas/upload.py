@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class StoredFile(BaseModel):
+    sha256: str
+    content_type: str
+    size: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    original_name: Optional[str] = None
+    tile_status: Optional[str] = None
+    created_at: datetime
+    url: str
+    thumbnail_url: str
+
+    class Config:
+        from_attributes = True
+
+
+class TileSet(BaseModel):
+    sha256: str
+    status: Optional[str] = None
+    width: int
+    height: int
+    tile_size: int
+    levels: Optional[int] = None
+    url_template: str
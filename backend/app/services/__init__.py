@@ -1,3 +1,5 @@
 from .dndbeyond import DNDBeyondService, import_character_from_dndbeyond
+from .encounter_state import encounter_turns
+from .campaign_purge import purge_campaign
 
-__all__ = ["DNDBeyondService", "import_character_from_dndbeyond"]
+__all__ = ["DNDBeyondService", "import_character_from_dndbeyond", "encounter_turns", "purge_campaign"]
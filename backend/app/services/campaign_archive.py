@@ -0,0 +1,279 @@
+"""
+Campaign export and import.
+
+An archive is NDJSON: a header line followed by one {"type", "data"} record
+per row, parents before children (campaign, places, routes, items, characters,
+inventory, quests, sessions, notes, encounters, combatants). Export reads
+each table with yield_per so memory stays flat regardless of campaign size.
+
+Import inserts rows in batches, remapping every id to the new rows' ids.
+Place parents are linked in a second pass once all places exist. User
+references (owner, character creator) are set to the importing user, and
+the character spell/feature index is rebuilt from the imported JSON.
+"""
+
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Date, DateTime, Enum, bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..models import (
+    Campaign, Place, Route, Item, Character, CharacterItem, CharacterSpell, CharacterFeature,
+    Quest, Session as GameSession, Note, Encounter, Combatant,
+)
+from .character_index import spell_rows, feature_rows
+from .place_map import with_map_position
+
+ARCHIVE_FORMAT = "dnd-world-campaign"
+ARCHIVE_VERSION = 1
+BATCH_SIZE = 500
+
+# Columns that point at user accounts, which do not travel between servers
+USER_COLUMNS = {"owner_id", "creator_id"}
+
+
+class ArchiveError(ValueError):
+    """Raised for archives that cannot be imported."""
+
+
+@dataclass(frozen=True)
+class ArchiveTable:
+    type: str
+    model: Any
+    refs: Dict[str, str] = field(default_factory=dict)  # column -> referenced record type
+
+    @property
+    def table(self):
+        return self.model.__table__
+
+
+ARCHIVE_TABLES = (
+    ArchiveTable("campaign", Campaign),
+    ArchiveTable("place", Place, {"campaign_id": "campaign", "parent_place_id": "place"}),
+    ArchiveTable("route", Route, {"campaign_id": "campaign", "from_place_id": "place", "to_place_id": "place"}),
+    ArchiveTable("item", Item, {"campaign_id": "campaign"}),
+    ArchiveTable("character", Character, {"campaign_id": "campaign"}),
+    ArchiveTable("character_item", CharacterItem, {"character_id": "character", "item_id": "item"}),
+    ArchiveTable("quest", Quest, {"campaign_id": "campaign"}),
+    ArchiveTable("session", GameSession, {"campaign_id": "campaign"}),
+    ArchiveTable("note", Note, {"campaign_id": "campaign"}),
+    ArchiveTable("encounter", Encounter, {"campaign_id": "campaign"}),
+    ArchiveTable("combatant", Combatant, {"encounter_id": "encounter", "character_id": "character"}),
+)
+TABLES_BY_TYPE = {spec.type: spec for spec in ARCHIVE_TABLES}
+
+
+def _export_select(spec: ArchiveTable, campaign_id: int):
+    table = spec.table
+    columns = [c for c in table.c if c.name not in USER_COLUMNS]
+    stmt = select(*columns)
+    if spec.model is Campaign:
+        stmt = stmt.where(table.c.id == campaign_id)
+    elif spec.model is CharacterItem:
+        stmt = stmt.where(table.c.character_id.in_(
+            select(Character.id).where(Character.campaign_id == campaign_id)
+        ))
+    elif spec.model is Combatant:
+        stmt = stmt.where(table.c.encounter_id.in_(
+            select(Encounter.id).where(Encounter.campaign_id == campaign_id)
+        ))
+    else:
+        stmt = stmt.where(table.c.campaign_id == campaign_id)
+    return stmt.order_by(table.c.id)
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _line(record: Dict[str, Any]) -> str:
+    return json.dumps(record, default=_encode, separators=(",", ":")) + "\n"
+
+
+def export_campaign(campaign_id: int) -> Iterator[bytes]:
+    """Yield the archive of a campaign in chunks of up to BATCH_SIZE rows.
+
+    Uses its own session, since the response is streamed after the request's
+    session has been closed.
+    """
+    db = SessionLocal()
+    try:
+        yield _line({"format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION}).encode()
+        for spec in ARCHIVE_TABLES:
+            result = db.execute(
+                _export_select(spec, campaign_id).execution_options(yield_per=BATCH_SIZE)
+            )
+            for rows in result.partitions():
+                yield "".join(
+                    _line({"type": spec.type, "data": dict(row._mapping)}) for row in rows
+                ).encode()
+    finally:
+        db.close()
+
+
+def _coerce(column, value):
+    """Turn a JSON value back into what the column type expects."""
+    if value is None:
+        return None
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    if isinstance(column_type, Enum) and column_type.enum_class is not None:
+        return column_type.enum_class(value)
+    return value
+
+
+class CampaignImporter:
+    def __init__(self, db: Session, owner_id: int):
+        self.db = db
+        self.owner_id = owner_id
+        self.id_maps: Dict[str, Dict[int, int]] = {spec.type: {} for spec in ARCHIVE_TABLES}
+        self.place_parents: List[Tuple[int, int]] = []  # (new place id, old parent id)
+        self.campaign_id: Optional[int] = None
+
+    def _row(self, spec: ArchiveTable, data: Dict[str, Any]) -> Tuple[Optional[int], Dict[str, Any]]:
+        columns = spec.table.c
+        row = {}
+        for name, value in data.items():
+            if name == "id" or name in USER_COLUMNS or name not in columns:
+                continue
+            if name in spec.refs and value is not None:
+                if name == "parent_place_id":
+                    continue  # Linked after all places exist
+                new_id = self.id_maps[spec.refs[name]].get(value)
+                if new_id is None:
+                    raise ArchiveError(f"{spec.type} references unknown {spec.refs[name]} {value}")
+                value = new_id
+            try:
+                row[name] = _coerce(columns[name], value)
+            except (TypeError, ValueError):
+                raise ArchiveError(f"Invalid {spec.type} {name}: {value!r}")
+
+        if spec.model is Campaign:
+            row["owner_id"] = self.owner_id
+        elif spec.model is Character:
+            row["creator_id"] = self.owner_id
+        elif spec.model is Place and "map_x" not in row:
+            # Archives from before map_x/map_y only have map_coordinates
+            row = with_map_position(row)
+        if "campaign_id" in spec.refs:
+            if self.campaign_id is None:
+                raise ArchiveError(f"{spec.type} record before the campaign record")
+            row["campaign_id"] = self.campaign_id
+        return data.get("id"), row
+
+    def insert(self, spec: ArchiveTable, records: List[Dict[str, Any]]):
+        """Insert a batch of records of one type and remember their new ids."""
+        if spec.model is Campaign and (self.campaign_id is not None or len(records) != 1):
+            raise ArchiveError("An archive must contain exactly one campaign")
+
+        old_ids, rows = [], []
+        for data in records:
+            old_id, row = self._row(spec, data)
+            old_ids.append(old_id)
+            rows.append(row)
+
+        # Rows may carry different optional columns; insert each column set separately
+        by_columns: Dict[tuple, List[int]] = {}
+        for i, row in enumerate(rows):
+            by_columns.setdefault(tuple(sorted(row)), []).append(i)
+        new_ids: List[Optional[int]] = [None] * len(rows)
+        for positions in by_columns.values():
+            result = self.db.execute(
+                insert(spec.table).returning(spec.table.c.id, sort_by_parameter_order=True),
+                [rows[i] for i in positions],
+            )
+            for i, new_id in zip(positions, result.scalars()):
+                new_ids[i] = new_id
+
+        id_map = self.id_maps[spec.type]
+        for old_id, new_id in zip(old_ids, new_ids):
+            if old_id is not None:
+                id_map[old_id] = new_id
+
+        if spec.model is Campaign:
+            self.campaign_id = new_ids[0]
+        elif spec.model is Place:
+            self.place_parents.extend(
+                (new_id, data["parent_place_id"]) for new_id, data in zip(new_ids, records)
+                if data.get("parent_place_id") is not None
+            )
+        elif spec.model is Character:
+            self._index_characters(zip(new_ids, records))
+
+    def _index_characters(self, characters: Iterable[Tuple[int, Dict[str, Any]]]):
+        spells, features = [], []
+        for character_id, data in characters:
+            spells.extend(spell_rows(character_id, data.get("spells")))
+            features.extend(feature_rows(character_id, data.get("features")))
+        if spells:
+            self.db.execute(insert(CharacterSpell), spells)
+        if features:
+            self.db.execute(insert(CharacterFeature), features)
+
+    def link_places(self):
+        places = Place.__table__
+        links = []
+        for place_id, old_parent in self.place_parents:
+            parent_id = self.id_maps["place"].get(old_parent)
+            if parent_id is None:
+                raise ArchiveError(f"place references unknown place {old_parent}")
+            links.append({"place_id": place_id, "parent_id": parent_id})
+        if links:
+            self.db.execute(
+                update(places)
+                .where(places.c.id == bindparam("place_id"))
+                .values(parent_place_id=bindparam("parent_id")),
+                links,
+            )
+
+
+def _records(lines: Iterable[bytes]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            raise ArchiveError(f"Line {number} is not valid JSON")
+
+
+def import_campaign(db: Session, lines: Iterable[bytes], owner_id: int) -> int:
+    """Import an archive into a new campaign owned by owner_id.
+
+    Rows are flushed but not committed; the caller commits or rolls back the
+    whole import. Returns the new campaign id.
+    """
+    records = _records(lines)
+    number, header = next(records, (0, None))
+    if not isinstance(header, dict) or header.get("format") != ARCHIVE_FORMAT:
+        raise ArchiveError("Not a campaign archive")
+    if header.get("version") != ARCHIVE_VERSION:
+        raise ArchiveError(f"Unsupported archive version: {header.get('version')}")
+
+    importer = CampaignImporter(db, owner_id)
+    spec, batch = None, []
+    for number, record in records:
+        record_spec = TABLES_BY_TYPE.get(record.get("type")) if isinstance(record, dict) else None
+        if record_spec is None or not isinstance(record.get("data"), dict):
+            raise ArchiveError(f"Line {number} is not a valid archive record")
+        if batch and (record_spec is not spec or len(batch) >= BATCH_SIZE):
+            importer.insert(spec, batch)
+            batch = []
+        spec = record_spec
+        batch.append(record["data"])
+    if batch:
+        importer.insert(spec, batch)
+
+    if importer.campaign_id is None:
+        raise ArchiveError("An archive must contain exactly one campaign")
+    importer.link_places()
+    return importer.campaign_id
@@ -0,0 +1,74 @@
+"""
+Purging deleted campaigns.
+
+Deleting a campaign only sets its deleted_at, so the request returns at
+once and the campaign can be restored for CAMPAIGN_PURGE_DELAY_HOURS. Then
+a campaign_purge job deletes it for good: for each table that references
+the campaign it deletes CAMPAIGN_PURGE_BATCH rows at a time, each batch in
+its own short transaction, and the database removes what hangs off those
+rows (inventory, spells, combatants, routes, ...) through ON DELETE
+CASCADE. No row is loaded into the application and no lock is held for
+long. The campaign row goes last.
+
+Unlike other job handlers the purge commits as it goes; if it fails, the
+retry picks up where it stopped.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import Base
+from ..models import Campaign
+from .jobs import job_handler
+
+logger = logging.getLogger(__name__)
+
+PURGE_JOB = "campaign_purge"
+
+
+def purge_cutoff() -> datetime:
+    """Campaigns deleted before this may be purged; later ones can still be restored."""
+    return datetime.now(timezone.utc) - timedelta(hours=settings.CAMPAIGN_PURGE_DELAY_HOURS)
+
+
+def _campaign_tables():
+    # Tables with a foreign key to campaigns, those that others reference last
+    campaigns = Campaign.__table__
+    return [
+        table for table in reversed(Base.metadata.sorted_tables)
+        if any(fk.column.table is campaigns for fk in table.foreign_keys)
+    ]
+
+
+@job_handler(PURGE_JOB)
+def purge_campaign(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Background job: delete a campaign that was deleted before the purge cutoff.
+
+    Payload: campaign_id. Does nothing if the campaign was restored since.
+    """
+    campaign_id = payload["campaign_id"]
+    campaigns = Campaign.__table__
+    due = db.scalar(select(campaigns.c.id).where(
+        campaigns.c.id == campaign_id, campaigns.c.deleted_at <= purge_cutoff()
+    ))
+    if due is None:
+        return {"campaign_id": campaign_id, "purged": False}
+
+    rows = 0
+    for table in _campaign_tables():
+        while True:
+            batch = select(table.c.id).where(table.c.campaign_id == campaign_id).limit(settings.CAMPAIGN_PURGE_BATCH)
+            deleted = db.execute(delete(table).where(table.c.id.in_(batch))).rowcount
+            db.commit()
+            rows += deleted
+            if deleted < settings.CAMPAIGN_PURGE_BATCH:
+                break
+    db.execute(delete(campaigns).where(campaigns.c.id == campaign_id))
+    logger.info("Purged campaign", extra={"campaign_id": campaign_id, "rows": rows})
+    return {"campaign_id": campaign_id, "purged": True, "rows": rows}
@@ -0,0 +1,76 @@
+"""
+Keeps the character_spells and character_features tables in sync with the
+Character.spells and Character.features JSON so they can be queried by name.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from ..models import CharacterSpell, CharacterFeature
+
+
+def name_key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def spell_rows(character_id: int, spells: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flatten {cantrips: [...], "1": [...], ...} into character_spells rows."""
+    rows = []
+    for group, entries in (spells or {}).items():
+        group_level = 0 if group == "cantrips" else int(group) if str(group).isdigit() else None
+        for entry in entries or []:
+            if isinstance(entry, str):
+                entry = {"name": entry}
+            if not isinstance(entry, dict) or not entry.get("name"):
+                continue
+            level = entry.get("level")
+            rows.append({
+                "character_id": character_id,
+                "name": entry["name"],
+                "name_key": name_key(entry["name"]),
+                "level": level if isinstance(level, int) else group_level,
+                "school": entry.get("school") or None,
+                "prepared": bool(entry.get("prepared", False)),
+                "srd_id": entry.get("srd_id") or None,
+            })
+    return rows
+
+
+def feature_rows(character_id: int, features: Optional[List[Any]]) -> List[Dict[str, Any]]:
+    """Turn [{name, description, source}, ...] into character_features rows."""
+    rows = []
+    for entry in features or []:
+        if isinstance(entry, str):
+            entry = {"name": entry}
+        if not isinstance(entry, dict) or not entry.get("name"):
+            continue
+        source = entry.get("source")
+        rows.append({
+            "character_id": character_id,
+            "name": entry["name"],
+            "name_key": name_key(entry["name"]),
+            "source": str(source) if source not in (None, "") else None,
+        })
+    return rows
+
+
+def index_characters(db: Session, characters: List[Any], spells: bool = True, features: bool = True):
+    """Rewrite the index rows of several characters with one DELETE and INSERT per table."""
+    ids = [character.id for character in characters]
+    if spells:
+        db.execute(delete(CharacterSpell).where(CharacterSpell.character_id.in_(ids)))
+        rows = [row for character in characters for row in spell_rows(character.id, character.spells)]
+        if rows:
+            db.execute(insert(CharacterSpell), rows)
+    if features:
+        db.execute(delete(CharacterFeature).where(CharacterFeature.character_id.in_(ids)))
+        rows = [row for character in characters for row in feature_rows(character.id, character.features)]
+        if rows:
+            db.execute(insert(CharacterFeature), rows)
+
+
+def index_character(db: Session, character, spells: bool = True, features: bool = True):
+    """Rewrite the index rows of one character. The character must have an id."""
+    index_characters(db, [character], spells, features)
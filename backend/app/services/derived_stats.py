@@ -0,0 +1,139 @@
+"""
+Derived character statistics.
+
+Computes ability modifiers, proficiency bonus, saving throw and skill totals,
+passive perception and spellcasting numbers from a character's stored
+ability scores, level and proficiencies (5e rules). Results are memoized per
+character version and dropped when the character changes.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+ABILITIES = ("str", "dex", "con", "int", "wis", "cha")
+
+SKILL_ABILITIES = {
+    "acrobatics": "dex",
+    "animal-handling": "wis",
+    "arcana": "int",
+    "athletics": "str",
+    "deception": "cha",
+    "history": "int",
+    "insight": "wis",
+    "intimidation": "cha",
+    "investigation": "int",
+    "medicine": "wis",
+    "nature": "int",
+    "perception": "wis",
+    "performance": "cha",
+    "persuasion": "cha",
+    "religion": "int",
+    "sleight-of-hand": "dex",
+    "stealth": "dex",
+    "survival": "wis",
+}
+
+
+def ability_modifier(score: Optional[int]) -> int:
+    return ((score if score is not None else 10) - 10) // 2
+
+
+def proficiency_bonus(level: Optional[int]) -> int:
+    return 2 + (max(level or 1, 1) - 1) // 4
+
+
+def compute_derived_stats(
+    stats: Optional[Dict[str, int]],
+    level: Optional[int],
+    skills: Optional[Dict[str, Any]] = None,
+    saving_throws: Optional[Dict[str, Any]] = None,
+    spellcasting_ability: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Compute derived statistics from raw character fields."""
+    stats = stats or {}
+    proficiency = proficiency_bonus(level)
+    modifiers = {a: ability_modifier(stats.get(a)) for a in ABILITIES}
+
+    proficient_saves = {
+        key.lower()[:3] for key, value in (saving_throws or {}).items()
+        if isinstance(value, dict) and value.get("proficient")
+    }
+    saves = {
+        a: modifiers[a] + (proficiency if a in proficient_saves else 0) for a in ABILITIES
+    }
+
+    skill_proficiency = {}
+    for key, value in (skills or {}).items():
+        if isinstance(value, dict):
+            name = key.lower().replace("_", "-").replace(" ", "-")
+            if value.get("expertise"):
+                skill_proficiency[name] = 2 * proficiency
+            elif value.get("proficient"):
+                skill_proficiency[name] = proficiency
+    skill_totals = {
+        skill: modifiers[ability] + skill_proficiency.get(skill, 0)
+        for skill, ability in SKILL_ABILITIES.items()
+    }
+
+    casting = (spellcasting_ability or "").lower()[:3]
+    spell_save_dc = spell_attack_bonus = None
+    if casting in modifiers:
+        spell_attack_bonus = proficiency + modifiers[casting]
+        spell_save_dc = 8 + spell_attack_bonus
+
+    return {
+        "ability_modifiers": modifiers,
+        "proficiency_bonus": proficiency,
+        "initiative": modifiers["dex"],
+        "saving_throws": saves,
+        "skills": skill_totals,
+        "passive_perception": 10 + skill_totals["perception"],
+        "spell_save_dc": spell_save_dc,
+        "spell_attack_bonus": spell_attack_bonus,
+    }
+
+
+class DerivedStatsCache:
+    """LRU cache of derived stats keyed by character id and version."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def version(character) -> Any:
+        # The row version is bumped by every write, Core UPDATEs included;
+        # updated_at is not, and may only have second resolution
+        return character.version
+
+    def get(self, character) -> Dict[str, Any]:
+        """Return derived stats for a character row, computing them on a miss."""
+        version = self.version(character)
+        with self._lock:
+            entry = self._entries.get(character.id)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(character.id)
+                return entry[1]
+
+        result = compute_derived_stats(
+            character.stats,
+            character.level,
+            character.skills,
+            character.saving_throws,
+            character.spellcasting_ability,
+        )
+        with self._lock:
+            self._entries[character.id] = (version, result)
+            self._entries.move_to_end(character.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, character_id: int):
+        with self._lock:
+            self._entries.pop(character_id, None)
+
+
+derived_stats_cache = DerivedStatsCache()
@@ -0,0 +1,203 @@
+"""
+Dice expression parser and roller.
+
+Supports expressions such as "1d20+5", "2d6 - 1", "4d6kh3" (keep highest),
+"2d20kl1" (keep lowest), "1d20adv" / "1d20dis" (advantage / disadvantage),
+"1d6!" (exploding dice) and "d%" (percentile). Trailing damage types are
+ignored, so "1d8 slashing" from Item.damage evaluates as "1d8".
+
+Compiled expressions are cached. Single rolls keep a full log of every die,
+while bulk rolls use NumPy to produce thousands of totals at once.
+"""
+
+import random
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAX_DICE_PER_TERM = 1000
+MAX_SIDES = 1000
+MAX_EXPLOSIONS = 100
+MAX_TERMS = 20
+MAX_EXPRESSION_LENGTH = 200
+
+_WORDS = re.compile(r"\b(?!adv\b|dis\b)[a-z]{3,}\b")
+_TERM = re.compile(
+    r"(?P<sign>[+-])"
+    r"(?:(?P<count>\d*)d(?P<sides>\d+|%)(?P<mods>(?:kh\d+|kl\d+|k\d+|!|adv|dis)*)|(?P<constant>\d+))"
+)
+_MODIFIER = re.compile(r"kh\d+|kl\d+|k\d+|!|adv|dis")
+
+
+class DiceError(ValueError):
+    """Raised for dice expressions that cannot be parsed or rolled."""
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    count: int
+    sides: int
+    sign: int = 1
+    keep_highest: Optional[int] = None
+    keep_lowest: Optional[int] = None
+    explode: bool = False
+
+    def __str__(self) -> str:
+        text = f"{self.count}d{self.sides}"
+        if self.keep_highest:
+            text += f"kh{self.keep_highest}"
+        if self.keep_lowest:
+            text += f"kl{self.keep_lowest}"
+        if self.explode:
+            text += "!"
+        return text
+
+    def keep(self, rolls: List[int]) -> List[int]:
+        if self.keep_highest:
+            return sorted(rolls, reverse=True)[:self.keep_highest]
+        if self.keep_lowest:
+            return sorted(rolls)[:self.keep_lowest]
+        return rolls
+
+    def roll_die(self, rng: random.Random) -> int:
+        value = rng.randint(1, self.sides)
+        total = value
+        explosions = 0
+        while self.explode and value == self.sides and explosions < MAX_EXPLOSIONS:
+            value = rng.randint(1, self.sides)
+            total += value
+            explosions += 1
+        return total
+
+    def roll_many(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """Roll this term n times, returning an array of n signed subtotals."""
+        rolls = rng.integers(1, self.sides + 1, size=(n, self.count))
+        if self.explode:
+            chain = rolls == self.sides
+            explosions = 0
+            while chain.any() and explosions < MAX_EXPLOSIONS:
+                extra = rng.integers(1, self.sides + 1, size=int(chain.sum()))
+                rolls[chain] += extra
+                chain[chain] = extra == self.sides
+                explosions += 1
+
+        if self.keep_highest:
+            rolls = np.sort(rolls, axis=1)[:, -self.keep_highest:]
+        elif self.keep_lowest:
+            rolls = np.sort(rolls, axis=1)[:, :self.keep_lowest]
+        return self.sign * rolls.sum(axis=1)
+
+
+@dataclass(frozen=True)
+class DiceExpression:
+    text: str
+    terms: Tuple[DiceTerm, ...]
+    constant: int = 0
+
+    def roll(self, rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        """Roll once and return the total together with every die rolled."""
+        rng = rng or random
+        total = self.constant
+        terms = []
+        for term in self.terms:
+            rolls = [term.roll_die(rng) for _ in range(term.count)]
+            kept = term.keep(rolls)
+            subtotal = term.sign * sum(kept)
+            total += subtotal
+            terms.append({"dice": str(term), "rolls": rolls, "kept": kept, "subtotal": subtotal})
+        return {"expression": self.text, "total": total, "terms": terms, "constant": self.constant}
+
+    def roll_many(self, n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Roll n times and return an int array of totals."""
+        rng = rng or np.random.default_rng()
+        totals = np.full(n, self.constant, dtype=np.int64)
+        for term in self.terms:
+            totals += term.roll_many(n, rng)
+        return totals
+
+
+def _parse_term(match) -> Tuple[Optional[DiceTerm], int]:
+    sign = -1 if match.group("sign") == "-" else 1
+    if match.group("constant") is not None:
+        return None, sign * int(match.group("constant"))
+
+    count = int(match.group("count") or 1)
+    sides = 100 if match.group("sides") == "%" else int(match.group("sides"))
+    if not 1 <= count <= MAX_DICE_PER_TERM:
+        raise DiceError(f"Dice count must be between 1 and {MAX_DICE_PER_TERM}")
+    if not 1 <= sides <= MAX_SIDES:
+        raise DiceError(f"Dice sides must be between 1 and {MAX_SIDES}")
+
+    keep_highest = keep_lowest = None
+    explode = False
+    for mod in _MODIFIER.findall(match.group("mods")):
+        if mod == "!":
+            explode = True
+        elif mod in ("adv", "dis"):
+            count = max(count, 2)
+            if mod == "adv":
+                keep_highest = 1
+            else:
+                keep_lowest = 1
+        elif mod.startswith("kl"):
+            keep_lowest = int(mod[2:])
+        else:
+            keep_highest = int(mod.lstrip("kh"))
+
+    if explode and sides == 1:
+        raise DiceError("A one-sided die cannot explode")
+    for keep in (keep_highest, keep_lowest):
+        if keep is not None and not 1 <= keep <= count:
+            raise DiceError(f"Cannot keep {keep} of {count} dice")
+
+    term = DiceTerm(count, sides, sign, keep_highest, keep_lowest, explode)
+    return term, 0
+
+
+@lru_cache(maxsize=1024)
+def compile_dice(expression: str) -> DiceExpression:
+    """Parse a dice expression into a reusable DiceExpression."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise DiceError(f"Dice expressions are limited to {MAX_EXPRESSION_LENGTH} characters")
+    text = _WORDS.sub("", expression.lower()).replace(" ", "")
+    if not text:
+        raise DiceError("Empty dice expression")
+    if text[0] not in "+-":
+        text = "+" + text
+
+    terms = []
+    constant = 0
+    position = 0
+    while position < len(text):
+        match = _TERM.match(text, position)
+        if not match:
+            raise DiceError(f"Invalid dice expression: {expression!r}")
+        term, value = _parse_term(match)
+        if term:
+            terms.append(term)
+            if len(terms) > MAX_TERMS:
+                raise DiceError(f"Dice expressions are limited to {MAX_TERMS} dice terms")
+        constant += value
+        position = match.end()
+
+    return DiceExpression(expression.strip(), tuple(terms), constant)
+
+
+def summarize(totals: np.ndarray) -> Dict[str, Any]:
+    """Summary statistics and a histogram for an array of roll totals."""
+    values, counts = np.unique(totals, return_counts=True)
+    percentiles = np.percentile(totals, [5, 25, 50, 75, 95])
+    return {
+        "count": int(totals.size),
+        "mean": float(totals.mean()),
+        "std": float(totals.std()),
+        "min": int(totals.min()),
+        "max": int(totals.max()),
+        "percentiles": {
+            f"p{p}": float(v) for p, v in zip((5, 25, 50, 75, 95), percentiles)
+        },
+        "histogram": {int(v): int(c) for v, c in zip(values, counts)},
+    }
@@ -12,10 +12,19 @@ For production use, you'll need:
 - Or implement web scraping with Beautiful Soup
 """
 
+import logging
+
 import httpx
 from typing import Optional, Dict, Any
 from bs4 import BeautifulSoup
+from sqlalchemy.orm import Session
 from ..core.config import settings
+from ..models import Campaign, Character
+from .character_index import index_character
+from .jobs import JobError, job_handler
+from .srd import get_catalog
+
+logger = logging.getLogger(__name__)
 
 
 class DNDBeyondService:
@@ -44,7 +53,7 @@ class DNDBeyondService:
             Character data dictionary or None if failed
         """
         if not self.cobalt_token:
-            print("No Cobalt token provided - cannot fetch from API")
+            logger.info("No Cobalt token provided, cannot fetch from API")
             return None
 
         url = f"{self.CHARACTER_API_URL}/{character_id}"
@@ -54,13 +63,16 @@ class DNDBeyondService:
                 response = await client.get(url, headers=self.headers, timeout=10.0)
                 response.raise_for_status()
                 data = response.json()
-                print(f"Successfully fetched character data from D&D Beyond API")
+                logger.info("Fetched character from D&D Beyond API", extra={"dndbeyond_id": character_id})
                 return data
             except httpx.HTTPError as e:
-                print(f"Error fetching character from API: {e}")
-                if hasattr(e, 'response') and e.response is not None:
-                    print(f"Response status: {e.response.status_code}")
-                    print(f"Response body: {e.response.text[:200]}")
+                response = getattr(e, "response", None)
+                logger.warning("Error fetching character from D&D Beyond API", extra={
+                    "dndbeyond_id": character_id,
+                    "error": str(e),
+                    "status_code": response.status_code if response is not None else None,
+                    "response_body": response.text[:200] if response is not None else None,
+                })
                 return None
 
     def parse_character_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -151,6 +163,7 @@ class DNDBeyondService:
         for i in range(1, 10):
             spells_by_level[str(i)] = []
 
+        catalog = get_catalog()
         for spell in char_data.get("spells", {}).get("class", []):
             spell_obj = {
                 "name": spell.get("definition", {}).get("name", ""),
@@ -162,6 +175,8 @@ class DNDBeyondService:
                 "description": spell.get("definition", {}).get("description", ""),
                 "prepared": spell.get("prepared", False)
             }
+            # SRD spells are stored as a catalog reference instead of the full text
+            spell_obj = catalog.spell_reference(spell_obj)
             spell_level = spell.get("definition", {}).get("level", 0)
             if spell_level == 0:
                 spells_by_level["cantrips"].append(spell_obj)
@@ -226,13 +241,12 @@ class DNDBeyondService:
         Returns:
             Basic character data or None if failed
         """
-        print(f"Attempting to scrape character from: {character_url}")
+        logger.info("Scraping character sheet", extra={"url": character_url})
         async with httpx.AsyncClient() as client:
             try:
                 response = await client.get(character_url, headers=self.headers, timeout=10.0)
                 response.raise_for_status()
 
-                print(f"Got response status: {response.status_code}")
                 soup = BeautifulSoup(response.text, 'html.parser')
 
                 # This is a simplified example - actual scraping would be more complex
@@ -240,8 +254,8 @@ class DNDBeyondService:
                 name_elem = soup.find("div", class_="ddbc-character-name")
                 name = name_elem.text.strip() if name_elem else "Unknown"
 
-                print(f"Scraped character name: {name}")
-                print("WARNING: Scraping is very limited. For full character data, provide a Cobalt token.")
+                # Scraping is very limited; full character data needs a Cobalt token
+                logger.info("Scraped character sheet", extra={"url": character_url, "character_name": name})
 
                 return {
                     "name": name,
@@ -249,7 +263,7 @@ class DNDBeyondService:
                     # D&D Beyond loads character data via API calls after page load
                 }
             except Exception as e:
-                print(f"Error scraping character sheet: {e}")
+                logger.warning("Error scraping character sheet", extra={"url": character_url, "error": str(e)})
                 return None
 
     @staticmethod
@@ -283,39 +297,73 @@ async def import_character_from_dndbeyond(
     Returns:
         Parsed character data ready for database insertion
     """
-    print(f"\n=== Starting D&D Beyond Import ===")
-    print(f"URL: {character_url}")
-    print(f"Has Cobalt Token: {bool(cobalt_token)}")
+    logger.info("Starting D&D Beyond import", extra={"url": character_url, "has_cobalt_token": bool(cobalt_token)})
 
     service = DNDBeyondService(cobalt_token)
     character_id = service.extract_character_id_from_url(character_url)
 
     if not character_id:
-        print(f"ERROR: Could not extract character ID from URL: {character_url}")
+        logger.warning("Could not extract character ID from URL", extra={"url": character_url})
         return None
 
-    print(f"Extracted character ID: {character_id}")
-
     # Try API first (requires token)
     if cobalt_token:
-        print("Attempting to fetch via D&D Beyond API...")
         raw_data = await service.get_character_data(character_id)
         if raw_data:
             parsed = service.parse_character_data(raw_data)
-            print(f"Successfully parsed character: {parsed.get('name', 'Unknown')}")
+            logger.info("Imported character via API", extra={
+                "dndbeyond_id": character_id, "character_name": parsed.get("name")
+            })
             return parsed
         else:
-            print("API fetch failed, falling back to scraping...")
+            logger.info("API fetch failed, falling back to scraping", extra={"dndbeyond_id": character_id})
 
     # Fallback to scraping for public sheets
-    print("Attempting to scrape character sheet...")
     scraped_data = await service.scrape_character_sheet(character_url)
 
     if scraped_data and scraped_data.get("name") and scraped_data.get("name") != "Unknown":
-        print(f"Scraping completed: {scraped_data}")
+        logger.info("Imported character by scraping", extra={
+            "dndbeyond_id": character_id, "character_name": scraped_data["name"]
+        })
         return scraped_data
     else:
-        print("ERROR: Scraping failed or returned incomplete data")
-        print("D&D Beyond character sheets require JavaScript to load character data.")
-        print("Without a Cobalt token, we cannot access the full character information.")
+        # Character sheets load their data with JavaScript, so without a Cobalt
+        # token the full character information is not accessible
+        logger.warning("Scraping failed or returned incomplete data", extra={"url": character_url})
         return None
+
+
+IMPORT_JOB = "dndbeyond_import"
+
+IMPORT_FAILED = (
+    "Failed to import character from D&D Beyond. "
+    "D&D Beyond character sheets require JavaScript to load data, which prevents web scraping. "
+    "Please provide your Cobalt session token to access the character via D&D Beyond's API. "
+    "To get your token: Log in to D&D Beyond → Open DevTools (F12) → Application → Cookies → "
+    "Copy the 'CobaltSession' value."
+)
+
+
+@job_handler(IMPORT_JOB, secrets=("cobalt_token",))
+async def run_import_job(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Background job: import a character into a campaign.
+
+    Payload: campaign_id, user_id, character_url and optional cobalt_token.
+    """
+    character_data = await import_character_from_dndbeyond(payload["character_url"], payload.get("cobalt_token"))
+    if not character_data:
+        raise JobError(IMPORT_FAILED)
+    if db.get(Campaign, payload["campaign_id"]) is None:
+        raise JobError("The campaign no longer exists")
+
+    character = Character(
+        **character_data,
+        campaign_id=payload["campaign_id"],
+        creator_id=payload["user_id"],
+        dndbeyond_url=payload["character_url"]
+    )
+    db.add(character)
+    db.flush()
+    index_character(db, character)
+    return {"character_id": character.id, "name": character.name}
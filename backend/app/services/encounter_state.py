@@ -0,0 +1,147 @@
+"""
+In-memory turn state for running encounters.
+
+When write-behind is enabled, "next turn" only touches this cache and dirty
+turn positions are written back to the database by a background thread every
+few seconds. The cache lives in a single process, so write-behind must only
+be enabled when the API runs with one worker.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import update, bindparam
+
+from ..core.database import SessionLocal
+from ..models import Encounter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TurnState:
+    """Turn position of an encounter plus its serialized combatants in turn order."""
+
+    campaign_id: int
+    round: int
+    turn_index: int
+    combatants: tuple
+
+    def current(self) -> Optional[dict]:
+        if self.round == 0 or not self.combatants:
+            return None
+        return self.combatants[self.turn_index]
+
+
+class EncounterTurnCache:
+    """Write-behind cache of encounter turn state."""
+
+    def __init__(self):
+        self._states: Dict[int, TurnState] = {}
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def get(self, encounter_id: int) -> Optional[TurnState]:
+        return self._states.get(encounter_id)
+
+    def put(self, encounter_id: int, campaign_id: int, round: int, turn_index: int,
+            combatants: List[dict]) -> TurnState:
+        """
+        Cache an encounter loaded from the database and return the cached state.
+
+        If another request cached it first, its state is kept (it may already
+        have been advanced past what this caller read) and returned instead.
+        """
+        with self._lock:
+            return self._states.setdefault(
+                encounter_id, TurnState(campaign_id, round, turn_index, tuple(combatants))
+            )
+
+    def advance(self, encounter_id: int) -> Optional[TurnState]:
+        """Move a cached encounter to the next turn; None if it is not cached or empty."""
+        with self._lock:
+            state = self._states.get(encounter_id)
+            if state is None or not state.combatants:
+                return None
+
+            next_index = state.turn_index + 1
+            if state.round == 0 or next_index >= len(state.combatants):
+                state = replace(state, round=state.round + 1, turn_index=0)
+            else:
+                state = replace(state, turn_index=next_index)
+
+            self._states[encounter_id] = state
+            self._dirty.add(encounter_id)
+            return state
+
+    def evict(self, encounter_id: int, db=None):
+        """Drop an encounter from the cache, writing its turn state first if dirty."""
+        with self._lock:
+            state = self._states.pop(encounter_id, None)
+            dirty = encounter_id in self._dirty
+            self._dirty.discard(encounter_id)
+
+        if state is not None and dirty:
+            self._write({encounter_id: state}, db)
+
+    def flush(self):
+        """Write every dirty turn state to the database in one batch."""
+        with self._lock:
+            pending = {eid: self._states[eid] for eid in self._dirty if eid in self._states}
+            self._dirty.clear()
+
+        if pending:
+            self._write(pending)
+
+    def _write(self, states: Dict[int, TurnState], db=None):
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            stmt = (
+                update(Encounter.__table__)
+                .where(Encounter.__table__.c.id == bindparam("encounter_id"))
+                .values(round=bindparam("new_round"), turn_index=bindparam("new_turn_index"))
+            )
+            db.execute(stmt, [
+                {"encounter_id": eid, "new_round": s.round, "new_turn_index": s.turn_index}
+                for eid, s in states.items()
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty.update(eid for eid in states if eid in self._states)
+            logger.exception("Failed to write back encounter turn state")
+        finally:
+            if own_session:
+                db.close()
+
+    def start(self, interval: float):
+        """Start the background flusher thread if it is not already running."""
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(
+                target=self._run, args=(interval,), name="encounter-write-behind", daemon=True
+            )
+            self._flusher.start()
+
+    def stop(self):
+        """Stop the flusher and write any remaining state."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            self.flush()
+
+
+encounter_turns = EncounterTurnCache()
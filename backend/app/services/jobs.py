@@ -0,0 +1,233 @@
+"""
+Background jobs.
+
+Slow work, such as imports that wait on other sites, is queued as a row in
+the jobs table and run by a worker process (`python -m app.worker`). The
+request answers 202 with the job right away instead of holding an API
+worker until a proxy times it out, and clients poll GET /jobs/{id}.
+
+Handlers are registered per job kind with @job_handler. They receive a
+session and the job's JSON payload and return a JSON-serializable result.
+They should not commit: the job is marked succeeded in the same
+transaction, so its work and its status are saved together.
+
+Claiming a job selects the oldest due queued row FOR UPDATE SKIP LOCKED,
+so on PostgreSQL concurrent workers each lock a different job without
+waiting on each other. SQLite has no row locks and ignores FOR UPDATE;
+there the UPDATE that marks the job running only matches while it is
+still queued, and SQLite serializes writers, so a job is still claimed
+once.
+
+A handler raising JobError fails its job. Any other exception is retried
+after JOB_RETRY_SECONDS, doubling each time, until the job has been tried
+max_attempts times. Jobs left running by a worker that died are taken
+over once their lock is older than JOB_TIMEOUT_SECONDS.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal, save
+from ..models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+SWEEP_SECONDS = 60  # how often a worker looks for abandoned jobs
+
+
+class JobError(Exception):
+    """A failure that retrying will not fix; the message is shown to the user."""
+
+
+@dataclass(frozen=True)
+class Handler:
+    func: Callable[[Session, Dict[str, Any]], Any]
+    secrets: Tuple[str, ...] = ()  # payload keys removed once the job is done
+
+
+HANDLERS: Dict[str, Handler] = {}
+
+
+def job_handler(kind: str, secrets: Tuple[str, ...] = ()):
+    """Register the decorated function (sync or async) as the handler of a job kind."""
+    def register(func):
+        HANDLERS[kind] = Handler(func, secrets)
+        return func
+    return register
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def worker_name(suffix: str = "") -> str:
+    return f"{socket.gethostname()}:{os.getpid()}{suffix}"
+
+
+def enqueue(db: Session, kind: str, payload: Dict[str, Any], user_id: Optional[int] = None,
+            max_attempts: Optional[int] = None, run_at: Optional[datetime] = None) -> Job:
+    """Queue a job, to run now or not before run_at, and commit it."""
+    if kind not in HANDLERS:
+        raise ValueError(f"No handler for job kind {kind!r}")
+    return save(db, Job(
+        kind=kind,
+        status=JobStatus.QUEUED,
+        payload=json.dumps(payload),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=run_at or _now(),
+        created_by_id=user_id,
+    ))
+
+
+def claim(db: Session, worker: str) -> Optional[Job]:
+    """Mark the oldest due queued job as running for this worker and return it."""
+    now = _now()
+    job = db.execute(
+        select(Job).where(Job.status == JobStatus.QUEUED, Job.run_at <= now)
+        .order_by(Job.run_at, Job.id).limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if job is None:
+        db.rollback()
+        return None
+    claimed = db.execute(
+        update(Job).where(Job.id == job.id, Job.status == JobStatus.QUEUED).values(
+            status=JobStatus.RUNNING, locked_by=worker, locked_at=now, attempts=Job.attempts + 1
+        )
+    ).rowcount
+    db.commit()
+    # Zero on SQLite when another worker claimed the job first
+    return job if claimed else None
+
+
+def _finish(db: Session, job_id: int, payload: Dict[str, Any], handler: Optional[Handler], **values):
+    if handler and handler.secrets:
+        values["payload"] = json.dumps({key: value for key, value in payload.items() if key not in handler.secrets})
+    db.execute(update(Job).where(Job.id == job_id).values(locked_by=None, finished_at=_now(), **values))
+    db.commit()
+
+
+def run_job(db: Session, job: Job):
+    """Run a claimed job and record its outcome."""
+    job_id, kind, attempts, max_attempts = job.id, job.kind, job.attempts, job.max_attempts
+    payload = json.loads(job.payload) if job.payload else {}
+    handler = HANDLERS.get(kind)
+    log = {"job_id": job_id, "kind": kind, "attempt": attempts}
+    start = time.perf_counter()
+    try:
+        if handler is None:
+            raise JobError(f"Unknown job kind {kind!r}")
+        result = handler.func(db, payload)
+        if inspect.iscoroutine(result):
+            result = asyncio.run(result)
+    except JobError as e:
+        db.rollback()
+        logger.warning("Job failed", extra={**log, "error": str(e)})
+        _finish(db, job_id, payload, handler, status=JobStatus.FAILED, error=str(e))
+    except Exception as e:
+        db.rollback()
+        error = f"{type(e).__name__}: {e}"
+        if attempts >= max_attempts:
+            logger.exception("Job failed, no attempts left", extra=log)
+            _finish(db, job_id, payload, handler, status=JobStatus.FAILED, error=error)
+        else:
+            delay = settings.JOB_RETRY_SECONDS * 2 ** (attempts - 1)
+            logger.warning("Job failed, will retry", exc_info=True, extra={**log, "retry_in_seconds": delay})
+            db.execute(update(Job).where(Job.id == job_id).values(
+                status=JobStatus.QUEUED, locked_by=None, error=error, run_at=_now() + timedelta(seconds=delay)
+            ))
+            db.commit()
+    else:
+        _finish(db, job_id, payload, handler, status=JobStatus.SUCCEEDED, error=None,
+                result=None if result is None else json.dumps(result))
+        logger.info("Job succeeded", extra={**log, "duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+
+def requeue_abandoned(db: Session) -> int:
+    """Take back jobs whose worker stopped while running them. Returns how many."""
+    now = _now()
+    abandoned = (Job.status == JobStatus.RUNNING,
+                 Job.locked_at < now - timedelta(seconds=settings.JOB_TIMEOUT_SECONDS))
+    failed = db.execute(update(Job).where(*abandoned, Job.attempts >= Job.max_attempts).values(
+        status=JobStatus.FAILED, locked_by=None, finished_at=now, error="The worker running the job stopped"
+    )).rowcount
+    requeued = db.execute(update(Job).where(*abandoned).values(
+        status=JobStatus.QUEUED, locked_by=None, run_at=now
+    )).rowcount
+    db.commit()
+    if failed or requeued:
+        logger.warning("Took back abandoned jobs", extra={"failed": failed, "requeued": requeued})
+    return failed + requeued
+
+
+def run_next(worker: str) -> bool:
+    """Claim and run one due job. Returns False if there was none."""
+    db = SessionLocal()
+    try:
+        job = claim(db, worker)
+        if job is None:
+            return False
+        run_job(db, job)
+        return True
+    finally:
+        db.close()
+
+
+def work(stop: threading.Event, worker: Optional[str] = None, burst: bool = False):
+    """Run jobs until stop is set, or until the queue is empty with burst."""
+    worker = worker or worker_name()
+    logger.info("Job worker started", extra={"worker": worker, "kinds": sorted(HANDLERS)})
+    swept = -SWEEP_SECONDS
+    while not stop.is_set():
+        try:
+            if time.monotonic() - swept >= SWEEP_SECONDS:
+                db = SessionLocal()
+                try:
+                    requeue_abandoned(db)
+                finally:
+                    db.close()
+                swept = time.monotonic()
+            if run_next(worker):
+                continue
+        except Exception:
+            # e.g. the database is unreachable; keep polling
+            logger.exception("Job worker error", extra={"worker": worker})
+        if burst:
+            break
+        stop.wait(settings.JOB_POLL_SECONDS)
+    logger.info("Job worker stopped", extra={"worker": worker})
+
+
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def start_worker_thread():
+    """Run a worker in a daemon thread of this process (JOB_WORKER_IN_API)."""
+    global _thread
+    if _thread is None:
+        _stop.clear()
+        _thread = threading.Thread(target=work, args=(_stop, worker_name(":api")), name="job-worker", daemon=True)
+        _thread.start()
+
+
+def stop_worker_thread():
+    """Stop the in-process worker, letting a running job finish."""
+    global _thread
+    if _thread is not None:
+        _stop.set()
+        _thread.join()
+        _thread = None
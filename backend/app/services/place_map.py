@@ -0,0 +1,134 @@
+"""
+Place positions on maps.
+
+Place.map_coordinates is free-form JSON; map_x and map_y hold the same
+position as numbers so places can be searched by location. A place's
+position is on its parent's map (top-level places are on the campaign's
+world map), and the index on (campaign_id, parent_place_id, map_x, map_y)
+serves both searches:
+
+- within(): the places inside a bounding box, e.g. a map viewport.
+- nearest(): the k closest places to a point. It searches a square around
+  the point sized from the map's pin density and doubles it until k places
+  lie within the searched radius, so it reads a few index ranges instead of
+  every pin on the map. After NEAREST_SEARCHES tries it reads every pin.
+
+This is a B-tree, not a spatial index: it narrows a search to a range of
+map_x only, and map_y is checked on the rows in that range. That is cheap
+for the few hundred pins a map has; a PostGIS/GiST index would be needed
+for maps with many thousands.
+"""
+
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from ..models import Place, PlaceType
+
+Position = Tuple[float, float]
+
+# Index searches nearest() makes at most; the last one covers the whole map
+NEAREST_SEARCHES = 3
+
+
+def parse_coordinates(value: Optional[str]) -> Optional[Position]:
+    """
+    Read an (x, y) position from map_coordinates.
+
+    Understands {"x": .., "y": ..}, {"lat": .., "lng"/"lon": ..} (as y and
+    x), [x, y] and "x,y". Anything else has no position.
+    """
+    if not value:
+        return None
+    try:
+        data = json.loads(value)
+    except ValueError:
+        data = value.split(",")
+    if isinstance(data, dict):
+        lower = {str(key).lower(): v for key, v in data.items()}
+        x = lower.get("x", lower.get("lng", lower.get("lon")))
+        y = lower.get("y", lower.get("lat"))
+    elif isinstance(data, list) and len(data) == 2:
+        x, y = data
+    else:
+        return None
+    try:
+        x, y = float(x), float(y)
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(x) and math.isfinite(y)):
+        return None
+    return x, y
+
+
+def with_map_position(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Add map_x and map_y to a place row that sets map_coordinates."""
+    if "map_coordinates" not in row:
+        return row
+    x, y = parse_coordinates(row["map_coordinates"]) or (None, None)
+    return {**row, "map_x": x, "map_y": y}
+
+
+def _pins(db: Session, campaign_id: int, parent_place_id: Optional[int],
+          place_type: Optional[PlaceType] = None, exclude_id: Optional[int] = None) -> Query:
+    query = db.query(Place).filter(
+        Place.campaign_id == campaign_id,
+        Place.parent_place_id.is_(None) if parent_place_id is None else Place.parent_place_id == parent_place_id,
+        Place.map_x.isnot(None),
+    )
+    if place_type is not None:
+        query = query.filter(Place.place_type == place_type)
+    if exclude_id is not None:
+        query = query.filter(Place.id != exclude_id)
+    return query
+
+
+def within(db: Session, campaign_id: int, parent_place_id: Optional[int],
+           min_x: float, min_y: float, max_x: float, max_y: float,
+           place_type: Optional[PlaceType] = None, limit: int = 1000) -> List[Place]:
+    """Places on a map inside a bounding box."""
+    return _pins(db, campaign_id, parent_place_id, place_type).filter(
+        Place.map_x.between(min_x, max_x), Place.map_y.between(min_y, max_y)
+    ).order_by(Place.map_x, Place.map_y).limit(limit).all()
+
+
+def nearest(db: Session, campaign_id: int, parent_place_id: Optional[int], x: float, y: float,
+            k: int = 5, place_type: Optional[PlaceType] = None,
+            exclude_id: Optional[int] = None) -> List[Tuple[Place, float]]:
+    """The k places closest to (x, y) on a map, with their distances, nearest first."""
+    pins = _pins(db, campaign_id, parent_place_id, place_type, exclude_id)
+    count, min_x, max_x, min_y, max_y = pins.with_entities(
+        func.count(Place.id), func.min(Place.map_x), func.max(Place.map_x),
+        func.min(Place.map_y), func.max(Place.map_y),
+    ).one()
+    if not count:
+        return []
+
+    # Farthest any pin can be, and a first radius expected to hold k pins:
+    # the distance to the map's pins plus a circle of k pins at their density.
+    # Pins in a line (all on one x or y) have no area, so their spacing along
+    # the longer side is used instead.
+    reach = math.hypot(max(abs(x - min_x), abs(x - max_x)), max(abs(y - min_y), abs(y - max_y)))
+    outside = math.hypot(max(min_x - x, 0, x - max_x), max(min_y - y, 0, y - max_y))
+    side = max(max_x - min_x, max_y - min_y)
+    spread = max(math.sqrt(k * (max_x - min_x) * (max_y - min_y) / (math.pi * count)), side * k / (2 * count))
+    radius = min(outside + spread, reach) or reach or 1.0
+
+    searches = 1
+    while True:
+        candidates = pins.filter(
+            Place.map_x.between(x - radius, x + radius), Place.map_y.between(y - radius, y + radius)
+        ).all()
+        found = sorted(
+            ((place, math.hypot(place.map_x - x, place.map_y - y)) for place in candidates),
+            key=lambda pair: (pair[1], pair[0].id)
+        )
+        # Pins in the corners of the square may be farther than pins just outside it
+        inside = [pair for pair in found if pair[1] <= radius]
+        if len(inside) >= k or radius >= reach:
+            return (inside if radius < reach else found)[:k]
+        searches += 1
+        radius = reach if searches == NEAREST_SEARCHES else radius * 2
@@ -0,0 +1,220 @@
+"""
+Revision history of campaign entities.
+
+Every change to a Versioned row (campaigns, characters, places, notes, ...)
+adds a revisions row for the version it created. Rather than a copy of the
+row, a revision holds a patch back to the version before it: the previous
+values of the changed columns only, and for long text only the lines that
+changed. The entity's row is always the newest version, so an older one is
+rebuilt by applying the patches of every later version, newest first. A
+note edited hundreds of times costs the edited lines per revision, not a
+copy of the note.
+
+Revisions of ORM writes are collected in before_flush, while the previous
+values are in the attribute history, and inserted with one executemany once
+the flush has written the rows, in the same transaction. Set-based writes
+record theirs with record() (see api.bulk). Columns in a model's
+__revision_exclude__ have no history; versions that only changed those have
+no revision. The flush listeners are installed by register(), which the
+API and the job worker call at startup.
+
+A patch is {"set": {column: previous value}, "lines": {column: edits}};
+each edit [start, end, text] replaces lines start:end of the newer text.
+"""
+
+import json
+from collections import defaultdict
+from datetime import date, datetime
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, event, insert, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import ONETOMANY
+
+from ..core.database import SessionLocal, Versioned
+from ..models import (
+    Campaign, Character, Place, Item, Quest, Session as GameSession, Note, Encounter, Route, Revision,
+)
+
+# Entity types with a history, by URL name (their table name)
+MODELS = {
+    model.__tablename__: model
+    for model in (Campaign, Character, Place, Item, Quest, GameSession, Note, Encounter, Route)
+}
+UNTRACKED = {"id", "version", "created_at", "updated_at"}
+LINE_DIFF_MIN = 200  # shorter text is stored whole
+
+Change = Tuple[Any, Any]  # (previous value, new value)
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_encode, separators=(",", ":"))
+
+
+def tracked_columns(model) -> List[str]:
+    return [
+        prop.key for prop in inspect(model).column_attrs
+        if prop.key not in UNTRACKED and prop.key not in model.__revision_exclude__
+    ]
+
+
+def entity_campaign_id(obj) -> int:
+    return obj.id if isinstance(obj, Campaign) else obj.campaign_id
+
+
+def _line_edits(newer: str, older: str) -> List[list]:
+    """Edits that turn newer back into older, line by line."""
+    newer_lines, older_lines = newer.splitlines(keepends=True), older.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, newer_lines, older_lines, autojunk=False)
+    return [
+        [i1, i2, "".join(older_lines[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"
+    ]
+
+
+def _apply_line_edits(newer: str, edits: List[list]) -> str:
+    lines = newer.splitlines(keepends=True)
+    # Later edits first, so the line numbers of earlier ones still hold
+    for start, end, text in reversed(edits):
+        lines[start:end] = [text]
+    return "".join(lines)
+
+
+def make_patch(changes: Dict[str, Change]) -> Dict[str, Any]:
+    """The patch that undoes changes."""
+    patch: Dict[str, Dict[str, Any]] = {"set": {}, "lines": {}}
+    for key, (previous, new) in changes.items():
+        if isinstance(previous, str) and isinstance(new, str) and len(previous) >= LINE_DIFF_MIN:
+            edits = _line_edits(new, previous)
+            if len(_dumps(edits)) < len(_dumps(previous)):
+                patch["lines"][key] = edits
+                continue
+        patch["set"][key] = previous
+    return {part: values for part, values in patch.items() if values}
+
+
+def apply_patch(data: Dict[str, Any], patch: Dict[str, Any]):
+    """Turn data, a snapshot of a version, into the version before it."""
+    data.update(patch.get("set", {}))
+    for key, edits in patch.get("lines", {}).items():
+        data[key] = _apply_line_edits(data[key], edits)
+
+
+def revision(model, entity_id: int, campaign_id: int, version: int,
+             changes: Dict[str, Change]) -> Optional[Dict[str, Any]]:
+    """The revisions row for a change that created version, or None if no tracked column changed."""
+    untracked = UNTRACKED.union(model.__revision_exclude__)
+    changes = {
+        key: change for key, change in changes.items()
+        if key not in untracked and change[0] != change[1]
+    }
+    if not changes:
+        return None
+    return {
+        "entity_type": model.__tablename__,
+        "entity_id": entity_id,
+        "campaign_id": campaign_id,
+        "version": version,
+        "patch": _dumps(make_patch(changes)),
+    }
+
+
+def revision_of(obj, changes: Dict[str, Change]) -> Optional[Dict[str, Any]]:
+    """The revisions row for changes about to be written to a loaded entity."""
+    return revision(type(obj), obj.id, entity_campaign_id(obj), obj.version + 1, changes)
+
+
+def record(db: Session, rows: List[Optional[Dict[str, Any]]]):
+    """Insert revisions (see revision()) in one statement, by the user the session acts for."""
+    rows = [row for row in rows if row]
+    if rows:
+        user_id = db.info.get("user_id")
+        db.connection().execute(insert(Revision.__table__), [{**row, "user_id": user_id} for row in rows])
+
+
+def forget(db: Session, model, ids):
+    """Delete the revisions of rows being deleted; ids is a list or a SELECT of ids."""
+    db.connection().execute(delete(Revision.__table__).where(
+        Revision.entity_type == model.__tablename__, Revision.entity_id.in_(ids)
+    ))
+
+
+def _history_changes(obj) -> Dict[str, Change]:
+    attrs = inspect(obj).attrs
+    changes = {}
+    for key in tracked_columns(type(obj)):
+        history = attrs[key].history
+        if history.added:
+            changes[key] = (history.deleted[0] if history.deleted else None, history.added[0])
+    return changes
+
+
+def _collect_revisions(session: Session, flush_context, instances):
+    changed: Dict[Any, Dict[str, Change]] = {}
+    for obj in session.dirty:
+        if isinstance(obj, Versioned):
+            changed[obj] = _history_changes(obj)
+
+    deleted = [obj for obj in session.deleted if isinstance(obj, Versioned)]
+    for obj in deleted:
+        # The flush sets the foreign key of children that are not deleted along to NULL
+        for relationship in inspect(obj).mapper.relationships:
+            child = relationship.mapper
+            if relationship.direction is not ONETOMANY or relationship.cascade.delete \
+                    or not issubclass(child.class_, Versioned):
+                continue
+            for item in getattr(obj, relationship.key):
+                if item in session.deleted:
+                    continue
+                for _, remote in relationship.local_remote_pairs:
+                    key = child.get_property_by_column(remote).key
+                    changed.setdefault(item, {})[key] = (getattr(item, key), None)
+
+    session.info["revisions"] = [revision_of(obj, changes) for obj, changes in changed.items()]
+    forgotten = session.info["forgotten"] = defaultdict(list)
+    for obj in deleted:
+        forgotten[type(obj)].append(obj.id)
+
+
+def _write_revisions(session: Session, flush_context):
+    record(session, session.info.pop("revisions", []))
+    for model, ids in session.info.pop("forgotten", {}).items():
+        forget(session, model, ids)
+
+
+def register():
+    """Record revisions on every flush of a SessionLocal session. Safe to call more than once."""
+    for identifier, listener in (("before_flush", _collect_revisions), ("after_flush", _write_revisions)):
+        if not event.contains(SessionLocal, identifier, listener):
+            event.listen(SessionLocal, identifier, listener)
+
+
+def snapshot(obj) -> Dict[str, Any]:
+    """The tracked columns of an entity as JSON values."""
+    return json.loads(_dumps({key: getattr(obj, key) for key in tracked_columns(type(obj))}))
+
+
+def list_revisions(db: Session, obj) -> List[Revision]:
+    """An entity's revisions, newest first."""
+    return db.query(Revision).filter(
+        Revision.entity_type == type(obj).__tablename__, Revision.entity_id == obj.id
+    ).order_by(Revision.version.desc()).all()
+
+
+def rebuild(db: Session, obj, version: int) -> Dict[str, Any]:
+    """The tracked columns of an entity as they were at version (1 to its current version)."""
+    data = snapshot(obj)
+    patches = db.query(Revision.patch).filter(
+        Revision.entity_type == type(obj).__tablename__, Revision.entity_id == obj.id,
+        Revision.version > version, Revision.version <= obj.version
+    ).order_by(Revision.version.desc())
+    for (patch,) in patches:
+        apply_patch(data, json.loads(patch))
+    return data
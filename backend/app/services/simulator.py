@@ -0,0 +1,216 @@
+"""
+Monte-Carlo encounter simulator.
+
+Simulates many fights at once: hit points are stored as (simulations x
+combatants) arrays and every attack is resolved for all simulations with a
+single vectorized roll. Each round the party attacks first, then the
+monsters. Attackers pick a random living target, a natural 20 always hits
+and doubles the damage dice, a natural 1 always misses.
+
+Large runs are split into chunks and spread over the shared process pool.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from .dice import compile_dice, DiceError
+from .derived_stats import ability_modifier, proficiency_bonus
+from .workers import get_process_pool, pool_size
+
+# Runs with at least this many simulations are spread over the process pool
+PARALLEL_THRESHOLD = 50_000
+# Upper bound on simulation_work() for one run
+MAX_SIMULATION_WORK = 250_000_000
+
+
+@dataclass(frozen=True)
+class CombatProfile:
+    name: str
+    armor_class: int
+    hit_points: int
+    attack_bonus: int
+    damage: str
+    attacks: int = 1
+
+
+def character_profile(character, weapon_damage: Optional[str] = None) -> CombatProfile:
+    """
+    Build a combat profile from a Character row.
+
+    The attack uses the better of Strength and Dexterity plus proficiency,
+    with the equipped weapon's damage (an unarmed 1d4 if there is none).
+    """
+    stats = character.stats or {}
+    level = character.level or 1
+    modifier = max(ability_modifier(stats.get("str")), ability_modifier(stats.get("dex")))
+    proficiency = proficiency_bonus(level)
+
+    hit_points = character.hit_points_current
+    if hit_points is None:
+        hit_points = character.hit_points_max
+    if hit_points is None:
+        try:
+            hit_dice = compile_dice(character.hit_dice or f"{level}d8")
+            hit_points = int(sum(t.count * (t.sides + 1) / 2 for t in hit_dice.terms))
+        except DiceError:
+            hit_points = level * 5
+
+    damage = weapon_damage or "1d4"
+    try:
+        compile_dice(damage)
+    except DiceError:
+        damage = "1d4"
+
+    return CombatProfile(
+        name=character.name,
+        armor_class=character.armor_class or 10,
+        hit_points=max(hit_points, 1),
+        attack_bonus=proficiency + modifier,
+        damage=f"{damage}{modifier:+d}",
+    )
+
+
+def _attack(attacker: CombatProfile, hp: np.ndarray, armor_class: np.ndarray,
+            active: np.ndarray, rng: np.random.Generator):
+    """Resolve one attack by `attacker` in every active simulation against `hp` in place."""
+    n = hp.shape[0]
+    alive = hp > 0
+    has_target = alive.any(axis=1)
+    target = np.argmax(rng.random(hp.shape) * alive, axis=1)
+
+    d20 = rng.integers(1, 21, size=n)
+    crit = d20 == 20
+    hit = crit | ((d20 != 1) & (d20 + attacker.attack_bonus >= armor_class[target]))
+
+    expression = compile_dice(attacker.damage)
+    damage = expression.roll_many(n, rng)
+    damage = np.where(crit, damage + expression.roll_many(n, rng) - expression.constant, damage)
+
+    applied = active & has_target & hit
+    rows = np.nonzero(applied)[0]
+    hp[rows, target[rows]] -= np.maximum(damage[rows], 0)
+
+
+def simulate_batch(party: Sequence[CombatProfile], enemies: Sequence[CombatProfile],
+                   simulations: int, max_rounds: int, seed=None) -> Dict[str, np.ndarray]:
+    """Run one batch of simulations and return per-simulation outcome arrays."""
+    rng = np.random.default_rng(seed)
+    party_hp = np.tile(np.array([p.hit_points for p in party], dtype=np.int64), (simulations, 1))
+    enemy_hp = np.tile(np.array([e.hit_points for e in enemies], dtype=np.int64), (simulations, 1))
+    party_ac = np.array([p.armor_class for p in party])
+    enemy_ac = np.array([e.armor_class for e in enemies])
+
+    finished = np.zeros(simulations, dtype=bool)
+    won = np.zeros(simulations, dtype=bool)
+    rounds = np.full(simulations, max_rounds, dtype=np.int64)
+
+    for round_number in range(1, max_rounds + 1):
+        for attackers, attacker_hp, defender_hp, defender_ac in (
+            (party, party_hp, enemy_hp, enemy_ac),
+            (enemies, enemy_hp, party_hp, party_ac),
+        ):
+            for index, attacker in enumerate(attackers):
+                active = ~finished & (attacker_hp[:, index] > 0)
+                for _ in range(attacker.attacks):
+                    _attack(attacker, defender_hp, defender_ac, active, rng)
+
+            party_down = (party_hp <= 0).all(axis=1)
+            enemies_down = (enemy_hp <= 0).all(axis=1)
+            newly_finished = ~finished & (party_down | enemies_down)
+            won |= newly_finished & enemies_down & ~party_down
+            rounds[newly_finished] = round_number
+            finished |= newly_finished
+
+        if finished.all():
+            break
+
+    return {
+        "finished": finished,
+        "won": won,
+        "rounds": rounds,
+        "party_alive": party_hp > 0,
+    }
+
+
+def _summarize_batch(party, enemies, simulations, max_rounds, seed) -> Dict[str, np.ndarray]:
+    """Run a batch and reduce it to sums so only a few numbers cross process boundaries."""
+    outcome = simulate_batch(party, enemies, simulations, max_rounds, seed)
+    finished = outcome["finished"]
+    return {
+        "wins": int(outcome["won"].sum()),
+        "finished": int(finished.sum()),
+        "finished_rounds": int(outcome["rounds"][finished].sum()),
+        "party_alive": outcome["party_alive"].sum(axis=0),
+    }
+
+
+def simulation_work(combatants: Sequence[CombatProfile], simulations: int, max_rounds: int) -> int:
+    """
+    Worst-case array cells a run touches.
+
+    Every attack in every round rolls a target over a (simulations x
+    combatants) array, so this bounds both CPU time and memory.
+    """
+    return simulations * max_rounds * sum(c.attacks for c in combatants) * len(combatants)
+
+
+def run_simulation(party: Sequence[CombatProfile], enemies: Sequence[CombatProfile],
+                   simulations: int, max_rounds: int = 20, seed: Optional[int] = None,
+                   parallel: Optional[bool] = None) -> Dict:
+    """Simulate an encounter and return win probability, expected rounds and survival rates."""
+    started = time.perf_counter()
+    if parallel is None:
+        parallel = simulations >= PARALLEL_THRESHOLD
+
+    chunks = pool_size() if parallel else 1
+    sizes = [simulations // chunks + (1 if i < simulations % chunks else 0) for i in range(chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(chunks)
+
+    if chunks > 1:
+        pool = get_process_pool()
+        futures = [
+            pool.submit(_summarize_batch, list(party), list(enemies), size, max_rounds, s)
+            for size, s in zip(sizes, seeds) if size
+        ]
+        batches = [f.result() for f in futures]
+    else:
+        batches = [_summarize_batch(party, enemies, simulations, max_rounds, seeds[0])]
+
+    wins = sum(b["wins"] for b in batches)
+    finished = sum(b["finished"] for b in batches)
+    finished_rounds = sum(b["finished_rounds"] for b in batches)
+    party_alive = np.sum([b["party_alive"] for b in batches], axis=0)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "simulations": simulations,
+        "win_probability": wins / simulations,
+        "loss_probability": (finished - wins) / simulations,
+        "timeout_probability": (simulations - finished) / simulations,
+        "expected_rounds": finished_rounds / finished if finished else None,
+        "expected_party_deaths": float(len(party) - party_alive.sum() / simulations),
+        "survival": {p.name: float(alive / simulations) for p, alive in zip(party, party_alive)},
+        "elapsed_seconds": elapsed,
+        "simulations_per_second": simulations / elapsed if elapsed else None,
+    }
+
+
+def benchmark(simulations: int = 100_000, max_rounds: int = 20, parallel: bool = False) -> Dict:
+    """Time a representative four-versus-six fight."""
+    party = [
+        CombatProfile("Fighter", 18, 44, 7, "1d8+4", attacks=2),
+        CombatProfile("Rogue", 15, 33, 7, "1d6+4+3d6"),
+        CombatProfile("Cleric", 18, 38, 5, "1d8+3"),
+        CombatProfile("Wizard", 12, 27, 6, "2d10"),
+    ]
+    enemies = [CombatProfile(f"Hobgoblin {i + 1}", 18, 11, 3, "1d8+1") for i in range(6)]
+    result = run_simulation(party, enemies, simulations, max_rounds, seed=0, parallel=parallel)
+    return {
+        "simulations": simulations,
+        "parallel": parallel,
+        "elapsed_seconds": result["elapsed_seconds"],
+        "simulations_per_second": result["simulations_per_second"],
+    }
@@ -0,0 +1,139 @@
+"""
+SRD reference catalog.
+
+Spells, items and monsters are loaded once from the bundled app/data/srd.json
+and kept in memory. Each kind is indexed by id, by normalized name and by a
+sorted list of name keys so prefix lookups ("fir" -> Fire Bolt, Fireball) are
+a binary search. Every word of a name is indexed, so "wou" also finds Cure
+Wounds.
+
+Characters and items store a catalog id (``srd_id``) instead of the text of
+SRD entries; clients resolve the full text through the /srd endpoints.
+"""
+
+import json
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from ..core.compression import PrecompressedPayload
+from .character_index import name_key
+
+SRD_PATH = Path(__file__).resolve().parent.parent / "data" / "srd.json"
+KINDS = ("spells", "items", "monsters")
+
+# Fields of an inlined spell that only repeat the spell's text; they are
+# dropped when the spell is in the catalog. Any other field (prepared, a
+# player's notes, ...) stays on the character.
+SPELL_TEXT_FIELDS = ("school", "casting_time", "castingTime", "range", "duration", "components", "description")
+
+
+class SRDIndex:
+    """In-memory index over one kind of catalog entry."""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.entries = sorted(entries, key=lambda e: e["name"])
+        self.by_id = {entry["id"]: entry for entry in self.entries}
+        self.by_name = {name_key(entry["name"]): entry for entry in self.entries}
+
+        keys: List[Tuple[str, str]] = []
+        for entry in self.entries:
+            words = name_key(entry["name"]).split(" ")
+            for i in range(len(words)):
+                keys.append((" ".join(words[i:]), entry["id"]))
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._ids = [entry_id for _, entry_id in keys]
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(entry_id)
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.by_name.get(name_key(name))
+
+    def search(self, prefix: str = "", limit: int = 20) -> List[Dict[str, Any]]:
+        """Entries with a word starting with prefix, full-name matches first."""
+        prefix = name_key(prefix)
+        if not prefix:
+            return self.entries[:limit]
+
+        start = bisect_left(self._keys, prefix)
+        seen = set()
+        results = []
+        for i in range(start, len(self._keys)):
+            if not self._keys[i].startswith(prefix):
+                break
+            if self._ids[i] not in seen:
+                seen.add(self._ids[i])
+                results.append(self.by_id[self._ids[i]])
+        results.sort(key=lambda e: (not name_key(e["name"]).startswith(prefix), e["name"]))
+        return results[:limit]
+
+
+class SRDCatalog:
+    def __init__(self, data: Dict[str, Any]):
+        self.source = data.get("source", "")
+        self.indexes = {kind: SRDIndex(data.get(kind, [])) for kind in KINDS}
+
+    @classmethod
+    def load(cls, path: Path = SRD_PATH) -> "SRDCatalog":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __getitem__(self, kind: str) -> SRDIndex:
+        return self.indexes[kind]
+
+    @property
+    def spells(self) -> SRDIndex:
+        return self.indexes["spells"]
+
+    @property
+    def items(self) -> SRDIndex:
+        return self.indexes["items"]
+
+    @property
+    def monsters(self) -> SRDIndex:
+        return self.indexes["monsters"]
+
+    def spell_reference(self, entry: Any) -> Any:
+        """
+        Replace the text of an inlined SRD spell with its srd_id, keeping the
+        entry's other fields. Spells not in the catalog are left as they are.
+        """
+        spell = None
+        if isinstance(entry, str):
+            spell = self.spells.find(entry)
+            fields = {"name": entry}
+        elif isinstance(entry, dict) and entry.get("name"):
+            spell = self.spells.get(entry["srd_id"]) if entry.get("srd_id") else self.spells.find(entry["name"])
+            fields = entry
+        if spell is None:
+            return entry
+        reference = {"srd_id": spell["id"]}
+        reference.update({k: v for k, v in fields.items() if k not in SPELL_TEXT_FIELDS})
+        reference.setdefault("level", spell["level"])
+        return reference
+
+    def compact_spells(self, spells: Optional[Dict[str, List[Any]]]) -> Optional[Dict[str, List[Any]]]:
+        """Apply spell_reference to every entry of a character's spells JSON."""
+        if not spells:
+            return spells
+        return {
+            group: [self.spell_reference(entry) for entry in entries or []]
+            for group, entries in spells.items()
+        }
+
+
+@lru_cache(maxsize=1)
+def get_catalog() -> SRDCatalog:
+    return SRDCatalog.load()
+
+
+@lru_cache(maxsize=1)
+def catalog_snapshot() -> PrecompressedPayload:
+    """The whole catalog as one JSON document, compressed once and kept in memory."""
+    catalog = get_catalog()
+    return PrecompressedPayload(orjson.dumps({kind: catalog[kind].entries for kind in KINDS}))
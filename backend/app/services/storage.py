@@ -0,0 +1,205 @@
+"""
+Uploaded files.
+
+Uploads are streamed to a temporary file in UPLOAD_DIR while their SHA-256
+is computed, so memory use does not depend on the file size and
+MAX_UPLOAD_SIZE is enforced as the bytes arrive. Files are then moved to a
+path derived from the hash (uploads/ab/abcdef...): identical uploads are
+stored once, and a stored file never changes, so it can be cached forever.
+
+Thumbnails are made in the shared process pool, which also checks that an
+upload really is an image before it is kept.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+import anyio
+from PIL import Image, UnidentifiedImageError
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+from ..core.config import settings
+from ..core.compression import etag_matches
+from .workers import get_process_pool
+
+# Pillow format name -> content type of the images we accept
+IMAGE_FORMATS = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+THUMBNAIL_TYPE = "image/webp"
+CACHE_FOREVER = "public, max-age=31536000, immutable"
+READ_CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidImage(Exception):
+    pass
+
+
+@dataclass
+class ReceivedUpload:
+    path: Path
+    sha256: str
+    size: int
+
+    @property
+    def thumbnail_path(self) -> Path:
+        return self.path.with_suffix(".thumb")
+
+
+def file_path(sha256: str) -> Path:
+    return Path(settings.UPLOAD_DIR) / sha256[:2] / sha256
+
+
+def thumbnail_path(sha256: str) -> Path:
+    return file_path(sha256).with_suffix(".thumb.webp")
+
+
+async def receive_upload(chunks: AsyncIterator[bytes], max_size: int) -> ReceivedUpload:
+    """Write a request body to a temporary file, hashing it on the way."""
+    directory = Path(settings.UPLOAD_DIR) / "tmp"
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(fd, "wb") as out:
+            def write(chunk: bytes):
+                digest.update(chunk)
+                out.write(chunk)
+
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(f"Uploads are limited to {max_size} bytes")
+                await anyio.to_thread.run_sync(write, chunk)
+    except BaseException:
+        os.unlink(name)
+        raise
+    return ReceivedUpload(Path(name), digest.hexdigest(), size)
+
+
+def make_thumbnail(source: str, destination: str, max_size: int, max_pixels: int) -> Tuple[str, int, int]:
+    """
+    Write a WebP thumbnail of the image at source.
+
+    Returns the image's content type, width and height. Runs in a worker
+    process; raises InvalidImage for anything that is not a supported image.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(source) as image:
+            content_type = IMAGE_FORMATS.get(image.format)
+            if content_type is None:
+                raise InvalidImage(f"Unsupported image format: {image.format}")
+            width, height = image.size
+            # Lets JPEG decode at a reduced scale instead of full size
+            image.draft("RGB", (max_size, max_size))
+            image.thumbnail((max_size, max_size))
+            if image.mode not in ("RGB", "RGBA"):
+                transparent = image.mode in ("LA", "PA") or "transparency" in image.info
+                image = image.convert("RGBA" if transparent else "RGB")
+            image.save(destination, "WEBP", quality=80)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise InvalidImage("The upload is not a valid image") from e
+    return content_type, width, height
+
+
+async def create_thumbnail(upload: ReceivedUpload) -> Tuple[str, int, int]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(), make_thumbnail,
+        str(upload.path), str(upload.thumbnail_path),
+        settings.THUMBNAIL_SIZE, settings.MAX_IMAGE_PIXELS
+    )
+
+
+def keep_upload(upload: ReceivedUpload):
+    """Move a received upload and its thumbnail to their content-addressed paths."""
+    destination = file_path(upload.sha256)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(upload.thumbnail_path, thumbnail_path(upload.sha256))
+    os.replace(upload.path, destination)
+
+
+def discard_upload(upload: ReceivedUpload):
+    upload.path.unlink(missing_ok=True)
+    upload.thumbnail_path.unlink(missing_ok=True)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    The (first, last) byte positions of a single-range Range header.
+
+    Returns None when the whole file should be sent (no header, several
+    ranges, or a header we do not understand) and raises ValueError for a
+    range outside the file.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:  # "bytes=-500": the last 500 bytes
+        suffix = int(last)
+        if not suffix:
+            raise ValueError("Empty suffix range")
+        return max(size - suffix, 0), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size or first > last:
+        raise ValueError("Range not satisfiable")
+    return first, last
+
+
+def _read_range(path: Path, first: int, last: int):
+    with open(path, "rb") as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining:
+            chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(request: Request, path: Path, media_type: str, etag: str) -> Response:
+    """
+    Serve an immutable file, honouring If-None-Match and single byte ranges.
+    """
+    headers = {"ETag": f'"{etag}"', "Accept-Ranges": "bytes", "Cache-Control": CACHE_FOREVER}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    size = path.stat().st_size
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range.strip('"') == etag:
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    first, last = byte_range
+    headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+    headers["Content-Length"] = str(last - first + 1)
+    return StreamingResponse(
+        _read_range(path, first, last), status_code=206, media_type=media_type, headers=headers
+    )
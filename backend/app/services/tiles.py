@@ -0,0 +1,136 @@
+"""
+Map tile pyramids.
+
+Large map images are cut into a pyramid of TILE_SIZE x TILE_SIZE WebP
+tiles so a client only downloads the tiles of the region and zoom level it
+shows. Level 0 fits the whole map in one tile; every level doubles the
+resolution up to the original image at the top level. Tiles are addressed
+XYZ style as {level}/{x}/{y} with the origin at the top left, and edge
+tiles are padded with transparency to the full tile size.
+
+Tiling runs in the shared process pool after the upload has been answered.
+StoredFile.tile_status tracks it ("pending", "ready" or "failed"). Tiles
+are written to a temporary directory and renamed into place, so a tile set
+is either complete or absent.
+"""
+
+import logging
+import math
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Set
+
+from PIL import Image
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models import StoredFile
+from .storage import file_path
+from .workers import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+TILE_TYPE = "image/webp"
+
+_scheduled: Set[str] = set()
+_lock = threading.Lock()
+
+
+def tiles_path(sha256: str) -> Path:
+    return file_path(sha256).with_suffix(".tiles")
+
+
+def tile_path(sha256: str, level: int, x: int, y: int) -> Path:
+    return tiles_path(sha256) / str(level) / f"{x}_{y}.webp"
+
+
+def levels_for(width: int, height: int, tile_size: int) -> int:
+    """Number of pyramid levels for an image, down to one that fits a single tile."""
+    return max(math.ceil(math.log2(max(width, height) / tile_size)), 0) + 1
+
+
+def needs_tiles(width: int, height: int) -> bool:
+    return max(width or 0, height or 0) >= settings.MAP_TILE_MIN_SIZE
+
+
+def make_tiles(source: str, destination: str, tile_size: int, max_pixels: int) -> int:
+    """
+    Cut the image at source into a tile pyramid under destination.
+
+    Works from the full-resolution level down, halving the image between
+    levels, so each level is resampled from the one above rather than from
+    the original. Returns the number of levels. Runs in a worker process.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    building = Path(f"{destination}.tmp-{os.getpid()}")
+    shutil.rmtree(building, ignore_errors=True)
+    try:
+        with Image.open(source) as original:
+            transparent = original.mode in ("RGBA", "LA", "PA") or "transparency" in original.info
+            image = original.convert("RGBA" if transparent else "RGB")
+        levels = levels_for(image.width, image.height, tile_size)
+        for level in reversed(range(levels)):
+            (building / str(level)).mkdir(parents=True)
+            for x in range(math.ceil(image.width / tile_size)):
+                for y in range(math.ceil(image.height / tile_size)):
+                    box = (x * tile_size, y * tile_size,
+                           min((x + 1) * tile_size, image.width), min((y + 1) * tile_size, image.height))
+                    tile = image.crop(box)
+                    if tile.size != (tile_size, tile_size):
+                        padded = Image.new("RGBA", (tile_size, tile_size))
+                        padded.paste(tile, (0, 0))
+                        tile = padded
+                    tile.save(building / str(level) / f"{x}_{y}.webp", "WEBP", quality=80)
+            if level:
+                image = image.reduce(2)
+        # Left behind if the process stopped before the result was recorded
+        shutil.rmtree(destination, ignore_errors=True)
+        os.replace(building, destination)
+    except BaseException:
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+    return levels
+
+
+def _record_result(sha256: str, future):
+    try:
+        levels = future.result()
+        values = {"tile_status": "ready", "tile_levels": levels}
+        logger.info("Map tiles ready", extra={"sha256": sha256, "tile_levels": levels})
+    except Exception:
+        values = {"tile_status": "failed", "tile_levels": None}
+        logger.exception("Map tiling failed", extra={"sha256": sha256})
+    db = SessionLocal()
+    try:
+        db.query(StoredFile).filter(StoredFile.sha256 == sha256).update(values)
+        db.commit()
+    finally:
+        db.close()
+        with _lock:
+            _scheduled.discard(sha256)
+
+
+def is_scheduled(sha256: str) -> bool:
+    with _lock:
+        return sha256 in _scheduled
+
+
+def schedule_tiling(sha256: str) -> bool:
+    """
+    Start tiling a stored image in the background.
+
+    The caller sets tile_status to "pending". Returns False if the file is
+    already being tiled by this process.
+    """
+    with _lock:
+        if sha256 in _scheduled:
+            return False
+        _scheduled.add(sha256)
+    future = get_process_pool().submit(
+        make_tiles, str(file_path(sha256)), str(tiles_path(sha256)),
+        settings.MAP_TILE_SIZE, settings.MAX_IMAGE_PIXELS
+    )
+    future.add_done_callback(lambda f: _record_result(sha256, f))
+    return True
@@ -0,0 +1,233 @@
+"""
+Travel times and route finding between places.
+
+A campaign's routes form a directed graph (bidirectional routes add an edge
+each way) weighted by travel hours. Fastest routes are found with A* using
+ALT lower bounds: for a handful of landmark places the graph stores the
+travel time from and to every other place, and by the triangle inequality
+|d(L, t) - d(L, v)| never overestimates the time from v to t. That steers
+the search towards the destination, so it settles a small part of a large
+hex-crawl map instead of everything within the same travel time.
+
+Landmark tables take a Dijkstra run per landmark and direction to build,
+so graphs are cached per campaign and rebuilt when its routes change.
+Bounds stay valid when a search skips some travel modes, since removing
+edges only makes trips longer.
+"""
+
+import heapq
+import math
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import Route, TravelMode, Terrain
+
+# Miles per hour of travel at a normal pace
+MODE_SPEED = {
+    TravelMode.FOOT: 3.0,
+    TravelMode.MOUNTED: 4.0,
+    TravelMode.WAGON: 2.0,
+    TravelMode.BOAT: 1.5,
+    TravelMode.SHIP: 2.0,
+    TravelMode.FLYING: 8.0,
+}
+# Difficult terrain halves overland speed
+DIFFICULT_TERRAIN = {
+    Terrain.FOREST, Terrain.HILLS, Terrain.MOUNTAINS, Terrain.SWAMP, Terrain.ARCTIC, Terrain.UNDERDARK,
+}
+OVERLAND_MODES = {TravelMode.FOOT, TravelMode.MOUNTED, TravelMode.WAGON}
+
+LANDMARKS = 8
+INFINITY = math.inf
+
+
+def route_hours(distance: float, terrain: Terrain, travel_mode: TravelMode,
+                travel_hours: Optional[float] = None) -> float:
+    """Hours to travel a route: its travel_hours if set, else distance at the mode's speed."""
+    if travel_hours is not None:
+        return travel_hours
+    hours = distance / MODE_SPEED[travel_mode]
+    if travel_mode in OVERLAND_MODES and terrain in DIFFICULT_TERRAIN:
+        hours *= 2
+    return hours
+
+
+@dataclass(frozen=True)
+class Leg:
+    route_id: int
+    from_place_id: int
+    to_place_id: int
+    distance: float
+    hours: float
+    travel_mode: TravelMode
+    terrain: Terrain
+
+
+@dataclass
+class Journey:
+    hours: float
+    distance: float
+    legs: List[Leg] = field(default_factory=list)
+    explored: int = 0  # places settled by the search
+
+    @property
+    def place_ids(self) -> List[int]:
+        return [self.legs[0].from_place_id] + [leg.to_place_id for leg in self.legs] if self.legs else []
+
+
+def route_legs(routes: Iterable[Route]) -> List[Leg]:
+    legs = []
+    for route in routes:
+        hours = route_hours(route.distance, route.terrain, route.travel_mode, route.travel_hours)
+        ends = [(route.from_place_id, route.to_place_id)]
+        if route.bidirectional:
+            ends.append((route.to_place_id, route.from_place_id))
+        for start, end in ends:
+            legs.append(Leg(route.id, start, end, route.distance, hours, route.travel_mode, route.terrain))
+    return legs
+
+
+class TravelGraph:
+    def __init__(self, legs: Iterable[Leg], landmarks: int = LANDMARKS):
+        self.outgoing: Dict[int, List[Leg]] = defaultdict(list)
+        self.incoming: Dict[int, List[Leg]] = defaultdict(list)
+        for leg in legs:
+            self.outgoing[leg.from_place_id].append(leg)
+            self.incoming[leg.to_place_id].append(leg)
+        self.places: Set[int] = set(self.outgoing) | set(self.incoming)
+        self.landmarks: List[int] = []
+        self.from_landmark: List[Dict[int, float]] = []  # d(L, v)
+        self.to_landmark: List[Dict[int, float]] = []  # d(v, L)
+        self._choose_landmarks(landmarks)
+
+    def _times(self, source: int, forward: bool) -> Dict[int, float]:
+        """Dijkstra from source over outgoing legs, or towards it over incoming ones."""
+        edges = self.outgoing if forward else self.incoming
+        times = {source: 0.0}
+        queue = [(0.0, source)]
+        while queue:
+            time, place = heapq.heappop(queue)
+            if time > times[place]:
+                continue
+            for leg in edges.get(place, ()):
+                other = leg.to_place_id if forward else leg.from_place_id
+                candidate = time + leg.hours
+                if candidate < times.get(other, INFINITY):
+                    times[other] = candidate
+                    heapq.heappush(queue, (candidate, other))
+        return times
+
+    def _choose_landmarks(self, count: int):
+        # Farthest-point selection: each landmark is the place worst covered
+        # by the previous ones (unreachable places first)
+        if not self.places:
+            return
+        nearest = {place: INFINITY for place in self.places}
+        landmark = min(self.places)
+        for _ in range(min(count, len(self.places))):
+            self.landmarks.append(landmark)
+            self.from_landmark.append(self._times(landmark, forward=True))
+            self.to_landmark.append(self._times(landmark, forward=False))
+            for place in self.places:
+                time = min(self.from_landmark[-1].get(place, INFINITY), self.to_landmark[-1].get(place, INFINITY))
+                if time < nearest[place]:
+                    nearest[place] = time
+            candidates = [place for place in self.places if place not in self.landmarks]
+            if not candidates:
+                break
+            landmark = max(candidates, key=lambda place: (nearest[place], -place))
+
+    def lower_bound(self, place: int, target: int) -> float:
+        """A travel time from place to target that the fastest route cannot beat."""
+        bound = 0.0
+        for from_l, to_l in zip(self.from_landmark, self.to_landmark):
+            l_target, l_place = from_l.get(target, INFINITY), from_l.get(place, INFINITY)
+            if l_target < INFINITY and l_place < INFINITY:
+                bound = max(bound, l_target - l_place)
+            place_l, target_l = to_l.get(place, INFINITY), to_l.get(target, INFINITY)
+            if place_l < INFINITY and target_l < INFINITY:
+                bound = max(bound, place_l - target_l)
+        return bound
+
+    def fastest(self, source: int, target: int, modes: Optional[Set[TravelMode]] = None,
+                use_landmarks: bool = True) -> Optional[Journey]:
+        """The fastest journey from source to target, or None if target cannot be reached."""
+        if source == target:
+            return Journey(0.0, 0.0)
+        if source not in self.outgoing or target not in self.incoming:
+            return None
+
+        best = {source: 0.0}
+        arrived_by: Dict[int, Leg] = {}
+        settled = set()
+        queue = [(0.0, 0.0, source)]
+        while queue:
+            _, time, place = heapq.heappop(queue)
+            if place in settled:
+                continue
+            settled.add(place)
+            if place == target:
+                break
+            for leg in self.outgoing.get(place, ()):
+                if modes is not None and leg.travel_mode not in modes:
+                    continue
+                other = leg.to_place_id
+                candidate = time + leg.hours
+                if other not in settled and candidate < best.get(other, INFINITY):
+                    best[other] = candidate
+                    arrived_by[other] = leg
+                    estimate = candidate + (self.lower_bound(other, target) if use_landmarks else 0.0)
+                    heapq.heappush(queue, (estimate, candidate, other))
+        else:
+            return None
+
+        legs = []
+        place = target
+        while place != source:
+            leg = arrived_by[place]
+            legs.append(leg)
+            place = leg.from_place_id
+        legs.reverse()
+        return Journey(best[target], sum(leg.distance for leg in legs), legs, len(settled))
+
+
+_graphs: Dict[int, Tuple[tuple, TravelGraph]] = {}
+_lock = threading.Lock()
+
+
+def _signature(db: Session, campaign_id: int) -> tuple:
+    # Changes whenever a route of the campaign is added, edited or deleted;
+    # every edit bumps a version, even two within the same updated_at
+    return tuple(db.query(
+        func.count(Route.id), func.max(Route.id), func.max(Route.updated_at), func.sum(Route.version)
+    ).filter(Route.campaign_id == campaign_id).one())
+
+
+def campaign_graph(db: Session, campaign_id: int) -> TravelGraph:
+    """The campaign's travel graph, rebuilt if its routes changed since it was cached."""
+    signature = _signature(db, campaign_id)
+    cached = _graphs.get(campaign_id)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    # Built without the lock so a large rebuild does not hold up other campaigns;
+    # concurrent rebuilds of one campaign are harmless, the last one is kept
+    routes = db.query(
+        Route.id, Route.from_place_id, Route.to_place_id, Route.distance, Route.terrain,
+        Route.travel_mode, Route.travel_hours, Route.bidirectional,
+    ).filter(Route.campaign_id == campaign_id).all()
+    graph = TravelGraph(route_legs(routes))
+    with _lock:
+        _graphs[campaign_id] = (signature, graph)
+    return graph
+
+
+def invalidate(campaign_id: int):
+    """Drop a campaign's cached graph; call after changing its routes."""
+    with _lock:
+        _graphs.pop(campaign_id, None)
@@ -0,0 +1,41 @@
+"""
+Shared process pool for CPU-bound work.
+
+The pool is created on first use with the "spawn" start method, so worker
+processes never inherit the API's threads or database connections.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from ..core.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool, creating it if needed."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PROCESS_POOL_WORKERS or None,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def pool_size() -> int:
+    return settings.PROCESS_POOL_WORKERS or multiprocessing.cpu_count()
+
+
+def shutdown_process_pool():
+    """Shut the pool down, waiting for running tasks."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,36 @@
+"""
+pytest plugin with query-count fixtures. Enable it in a conftest.py:
+
+    pytest_plugins = ["app.testing"]
+
+    def test_get_campaign(client, query_guard):
+        client.get("/api/v1/campaigns/1", headers=headers)
+
+With query_guard, a request fails the test (QueryBudgetExceeded or
+RepeatedLazyLoad) when it runs more statements than its endpoint's
+@query_budget or lazily loads one relationship for several objects.
+Budgets are counted by the metrics middleware, so METRICS_ENABLED must be
+on (the default).
+"""
+
+import pytest
+
+from .core.config import settings
+from .core.querycount import assert_max_queries
+
+
+@pytest.fixture
+def query_guard(monkeypatch):
+    """Run the N+1 guard in raise mode for the duration of the test."""
+    monkeypatch.setattr(settings, "QUERY_GUARD", "raise")
+
+
+@pytest.fixture
+def max_queries():
+    """
+    Context manager failing the test when its block runs more than n statements:
+
+        with max_queries(3):
+            client.post(...)
+    """
+    return assert_max_queries
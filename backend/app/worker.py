@@ -0,0 +1,37 @@
+"""
+Background job worker.
+
+    python -m app.worker          # run jobs until stopped (SIGINT/SIGTERM)
+    python -m app.worker --burst  # run the jobs that are due, then exit
+
+Run as many workers as needed next to the API; they share the jobs table
+(see app.services.jobs). A running job is finished before the worker exits.
+"""
+
+import argparse
+import signal
+import threading
+
+from .core.logging import configure_logging
+from .services import jobs, revisions
+from .services.workers import shutdown_process_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--burst", action="store_true", help="Exit once no job is due")
+    args = parser.parse_args()
+
+    configure_logging()
+    revisions.register()
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    try:
+        jobs.work(stop, burst=args.burst)
+    finally:
+        shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    main()
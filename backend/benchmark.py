@@ -0,0 +1,358 @@
+"""
+Performance benchmarks.
+
+Run from the backend directory, e.g.:
+    python benchmark.py simulator
+    python benchmark.py bulk --rows 200
+    python benchmark.py queries
+    python benchmark.py campaign-detail --members 50
+    python benchmark.py serialization --characters 500
+    python benchmark.py place-map --places 20000
+
+API benchmarks run in-process against a throwaway SQLite database unless
+DATABASE_URL is set.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def api_client():
+    """A TestClient with a registered user and a campaign: (client, headers, campaign_id)."""
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    username = f"bench{time.time_ns()}"
+    user = {"email": f"{username}@example.com", "username": username, "password": "benchmark"}
+    client.post("/api/v1/auth/register", json=user)
+    token = client.post(
+        "/api/v1/auth/login", data={"username": user["username"], "password": user["password"]}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    campaign_id = client.post("/api/v1/campaigns", json={"name": "Benchmark"}, headers=headers).json()["id"]
+    return client, headers, campaign_id
+
+
+def bench_simulator(args):
+    """Report encounter simulations per second, single process and pooled."""
+    from app.services.simulator import benchmark
+    from app.services.workers import shutdown_process_pool
+
+    benchmark(1000, parallel=True)  # Start the pool's worker processes
+    for parallel in (False, True):
+        result = benchmark(args.simulations, parallel=parallel)
+        mode = "process pool" if parallel else "single process"
+        print(f"{mode:>15}: {result['simulations_per_second']:>12,.0f} simulations/s "
+              f"({result['simulations']:,} in {result['elapsed_seconds']:.2f}s)")
+    shutdown_process_pool()
+
+
+def bench_bulk(args):
+    """Compare creating, updating and deleting items one request at a time and in bulk."""
+    client, headers, campaign_id = api_client()
+    items = [{"name": f"Item {i}", "item_type": "treasure", "value": i} for i in range(args.rows)]
+
+    def timed(label, func):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{label:>14}: {elapsed * 1000:>9.1f} ms ({args.rows / elapsed:>8,.0f} rows/s)")
+
+    created = []
+    timed("single create", lambda: created.extend(
+        client.post("/api/v1/items", json={**item, "campaign_id": campaign_id}, headers=headers).json()["id"]
+        for item in items
+    ))
+    timed("single update", lambda: [
+        client.put(f"/api/v1/items/{item_id}", json={"value": 1}, headers=headers) for item_id in created
+    ])
+    timed("single delete", lambda: [
+        client.delete(f"/api/v1/items/{item_id}", headers=headers) for item_id in created
+    ])
+
+    created = []
+    timed("bulk create", lambda: created.extend(
+        item["id"] for item in client.post(
+            "/api/v1/items/bulk", json={"campaign_id": campaign_id, "items": items}, headers=headers
+        ).json()
+    ))
+    timed("bulk update", lambda: client.patch(
+        "/api/v1/items/bulk", json={"items": [{"id": i, "value": 1} for i in created]}, headers=headers
+    ))
+    timed("bulk delete", lambda: client.request(
+        "DELETE", "/api/v1/items/bulk", json={"ids": created}, headers=headers
+    ))
+
+
+def bench_queries(args):
+    """Check the number of SQL statements per request against a budget; exits 1 if any is over."""
+    client, headers, campaign_id = api_client()
+    from app.core.querycount import count_queries
+
+    over = []
+
+    def check(label, budget, method, path, **kwargs):
+        with count_queries() as counter:
+            response = client.request(method, f"/api/v1{path}", headers=headers, **kwargs)
+        response.raise_for_status()
+        status = "ok" if counter.count <= budget else "OVER"
+        print(f"{label:>22}: {counter.count:>3} statements (budget {budget:>2}) {status}")
+        if counter.count > budget:
+            over.append(label)
+            if args.verbose:
+                print("\n".join(f"    {statement}" for statement in counter.statements))
+        return response.json() if response.content else None
+
+    check("create campaign", 2, "POST", "/campaigns", json={"name": "Queries"})
+    check("update campaign", 4, "PUT", f"/campaigns/{campaign_id}", json={"setting": "Greyhawk"})
+    for entity, body, change in (
+        ("places", {"name": "Keep"}, {"name": "Ruined keep"}),
+        ("items", {"name": "Lantern"}, {"name": "Hooded lantern"}),
+        ("quests", {"name": "Find the heir"}, {"description": "The heir was last seen in Waterdeep"}),
+        ("notes", {"title": "Rumours"}, {"content": "The mayor is a doppelganger"}),
+        ("sessions", {"session_number": 1}, {"title": "Arrival"}),
+    ):
+        created = check(f"create {entity[:-1]}", 3, "POST", f"/{entity}", json={**body, "campaign_id": campaign_id})
+        # user, row, campaign access, UPDATE, revision
+        check(f"update {entity[:-1]}", 5, "PUT", f"/{entity}/{created['id']}", json=change)
+    character = check("create character", 6, "POST", "/characters", json={
+        "name": "Mira", "campaign_id": campaign_id, "spells": {"1": [{"name": "Shield"}]}
+    })
+    check("update character", 5, "PUT", f"/characters/{character['id']}", json={"level": 2})
+    check("update spells", 6, "PUT", f"/characters/{character['id']}", json={"spells": {}})
+    check("bulk create items", 3, "POST", "/items/bulk", json={
+        "campaign_id": campaign_id, "items": [{"name": f"Coin {i}"} for i in range(50)]
+    })
+
+    if over:
+        raise SystemExit(f"Over budget: {', '.join(over)}")
+
+
+def bench_campaign_detail(args):
+    """Time GET /campaigns/{id} with many members; exits 1 if it takes more than 3 statements."""
+    client, headers, campaign_id = api_client()
+    from sqlalchemy import insert
+    from app.core.database import SessionLocal
+    from app.core.querycount import count_queries
+    from app.models import User, CampaignMember, CampaignRole
+
+    with SessionLocal() as db:
+        suffix = time.time_ns()
+        user_ids = db.scalars(insert(User).returning(User.id), [
+            {"email": f"member{i}-{suffix}@example.com", "username": f"member{i}-{suffix}",
+             "hashed_password": "-"}
+            for i in range(args.members)
+        ]).all()
+        db.execute(insert(CampaignMember), [
+            {"campaign_id": campaign_id, "user_id": user_id, "role": CampaignRole.PLAYER}
+            for user_id in user_ids
+        ])
+        db.commit()
+
+    with count_queries() as counter:
+        response = client.get(f"/api/v1/campaigns/{campaign_id}", headers=headers)
+    response.raise_for_status()
+    assert len(response.json()["members"]) == args.members
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        client.get(f"/api/v1/campaigns/{campaign_id}", headers=headers)
+    elapsed = time.perf_counter() - start
+    print(f"{args.members} members: {counter.count} statements, "
+          f"{elapsed / args.requests * 1000:.1f} ms per request")
+    if counter.count > 3:
+        raise SystemExit("\n".join(["Over budget of 3 statements:", *counter.statements]))
+
+
+def bench_serialization(args):
+    """Compare JSON encodings of a list of full character sheets, and the list endpoint's throughput."""
+    client, headers, campaign_id = api_client()
+    import json
+    import orjson
+    from app.core.database import SessionLocal
+    from app.core.responses import _list_adapter
+    from app.models import Character as CharacterModel
+    from app.schemas import Character
+
+    sheet = {
+        "race": "Half-Elf", "character_class": "Wizard", "level": 9, "background": "Sage",
+        "alignment": "Neutral Good", "stats": {"str": 8, "dex": 14, "con": 13, "int": 18, "wis": 12, "cha": 10},
+        "spells": {str(level): [{"name": f"Spell {level}-{i}", "level": level, "prepared": i % 2 == 0}
+                                for i in range(4)] for level in range(6)},
+        "features": [{"name": f"Feature {i}", "source": "class", "description": "x" * 120} for i in range(12)],
+        "backstory": "A long story. " * 40, "personality_traits": "Curious", "ideals": "Knowledge",
+        "bonds": "The library", "flaws": "Arrogant", "appearance": "Ink-stained robes",
+    }
+    client.post("/api/v1/characters/bulk", headers=headers, json={
+        "campaign_id": campaign_id,
+        "characters": [{**sheet, "name": f"Wizard {i}"} for i in range(args.characters)]
+    }).raise_for_status()
+
+    with SessionLocal() as db:
+        rows = db.query(CharacterModel).filter(CharacterModel.campaign_id == campaign_id).all()
+    adapter = _list_adapter(Character)
+
+    def default_path():
+        # FastAPI's response_model handling with the stdlib JSON encoder
+        return json.dumps(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json"),
+                          ensure_ascii=False, separators=(",", ":")).encode()
+
+    def orjson_path():
+        return orjson.dumps(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json"))
+
+    def fast_path():
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    for label, func in (("stdlib json", default_path), ("orjson", orjson_path), ("dump_json", fast_path)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            body = func()
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{label:>12}: {elapsed * 1000:>7.1f} ms per list ({len(body) / 1024:,.0f} KiB)")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        client.get(f"/api/v1/characters/campaign/{campaign_id}", headers=headers).raise_for_status()
+    elapsed = time.perf_counter() - start
+    print(f"{'endpoint':>12}: {args.repeat / elapsed:>7.1f} requests/s")
+
+
+def bench_place_map(args):
+    """Time viewport and nearest-place searches against reading every pin on the map."""
+    import json
+    import math
+    import random
+
+    client, headers, campaign_id = api_client()
+    from sqlalchemy import insert
+    from app.core.database import SessionLocal
+    from app.models import Place, PlaceType
+
+    rng = random.Random(0)
+    size = 10_000
+    with SessionLocal() as db:
+        rows = []
+        for i in range(args.places):
+            x, y = rng.uniform(0, size), rng.uniform(0, size)
+            rows.append({
+                "campaign_id": campaign_id, "name": f"Place {i}", "place_type": rng.choice(list(PlaceType)),
+                "map_coordinates": json.dumps({"x": x, "y": y}), "map_x": x, "map_y": y,
+            })
+        db.execute(insert(Place), rows)
+        db.commit()
+
+    points = [(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(args.requests)]
+    url = f"/api/v1/places/campaign/{campaign_id}"
+
+    def timed(label, request):
+        start = time.perf_counter()
+        for x, y in points:
+            request(x, y).raise_for_status()
+        elapsed = (time.perf_counter() - start) / args.requests
+        print(f"{label:>22}: {elapsed * 1000:>7.1f} ms per request")
+
+    viewport = size / 20
+    timed("viewport (5% wide)", lambda x, y: client.get(
+        f"{url}/within", headers=headers,
+        params={"min_x": x, "min_y": y, "max_x": x + viewport, "max_y": y + viewport},
+    ))
+    timed("5 nearest", lambda x, y: client.get(f"{url}/nearest", headers=headers, params={"x": x, "y": y}))
+    timed("5 nearest towns", lambda x, y: client.get(
+        f"{url}/nearest", headers=headers, params={"x": x, "y": y, "place_type": "town"}
+    ))
+
+    # Reference: fetch the whole map and search it in the client
+    def scan(x, y):
+        response = client.get(url, headers=headers)
+        sorted(response.json(), key=lambda p: math.hypot(p["map_x"] - x, p["map_y"] - y))[:5]
+        return response
+    timed("full map + sort", scan)
+
+
+def bench_routes(args):
+    """Compare fastest-route searches with and without landmark bounds on a hex-crawl grid."""
+    import random
+
+    api_client()  # Configures the app for the imports below
+    from app.models import Terrain, TravelMode
+    from app.services.travel import Leg, TravelGraph, route_hours
+
+    rng = random.Random(0)
+    side = args.side
+    legs = []
+    route_id = 0
+    for row in range(side):
+        for col in range(side):
+            place = row * side + col
+            # Hex neighbours in offset coordinates: east, and the two below
+            shift = col - 1 + row % 2
+            for other_row, other_col in ((row, col + 1), (row + 1, shift), (row + 1, shift + 1)):
+                if other_row >= side or not 0 <= other_col < side:
+                    continue
+                other = other_row * side + other_col
+                terrain = rng.choice(list(Terrain)[:7])
+                hours = route_hours(6.0, terrain, TravelMode.FOOT)
+                route_id += 1
+                for start, end in ((place, other), (other, place)):
+                    legs.append(Leg(route_id, start, end, 6.0, hours, TravelMode.FOOT, terrain))
+
+    start = time.perf_counter()
+    graph = TravelGraph(legs)
+    print(f"{side * side} places, {route_id} routes: landmarks built in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    pairs = [(rng.randrange(side * side), rng.randrange(side * side)) for _ in range(args.searches)]
+    for label, use_landmarks in (("Dijkstra", False), ("A* + landmarks", True)):
+        explored = 0
+        start = time.perf_counter()
+        for source, target in pairs:
+            explored += graph.fastest(source, target, use_landmarks=use_landmarks).explored
+        elapsed = (time.perf_counter() - start) / args.searches
+        print(f"{label:>16}: {elapsed * 1000:>7.2f} ms, {explored / args.searches:>8.0f} places settled per search")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="D&D Campaign Manager benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulator = commands.add_parser("simulator", help="Encounter simulator throughput")
+    simulator.add_argument("--simulations", type=int, default=200_000)
+    simulator.set_defaults(func=bench_simulator)
+
+    bulk = commands.add_parser("bulk", help="Bulk item endpoints against one-row-per-request")
+    bulk.add_argument("--rows", type=int, default=200)
+    bulk.set_defaults(func=bench_bulk)
+
+    queries = commands.add_parser("queries", help="SQL statements per request against a budget")
+    queries.add_argument("--verbose", action="store_true", help="Print the statements of requests over budget")
+    queries.set_defaults(func=bench_queries)
+
+    detail = commands.add_parser("campaign-detail", help="Campaign detail statements and latency by member count")
+    detail.add_argument("--members", type=int, default=50)
+    detail.add_argument("--requests", type=int, default=100)
+    detail.set_defaults(func=bench_campaign_detail)
+
+    serialization = commands.add_parser("serialization", help="JSON encoding of a large character list")
+    serialization.add_argument("--characters", type=int, default=500)
+    serialization.add_argument("--repeat", type=int, default=20)
+    serialization.set_defaults(func=bench_serialization)
+
+    place_map = commands.add_parser("place-map", help="Viewport and nearest-place searches by map size")
+    place_map.add_argument("--places", type=int, default=20_000)
+    place_map.add_argument("--requests", type=int, default=50)
+    place_map.set_defaults(func=bench_place_map)
+
+    routes = commands.add_parser("routes", help="Fastest-route search with and without landmarks")
+    routes.add_argument("--side", type=int, default=100, help="Hex grid of side x side places")
+    routes.add_argument("--searches", type=int, default=200)
+    routes.set_defaults(func=bench_routes)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,49 @@
+"""
+Shared fixtures. The API runs against a throwaway SQLite database, created
+before the app is imported.
+"""
+
+import itertools
+import os
+import tempfile
+
+import pytest
+
+_tmp = tempfile.mkdtemp(prefix="dnd-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp, "uploads")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+pytest_plugins = ["app.testing"]
+
+API = "/api/v1"
+_usernames = itertools.count(1)
+
+
+def register(client) -> dict:
+    """Register a new user and return its Authorization headers."""
+    username = f"user{next(_usernames)}"
+    client.post(f"{API}/auth/register", json={
+        "email": f"{username}@example.com", "username": username, "password": "password"
+    })
+    token = client.post(f"{API}/auth/login", data={"username": username, "password": "password"}).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def headers(client):
+    return register(client)
+
+
+@pytest.fixture
+def campaign(client, headers):
+    return client.post(f"{API}/campaigns", json={"name": "Test campaign"}, headers=headers).json()
@@ -0,0 +1,58 @@
+"""GET /campaigns/{id} loads the campaign, owner and members in a fixed number of queries."""
+
+import itertools
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal
+from app.models import User, CampaignMember, CampaignRole
+from conftest import API
+
+MEMBERS = 50
+_members = itertools.count(1)
+
+
+def add_members(campaign_id: int, count: int):
+    with SessionLocal() as db:
+        user_ids = db.scalars(insert(User).returning(User.id), [
+            {"email": f"member{n}@example.com", "username": f"member{n}", "hashed_password": "-"}
+            for n in itertools.islice(_members, count)
+        ]).all()
+        db.execute(insert(CampaignMember), [
+            {"campaign_id": campaign_id, "user_id": user_id, "role": CampaignRole.PLAYER}
+            for user_id in user_ids
+        ])
+        db.commit()
+
+
+@pytest.fixture
+def crowded_campaign(campaign):
+    add_members(campaign["id"], MEMBERS)
+    return campaign
+
+
+def test_get_campaign_with_many_members_within_budget(client, headers, crowded_campaign, query_guard, max_queries):
+    with max_queries(3):
+        response = client.get(f"{API}/campaigns/{crowded_campaign['id']}", headers=headers)
+    assert response.status_code == 200, response.text
+    detail = response.json()
+    assert detail["owner"]["id"] == detail["owner_id"]
+    assert len(detail["members"]) == MEMBERS
+    assert all(member["user"]["username"].startswith("member") for member in detail["members"])
+
+
+def test_load_campaign_detail_eager_loads_owner_and_member_users(crowded_campaign):
+    from app.api.endpoints.campaigns import load_campaign_detail
+    from app.core.querycount import count_queries
+
+    with SessionLocal() as db:
+        with count_queries() as counter:
+            campaign = load_campaign_detail(db, crowded_campaign["id"])
+        assert counter.count == 2, counter.statements
+
+        # Everything CampaignDetail serializes is already loaded
+        with count_queries() as counter:
+            assert campaign.owner.id == campaign.owner_id
+            assert len({member.user.username for member in campaign.members}) == MEMBERS
+        assert counter.count == 0, counter.statements
@@ -0,0 +1,30 @@
+from conftest import API
+
+
+def test_put_with_stale_version_fails(client, headers, campaign):
+    url = f"{API}/campaigns/{campaign['id']}"
+    assert client.put(url, json={"name": "Renamed"}, headers={**headers, "If-Match": '"1"'}).status_code == 200
+    response = client.put(url, json={"name": "Again"}, headers={**headers, "If-Match": '"1"'})
+    assert response.status_code == 412
+
+
+def test_if_match_accepts_etag_of_compressed_response(client, headers):
+    # Long enough to be compressed
+    campaign = client.post(f"{API}/campaigns", json={"name": "Big", "description": "x" * 4096}, headers=headers).json()
+    url = f"{API}/campaigns/{campaign['id']}"
+
+    response = client.get(url, headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == '"1-gzip"'
+
+    response = client.put(url, json={"name": "Bigger"}, headers={**headers, "If-Match": response.headers["etag"]})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+
+
+def test_if_match_ignores_weak_etags(client, headers, campaign):
+    url = f"{API}/campaigns/{campaign['id']}"
+    response = client.put(url, json={"name": "Renamed"}, headers={**headers, "If-Match": 'W/"1"'})
+    assert response.status_code == 412
+    response = client.put(url, json={"name": "Renamed"}, headers={**headers, "If-Match": 'W/"1", "1"'})
+    assert response.status_code == 200
@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+
+from app.services.derived_stats import DerivedStatsCache
+
+
+def character(version: int, level: int):
+    return SimpleNamespace(
+        id=1, version=version, level=level, stats={"wis": 14}, skills=None, saving_throws=None,
+        spellcasting_ability="wis",
+    )
+
+
+def test_cache_is_keyed_on_row_version():
+    cache = DerivedStatsCache()
+    assert cache.get(character(1, 1))["proficiency_bonus"] == 2
+    # Same version: served from the cache
+    assert cache.get(character(1, 5))["proficiency_bonus"] == 2
+    # A write bumped the version, whether or not it touched updated_at
+    assert cache.get(character(2, 5))["proficiency_bonus"] == 3
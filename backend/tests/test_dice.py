@@ -0,0 +1,18 @@
+from conftest import API
+
+
+def roll(client, headers, **body):
+    return client.post(f"{API}/dice/roll", json=body, headers=headers)
+
+
+def test_log_mode_limits_the_number_of_dice(client, headers):
+    assert roll(client, headers, expression="4d6kh3", count=1000).status_code == 200
+    response = roll(client, headers, expression="1000d1000+1000d1000", count=1000)
+    assert response.status_code == 400
+    assert "100000 dice" in response.json()["detail"]
+
+
+def test_expression_size_is_limited(client, headers):
+    many_terms = "+".join(["1d6"] * 21)
+    assert roll(client, headers, expression=many_terms, mode="summary").status_code == 400
+    assert roll(client, headers, expression="1" * 201).status_code == 422
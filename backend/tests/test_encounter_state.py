@@ -0,0 +1,13 @@
+from app.services.encounter_state import EncounterTurnCache
+
+COMBATANTS = [{"name": "Mira"}, {"name": "Goblin"}]
+
+
+def test_second_put_keeps_an_advanced_state():
+    cache = EncounterTurnCache()
+    # Two first calls both read round 0 from the database
+    cache.put(1, 1, 0, 0, COMBATANTS)
+    assert cache.advance(1).round == 1
+    kept = cache.put(1, 1, 0, 0, COMBATANTS)
+    assert (kept.round, kept.turn_index) == (1, 0)
+    assert (cache.advance(1).round, cache.get(1).turn_index) == (1, 1)
@@ -0,0 +1,32 @@
+import io
+
+from PIL import Image
+
+from conftest import API, register
+
+
+def upload_png(client, headers, size=(64, 48)):
+    body = io.BytesIO()
+    Image.new("RGB", size, "green").save(body, format="PNG")
+    response = client.post(f"{API}/files", content=body.getvalue(),
+                           headers={**headers, "Content-Type": "image/png"})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_only_uploader_can_request_tiles(client, headers):
+    stored = upload_png(client, headers)
+    url = f"{API}/files/{stored['sha256']}/tiles"
+    assert client.post(url, headers=register(client)).status_code == 403
+    assert client.post(url, headers=headers).status_code in (200, 202)
+
+
+def test_uploading_the_same_file_again_returns_it(client, headers):
+    body = io.BytesIO()
+    Image.new("RGB", (32, 32), "blue").save(body, format="PNG")
+    upload = {**headers, "Content-Type": "image/png"}
+    first = client.post(f"{API}/files", content=body.getvalue(), headers=upload)
+    again = client.post(f"{API}/files", content=body.getvalue(), headers=upload)
+    assert first.status_code == 201
+    assert again.status_code == 200
+    assert again.json()["sha256"] == first.json()["sha256"]
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.models import Character
+from conftest import API
+
+
+@pytest.fixture
+def make_character(client, headers, campaign):
+    def make_character(**columns):
+        character = client.post(f"{API}/characters", json={"name": "Mira", "campaign_id": campaign["id"]},
+                                headers=headers).json()
+        with SessionLocal() as db:
+            db.execute(update(Character).where(Character.id == character["id"]).values(**columns))
+            db.commit()
+        return character["id"]
+    return make_character
+
+
+def change_hit_points(client, headers, character_id, operation, amount):
+    response = client.patch(f"{API}/characters/{character_id}/hit-points",
+                            json={"operation": operation, "amount": amount}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_damage_absorbed_by_temporary_hit_points(client, headers, make_character):
+    character_id = make_character(hit_points_max=20, hit_points_current=15, hit_points_temp=5)
+    state = change_hit_points(client, headers, character_id, "damage", 8)
+    assert (state["hit_points_temp"], state["hit_points_current"]) == (0, 12)
+    state = change_hit_points(client, headers, character_id, "heal", 50)
+    assert state["hit_points_current"] == 20
+
+
+def test_unset_current_hit_points_count_as_maximum(client, headers, make_character):
+    character_id = make_character(hit_points_max=20, hit_points_current=None)
+    assert change_hit_points(client, headers, character_id, "damage", 6)["hit_points_current"] == 14
+
+
+def test_unknown_hit_points_stay_unknown(client, headers, make_character):
+    character_id = make_character(hit_points_max=None, hit_points_current=None, hit_points_temp=2)
+    state = change_hit_points(client, headers, character_id, "damage", 6)
+    assert (state["hit_points_temp"], state["hit_points_current"]) == (0, None)
+    assert change_hit_points(client, headers, character_id, "heal", 4)["hit_points_current"] is None
+
+
+def test_batch_is_capped(client, headers):
+    response = client.patch(f"{API}/characters/hit-points", json={
+        "operation": "damage", "amount": 1, "character_ids": list(range(1, 10_000)),
+    }, headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("slots, used, detail", [
+    ({"1": {"max": 2, "used": 2}}, 1, "Only 0 level 1 spell slots left"),
+    ({"1": {"max": 2, "used": 0}}, -1, "Only 0 level 1 spell slots are expended"),
+    ({"2": {"max": 2, "used": 0}}, 1, "The character has no level 1 spell slots"),
+    (None, 1, "The character has no level 1 spell slots"),
+])
+def test_spell_slot_conflicts(client, headers, make_character, slots, used, detail):
+    character_id = make_character(spell_slots=slots)
+    response = client.patch(f"{API}/characters/{character_id}/spell-slots",
+                            json={"level": 1, "used": used}, headers=headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == detail
+
+
+def test_spell_slot_without_used_count(client, headers, make_character):
+    character_id = make_character(spell_slots={"1": {"max": 2}})
+    response = client.patch(f"{API}/characters/{character_id}/spell-slots", json={"level": 1}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["spell_slots"]["1"] == {"max": 2, "used": 1}
@@ -0,0 +1,36 @@
+from app.core import idempotency
+from app.core.database import SessionLocal
+from app.models import IdempotencyKey
+from conftest import API
+
+
+def test_repeat_is_replayed(client, headers):
+    send = {**headers, "Idempotency-Key": "create-campaign-1"}
+    first = client.post(f"{API}/campaigns", json={"name": "Once"}, headers=send)
+    again = client.post(f"{API}/campaigns", json={"name": "Once"}, headers=send)
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json()["id"] == first.json()["id"]
+
+
+def test_pending_key_is_leased_for_longer_than_the_wait(client):
+    claim, row = idempotency._begin("lease", "request")
+    assert claim is not None and row is None
+    with SessionLocal() as db:
+        expires_at = db.get(IdempotencyKey, "lease").expires_at
+    remaining = (expires_at.replace(tzinfo=None) - idempotency._now().replace(tzinfo=None)).total_seconds()
+    assert remaining > idempotency.settings.IDEMPOTENCY_WAIT_SECONDS * 2
+
+
+def test_only_the_current_claim_stores_its_response(client):
+    stale, _ = idempotency._begin("claimed-twice", "request")
+    # The lease ran out and a repeat claimed the key again
+    with SessionLocal() as db:
+        db.query(IdempotencyKey).filter(IdempotencyKey.key == "claimed-twice").delete()
+        db.commit()
+    current, _ = idempotency._begin("claimed-twice", "request")
+
+    idempotency._complete("claimed-twice", stale, 201, [], b"stale")
+    idempotency._release("claimed-twice", stale)
+    idempotency._complete("claimed-twice", current, 201, [], b"current")
+    with SessionLocal() as db:
+        assert db.get(IdempotencyKey, "claimed-twice").body == b"current"
@@ -0,0 +1,26 @@
+from conftest import API
+
+
+def test_transfer_moves_and_stacks_items(client, headers, campaign):
+    def create(path, body):
+        return client.post(f"{API}/{path}", json={"campaign_id": campaign["id"], **body}, headers=headers).json()
+
+    rope, torch = create("items", {"name": "Rope"}), create("items", {"name": "Torch"})
+    mira, bram = create("characters", {"name": "Mira"}), create("characters", {"name": "Bram"})
+    for character, quantity in ((mira, 5), (bram, 1)):
+        client.post(f"{API}/characters/{character['id']}/inventory", headers=headers, json={
+            "items": [{"item_id": rope["id"], "quantity": quantity}, {"item_id": torch["id"], "quantity": quantity}]
+        })
+
+    response = client.post(f"{API}/characters/{mira['id']}/inventory/transfer", headers=headers, json={
+        "to_character_id": bram["id"],
+        "items": [{"item_id": rope["id"], "quantity": 5}, {"item_id": torch["id"], "quantity": 2}],
+    })
+    assert response.status_code == 200, response.text
+    held = {side: {i["name"]: i["quantity"] for i in inventory["items"]} for side, inventory in response.json().items()}
+    assert held == {"source": {"Torch": 3}, "destination": {"Rope": 6, "Torch": 3}}
+
+    response = client.post(f"{API}/characters/{bram['id']}/inventory/transfer", headers=headers, json={
+        "to_character_id": mira["id"], "items": [{"item_id": rope["id"], "quantity": 7}],
+    })
+    assert response.status_code == 422
@@ -0,0 +1,27 @@
+import pytest
+
+from conftest import API
+
+
+@pytest.fixture
+def line_of_places(client, headers, campaign):
+    """Places all on x = 0, so the pins cover no area."""
+    response = client.post(f"{API}/places/bulk", headers=headers, json={
+        "campaign_id": campaign["id"],
+        "places": [{"name": f"Milestone {n}", "map_coordinates": f"0,{n * 10}"} for n in range(40)],
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_nearest_on_collinear_pins_stays_within_budget(client, headers, line_of_places, query_guard):
+    response = client.get(f"{API}/places/{line_of_places[20]['id']}/nearest?k=3", headers=headers)
+    assert response.status_code == 200, response.text
+    assert [p["distance"] for p in response.json()] == [10, 10, 20]
+
+
+def test_nearest_matches_a_full_scan(client, headers, campaign, line_of_places, query_guard):
+    response = client.get(f"{API}/places/campaign/{campaign['id']}/nearest?x=0&y=123&k=4", headers=headers)
+    assert response.status_code == 200, response.text
+    expected = sorted(abs(n * 10 - 123) for n in range(40))[:4]
+    assert [p["distance"] for p in response.json()] == pytest.approx(expected)
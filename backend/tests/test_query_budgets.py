@@ -0,0 +1,88 @@
+"""
+Endpoints stay within their @query_budget however many rows they return.
+
+The campaign is seeded with ROWS of everything, so an endpoint that loads a
+relationship per row runs far more statements than its budget and the
+query guard fails the request.
+"""
+
+import pytest
+
+from app.core.querycount import QueryBudgetExceeded
+from conftest import API, register
+
+ROWS = 20
+
+
+@pytest.fixture(scope="module")
+def seeded(client):
+    headers = register(client)
+    campaign_id = client.post(f"{API}/campaigns", json={"name": "Budgets"}, headers=headers).json()["id"]
+    rows = [{"name": f"Row {n}"} for n in range(ROWS)]
+
+    def bulk(path, key, rows):
+        response = client.post(f"{API}/{path}/bulk", json={"campaign_id": campaign_id, key: rows}, headers=headers)
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    characters = bulk("characters", "characters", [
+        {**row, "spells": {"1": [{"name": "Magic Missile", "level": 1}]}, "features": ["Darkvision"]}
+        for row in rows
+    ])
+    places = bulk("places", "places", [{**row, "map_coordinates": f"{n},{n}"} for n, row in enumerate(rows)])
+    items = bulk("items", "items", rows)
+    bulk("quests", "quests", rows)
+    notes = bulk("notes", "notes", [{"title": row["name"]} for row in rows])
+    bulk("routes", "routes", [
+        {"from_place_id": a["id"], "to_place_id": b["id"], "distance": 10}
+        for a, b in zip(places, places[1:])
+    ])
+    for n in range(ROWS):
+        client.post(f"{API}/sessions", json={"campaign_id": campaign_id, "session_number": n + 1}, headers=headers)
+    client.post(f"{API}/characters/{characters[0]['id']}/inventory", json={
+        "items": [{"item_id": item["id"]} for item in items]
+    }, headers=headers)
+    encounter = client.post(f"{API}/encounters", json={
+        "campaign_id": campaign_id, "name": "Ambush",
+        "combatants": [{"character_id": character["id"]} for character in characters],
+    }, headers=headers).json()
+    return {
+        "headers": headers, "campaign": campaign_id, "character": characters[0]["id"],
+        "place": places[0]["id"], "item": items[0]["id"], "note": notes[0]["id"], "encounter": encounter["id"],
+    }
+
+
+@pytest.mark.parametrize("path", [
+    "/campaigns",
+    "/campaigns/{campaign}",
+    "/characters/campaign/{campaign}",
+    "/characters/campaign/{campaign}/search?spell=Magic%20Missile",
+    "/characters/campaign/{campaign}/derived-stats",
+    "/characters/{character}",
+    "/characters/{character}/derived-stats",
+    "/characters/{character}/inventory",
+    "/places/campaign/{campaign}",
+    "/places/campaign/{campaign}/within?min_x=0&min_y=0&max_x=100&max_y=100",
+    "/places/campaign/{campaign}/nearest?x=0&y=0",
+    "/places/{place}",
+    "/places/{place}/nearest",
+    "/routes/campaign/{campaign}",
+    "/items/campaign/{campaign}",
+    "/items/{item}",
+    "/quests/campaign/{campaign}",
+    "/notes/campaign/{campaign}",
+    "/notes/{note}",
+    "/sessions/campaign/{campaign}",
+    "/encounters/campaign/{campaign}",
+    "/encounters/{encounter}",
+    "/revisions/notes/{note}",
+])
+def test_endpoint_within_query_budget(client, seeded, query_guard, path):
+    response = client.get(API + path.format(**seeded), headers=seeded["headers"])
+    assert response.status_code == 200, response.text
+
+
+def test_max_queries_fails_over_limit(client, seeded, max_queries):
+    with pytest.raises(QueryBudgetExceeded):
+        with max_queries(1):
+            client.get(f"{API}/campaigns/{seeded['campaign']}", headers=seeded["headers"])
@@ -0,0 +1,13 @@
+from conftest import API
+
+
+def test_edits_are_kept_as_revisions(client, headers, campaign):
+    note = client.post(f"{API}/notes", json={"campaign_id": campaign["id"], "title": "Rumours", "content": "One"},
+                       headers=headers).json()
+    response = client.put(f"{API}/notes/{note['id']}", json={"content": "Two"}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    history = client.get(f"{API}/revisions/notes/{note['id']}", headers=headers).json()
+    assert [(r["version"], r["fields"]) for r in history] == [(2, ["content"])]
+    first = client.get(f"{API}/revisions/notes/{note['id']}/1", headers=headers).json()
+    assert first["data"]["content"] == "One"
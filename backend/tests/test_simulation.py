@@ -0,0 +1,22 @@
+from conftest import API
+
+
+def simulate(client, headers, campaign, **body):
+    client.post(f"{API}/characters", json={"name": "Mira", "campaign_id": campaign["id"]}, headers=headers)
+    monster = {"name": "Goblin", "armor_class": 15, "hit_points": 7, "damage": "1d6+2"}
+    return client.post(f"{API}/encounters/simulate", headers=headers, json={
+        "campaign_id": campaign["id"], "monsters": [{**monster, **body.pop("monster", {})}], **body
+    })
+
+
+def test_small_simulation_runs(client, headers, campaign):
+    response = simulate(client, headers, campaign, simulations=1000, seed=1)
+    assert response.status_code == 200, response.text
+    assert response.json()["simulations"] == 1000
+
+
+def test_simulation_work_is_bounded(client, headers, campaign):
+    response = simulate(client, headers, campaign, simulations=1_000_000, max_rounds=100,
+                        monster={"count": 50, "attacks": 10})
+    assert response.status_code == 400
+    assert "Too large a simulation" in response.json()["detail"]
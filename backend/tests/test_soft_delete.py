@@ -0,0 +1,65 @@
+"""Entities of a deleted campaign cannot be changed until it is restored."""
+
+import pytest
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.models import Character, CampaignRole
+from conftest import API, register
+
+
+@pytest.fixture
+def deleted_campaign(client, headers, campaign):
+    player = register(client)
+    player_id = client.get(f"{API}/users/me", headers=player).json()["id"]
+    client.post(f"{API}/campaigns/{campaign['id']}/members",
+                json={"user_id": player_id, "role": CampaignRole.PLAYER.value}, headers=headers)
+
+    characters = [
+        client.post(f"{API}/characters", json={"name": name, "campaign_id": campaign["id"]}, headers=owner).json()
+        for name, owner in (("Npc", headers), ("Hero", player))
+    ]
+    with SessionLocal() as db:
+        db.execute(update(Character).where(Character.campaign_id == campaign["id"]).values(
+            hit_points_max=10, hit_points_current=10, spell_slots={"1": {"max": 2, "used": 0}}
+        ))
+        db.commit()
+    encounter = client.post(f"{API}/encounters", json={
+        "campaign_id": campaign["id"], "name": "Ambush",
+        "combatants": [{"character_id": character["id"]} for character in characters],
+    }, headers=headers).json()
+
+    assert client.delete(f"{API}/campaigns/{campaign['id']}", headers=headers).status_code == 204
+    return {"dm": headers, "player": player, "characters": characters, "encounter": encounter, **campaign}
+
+
+def test_characters_of_deleted_campaign_are_not_editable(client, deleted_campaign):
+    damage = {"operation": "damage", "amount": 3}
+    for character, user in zip(deleted_campaign["characters"], ("dm", "player")):
+        headers = deleted_campaign[user]
+        url = f"{API}/characters/{character['id']}"
+        assert client.patch(f"{url}/hit-points", json=damage, headers=headers).status_code == 404
+        assert client.patch(f"{url}/spell-slots", json={"level": 1}, headers=headers).status_code == 404
+        response = client.patch(f"{API}/characters/hit-points",
+                                json={**damage, "character_ids": [character["id"]]}, headers=headers)
+        assert response.json() == []
+
+    with SessionLocal() as db:
+        assert {c.hit_points_current for c in db.query(Character).filter(
+            Character.campaign_id == deleted_campaign["id"]
+        )} == {10}
+
+
+def test_next_turn_of_deleted_campaign(client, deleted_campaign):
+    response = client.post(f"{API}/encounters/{deleted_campaign['encounter']['id']}/next-turn",
+                           headers=deleted_campaign["dm"])
+    assert response.status_code == 404
+
+
+def test_restored_campaign_is_editable_again(client, deleted_campaign):
+    headers = deleted_campaign["dm"]
+    assert client.post(f"{API}/campaigns/{deleted_campaign['id']}/restore", headers=headers).status_code == 200
+    response = client.patch(f"{API}/characters/{deleted_campaign['characters'][0]['id']}/hit-points",
+                            json={"operation": "damage", "amount": 3}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["hit_points_current"] == 7
@@ -0,0 +1,19 @@
+from app.services.srd import get_catalog
+
+
+def test_spell_reference_drops_only_catalog_text():
+    entry = {
+        "name": "Magic Missile", "level": 1, "school": "Evocation", "description": "Three darts",
+        "prepared": True, "notes": "Favourite", "id": 1234,
+    }
+    assert get_catalog().spell_reference(entry) == {
+        "srd_id": "magic-missile", "name": "Magic Missile", "level": 1, "prepared": True, "notes": "Favourite", "id": 1234,
+    }
+
+
+def test_spells_not_in_catalog_are_kept_as_they_are():
+    spells = {"cantrips": ["Homebrew Spark", {"name": "Made Up", "description": "Custom text"}], "3": ["Fireball"]}
+    assert get_catalog().compact_spells(spells) == {
+        "cantrips": ["Homebrew Spark", {"name": "Made Up", "description": "Custom text"}],
+        "3": [{"srd_id": "fireball", "name": "Fireball", "level": 3}],
+    }
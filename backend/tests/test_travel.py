@@ -0,0 +1,26 @@
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.models import Route
+from app.services import travel
+from conftest import API
+
+
+def test_graph_is_rebuilt_after_an_edit_within_the_same_timestamp(client, headers, campaign):
+    places = client.post(f"{API}/places/bulk", headers=headers, json={
+        "campaign_id": campaign["id"], "places": [{"name": "Town"}, {"name": "Keep"}],
+    }).json()
+    route = client.post(f"{API}/routes", headers=headers, json={
+        "campaign_id": campaign["id"], "from_place_id": places[0]["id"], "to_place_id": places[1]["id"],
+        "distance": 12,
+    }).json()
+
+    with SessionLocal() as db:
+        graph = travel.campaign_graph(db, campaign["id"])
+        assert travel.campaign_graph(db, campaign["id"]) is graph
+        # Another process edits the route without changing updated_at
+        db.execute(update(Route).where(Route.id == route["id"]).values(
+            distance=24, version=Route.version + 1, updated_at=Route.updated_at
+        ))
+        db.commit()
+        assert travel.campaign_graph(db, campaign["id"]) is not graph
@@ -0,0 +1,52 @@
+"""Writes return what they wrote without reading it back."""
+
+import pytest
+
+from conftest import API
+
+
+@pytest.mark.parametrize("entity, body, change", [
+    ("places", {"name": "Keep"}, {"name": "Ruined keep"}),
+    ("items", {"name": "Lantern"}, {"name": "Hooded lantern"}),
+    ("quests", {"name": "Find the heir"}, {"description": "The heir was last seen in Waterdeep"}),
+    ("notes", {"title": "Rumours"}, {"content": "The mayor is a doppelganger"}),
+    ("sessions", {"session_number": 1}, {"title": "Arrival"}),
+])
+def test_create_and_update_entity(client, headers, campaign, max_queries, entity, body, change):
+    with max_queries(3):
+        created = client.post(f"{API}/{entity}", json={**body, "campaign_id": campaign["id"]}, headers=headers)
+    assert created.status_code == 201, created.text
+    # user, row, campaign access, UPDATE, revision
+    with max_queries(5):
+        updated = client.put(f"{API}/{entity}/{created.json()['id']}", json=change, headers=headers)
+    assert updated.status_code == 200, updated.text
+    assert updated.json()["version"] == 2
+
+
+def test_create_and_update_campaign(client, headers, max_queries):
+    with max_queries(2):
+        created = client.post(f"{API}/campaigns", json={"name": "Queries"}, headers=headers)
+    assert created.status_code == 201
+    with max_queries(4):
+        updated = client.put(f"{API}/campaigns/{created.json()['id']}", json={"setting": "Greyhawk"}, headers=headers)
+    assert updated.json()["setting"] == "Greyhawk"
+
+
+def test_create_and_update_character(client, headers, campaign, max_queries):
+    with max_queries(6):
+        created = client.post(f"{API}/characters", json={
+            "name": "Mira", "campaign_id": campaign["id"], "spells": {"1": [{"name": "Shield"}]}
+        }, headers=headers)
+    assert created.status_code == 201, created.text
+    with max_queries(5):
+        updated = client.put(f"{API}/characters/{created.json()['id']}", json={"level": 2}, headers=headers)
+    assert updated.json()["level"] == 2
+
+
+def test_bulk_create(client, headers, campaign, max_queries):
+    with max_queries(3):
+        response = client.post(f"{API}/items/bulk", json={
+            "campaign_id": campaign["id"], "items": [{"name": f"Coin {n}"} for n in range(50)]
+        }, headers=headers)
+    assert response.status_code == 201
+    assert [item["name"] for item in response.json()] == [f"Coin {n}" for n in range(50)]
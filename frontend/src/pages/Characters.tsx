@@ -18,6 +18,10 @@ interface Character {
   dndbeyond_url?: string
 }
 
+// Poll an import job every second for up to 3 minutes (retries included)
+const IMPORT_POLL_MS = 1000
+const IMPORT_POLL_ATTEMPTS = 180
+
 export default function Characters() {
   const [selectedCampaignId, setSelectedCampaignId] = useState<number | null>(null)
   const [showCreateModal, setShowCreateModal] = useState(false)
@@ -46,8 +50,19 @@ export default function Characters() {
   // Import from D&D Beyond
   const importFromDnDBeyond = useMutation({
     mutationFn: async (data: { campaign_id: number; character_url: string; cobalt_token?: string }) => {
-      const response = await api.post('/dndbeyond/import', data)
-      return response.data
+      // The import runs as a background job: poll it until it is done, or give up
+      let job = (await api.post('/dndbeyond/import', data)).data
+      for (let attempt = 0; job.status === 'queued' || job.status === 'running'; attempt++) {
+        if (attempt >= IMPORT_POLL_ATTEMPTS) {
+          throw { response: { data: { detail: 'The import is taking longer than expected. Check the character list again in a few minutes.' } } }
+        }
+        await new Promise((resolve) => setTimeout(resolve, IMPORT_POLL_MS))
+        job = (await api.get(`/jobs/${job.id}`)).data
+      }
+      if (job.status === 'failed') {
+        throw { response: { data: { detail: job.error } } }
+      }
+      return job
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['characters', selectedCampaignId] })
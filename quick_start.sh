@@ -35,6 +35,9 @@ UPLOAD_DIR=./uploads
 
 # D&D Beyond Integration (optional)
 DNDBEYOND_COBALT_TOKEN=
+
+# Run background jobs in the API process (no separate worker needed)
+JOB_WORKER_IN_API=true
 EOF
 
 echo "✓ Created .env with SQLite configuration"